@@ -0,0 +1,101 @@
+"""Parse time of a single response against payload size, per wire mode.
+
+    python benchmarks/bench_framing.py
+
+``reparse`` is the original unframed reader, which re-joined and re-parsed the
+whole buffer after every 8 KB recv. ``legacy`` is the current unframed reader
+and ``framed`` reads a length-prefixed message and parses it once.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+
+from ableton_mcp.client import SocketAbletonClient
+from ableton_mcp.protocol import encode_frame, encode_message
+
+SIZES_KB = [16, 128, 512, 1024, 2048]
+RECV_SIZE = 8192
+
+
+class ChunkedSocket:
+    """Socket stand-in that hands out a fixed payload in recv-sized chunks."""
+
+    def __init__(self, data: bytes) -> None:
+        self._data = memoryview(data)
+        self._pos = 0
+
+    def settimeout(self, timeout: float) -> None:
+        pass
+
+    def recv(self, size: int) -> bytes:
+        size = min(size, RECV_SIZE)
+        chunk = bytes(self._data[self._pos : self._pos + size])
+        self._pos += len(chunk)
+        return chunk
+
+
+def make_response(target_bytes: int) -> dict:
+    note = {
+        "pitch": 60,
+        "start_time": 0.0,
+        "duration": 0.25,
+        "velocity": 100,
+        "mute": False,
+    }
+    count = max(1, target_bytes // len(json.dumps(note)))
+    notes = [dict(note, start_time=i * 0.25) for i in range(count)]
+    return {"status": "success", "result": {"notes": notes}}
+
+
+def read_reparse(sock: ChunkedSocket) -> dict:
+    chunks: list[bytes] = []
+    while True:
+        chunks.append(sock.recv(RECV_SIZE))
+        try:
+            return json.loads(b"".join(chunks).decode("utf-8"))
+        except json.JSONDecodeError:
+            continue
+
+
+def read_legacy(sock: ChunkedSocket) -> dict:
+    client = SocketAbletonClient()
+    client._sock = sock  # type: ignore[assignment]
+    return client._receive_full_response()
+
+
+def read_framed(sock: ChunkedSocket) -> dict:
+    client = SocketAbletonClient()
+    client._sock = sock  # type: ignore[assignment]
+    return client._receive_frame()
+
+
+def best_of(reader, data: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        sock = ChunkedSocket(data)
+        start = time.perf_counter()
+        reader(sock)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    print(f"{'payload':>10} {'reparse':>12} {'legacy':>12} {'framed':>12}")
+    for size_kb in SIZES_KB:
+        response = make_response(size_kb * 1024)
+        unframed = encode_message(response)
+        framed = encode_frame(response)
+        repeat = 3 if size_kb >= 512 else 10
+        timings = [
+            best_of(read_reparse, unframed, repeat),
+            best_of(read_legacy, unframed, repeat),
+            best_of(read_framed, framed, repeat),
+        ]
+        cells = " ".join(f"{t * 1000:>10.2f}ms" for t in timings)
+        print(f"{len(unframed) / 1024:>8.0f}KB {cells}")
+
+
+if __name__ == "__main__":
+    main()
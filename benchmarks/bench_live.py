@@ -0,0 +1,348 @@
+"""End-to-end command costs against the real control surface in a simulated Live.
+
+    python benchmarks/bench_live.py [--tracks 16] [--tick-ms 100] [--json out.json]
+    python benchmarks/bench_live.py --compare before.json
+
+Runs ``control_surface/AbletonMCP`` on a simulated set (see ``live_model``)
+whose main thread ticks every ``--tick-ms``, and drives it over a real socket
+with the same clients the server uses. It reports:
+
+- round-trip latency of single commands, reads and main-thread writes
+- throughput of concurrent callers on one pipelined connection
+- note transfer cost, writing and reading back ``--notes`` notes
+- editing those notes with ``transform_clip_notes``, against reading them,
+  transforming them on the server and writing them back
+- browser lookup cost, by search, by path and by URI (through a load)
+
+``--json`` saves the report with the commit and settings it ran with, and
+``--compare`` prints the change against such a report, so runs from two
+commits can be compared as long as they used the same settings.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from live_model import ROOT, SetSize, start_control_surface
+
+from ableton_mcp import transforms
+from ableton_mcp.client import AsyncAbletonClient, SocketAbletonClient
+
+
+@dataclass
+class Result:
+    name: str
+    samples: list[float]
+    #: Commands or notes per sample, to report a rate alongside latency
+    units: int = 1
+    unit: str = "cmd"
+
+    def summary(self) -> dict[str, float]:
+        ordered = sorted(self.samples)
+        mean = statistics.fmean(ordered)
+        return {
+            "p50_ms": ordered[len(ordered) // 2] * 1000,
+            "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            "mean_ms": mean * 1000,
+            f"{self.unit}_per_s": self.units / mean if mean else 0.0,
+        }
+
+
+def timed(call: Callable[[], Any], iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_latency(client: SocketAbletonClient, iterations: int) -> list[Result]:
+    commands: list[tuple[str, str, dict[str, Any]]] = [
+        ("read get_session_info", "get_session_info", {}),
+        ("read get_track_info", "get_track_info", {"track_index": 0}),
+        ("read get_session_snapshot", "get_session_snapshot", {}),
+        (
+            "read get_device_parameters",
+            "get_device_parameters",
+            {"track_index": 0, "device_index": 0},
+        ),
+        ("write set_track_name", "set_track_name", {"track_index": 0, "name": "A"}),
+        (
+            "write set_device_parameter",
+            "set_device_parameter",
+            {"track_index": 0, "device_index": 0, "param_index": 0, "value": 0.5},
+        ),
+    ]
+    return [
+        Result(name, timed(lambda: client.send_command(command, params), iterations))
+        for name, command, params in commands
+    ]
+
+
+def bench_throughput(port: int, concurrency: int, iterations: int) -> list[Result]:
+    async def burst(command: str, params: dict[str, Any]) -> list[float]:
+        client = AsyncAbletonClient(port=port)
+        await client.send_command_async("get_session_info")  # Connect first
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(
+                    client.send_command_async(command, params)
+                    for _ in range(concurrency)
+                )
+            )
+            samples.append(time.perf_counter() - start)
+        await client.disconnect()
+        return samples
+
+    return [
+        Result(
+            f"{concurrency} concurrent get_track_info",
+            asyncio.run(burst("get_track_info", {"track_index": 0})),
+            units=concurrency,
+        ),
+        Result(
+            f"{concurrency} concurrent set_track_mute",
+            asyncio.run(burst("set_track_mute", {"track_index": 0, "mute": False})),
+            units=concurrency,
+        ),
+    ]
+
+
+def bench_notes(
+    client: SocketAbletonClient, count: int, iterations: int
+) -> list[Result]:
+    notes = [
+        {
+            "pitch": 36 + i % 24,
+            "start_time": i * 0.125,
+            "duration": 0.125,
+            "velocity": 64 + i % 64,
+            "mute": False,
+        }
+        for i in range(count)
+    ]
+    clip = {"track_index": 1, "clip_index": 0}
+    write = Result(
+        f"add_notes_to_clip {count} notes",
+        timed(
+            lambda: client.send_command("add_notes_to_clip", {**clip, "notes": notes}),
+            iterations,
+        ),
+        units=count,
+        unit="note",
+    )
+    read = Result(
+        f"get_clip_notes {count} notes",
+        timed(
+            # Past the clip's own length, which is where reads stop by default
+            lambda: client.send_command(
+                "get_clip_notes", {**clip, "end_time": count * 0.125}
+            ),
+            iterations,
+        ),
+        units=count,
+        unit="note",
+    )
+    return [write, read]
+
+
+def bench_transform(
+    client: SocketAbletonClient, count: int, iterations: int
+) -> list[Result]:
+    clip = {"track_index": 1, "clip_index": 0}
+    # Long enough to hold every note, since a transform covers the clip
+    client.send_command("delete_clip", clip)
+    client.send_command("create_clip", {**clip, "length": count * 0.125})
+    client.send_command(
+        "add_notes_to_clip",
+        {
+            **clip,
+            "notes": [
+                {"pitch": 36 + i % 24, "start_time": i * 0.125, "duration": 0.1}
+                for i in range(count)
+            ],
+        },
+    )
+    operations = [
+        {"op": "quantize", "grid": 0.25, "strength": 0.5},
+        {"op": "velocity", "curve": 0.9},
+        {"op": "legato"},
+    ]
+
+    def offline() -> None:
+        notes = client.send_command("get_clip_notes", clip)["notes"]
+        kept = transforms.apply(notes, operations)
+        client.send_command("add_notes_to_clip", {**clip, "notes": kept})
+
+    return [
+        Result(
+            f"transform_clip_notes {count} notes",
+            timed(
+                lambda: client.send_command(
+                    "transform_clip_notes", {**clip, "operations": operations}
+                ),
+                iterations,
+            ),
+            units=count,
+            unit="note",
+        ),
+        Result(
+            f"read, transform, write {count} notes",
+            timed(offline, iterations),
+            units=count,
+            unit="note",
+        ),
+    ]
+
+
+def bench_browser(
+    client: SocketAbletonClient, live: Any, size: SetSize, iterations: int
+) -> list[Result]:
+    folder = size.browser_folders - 1
+    item = size.browser_items_per_folder - 1
+    uri = f"query:Drums#Folder{folder}:Preset{item}"
+    # Time the lookup and load, not the wait for a track selection to settle
+    live.module.TRACK_SELECT_SETTLE = 0.0
+
+    def load() -> None:
+        client.send_command(
+            "load_browser_item",
+            {"track_index": 2, "uri": uri, "clear_existing": True},
+        )
+
+    results = [
+        Result(
+            "search_browser",
+            timed(
+                lambda: client.send_command(
+                    "search_browser", {"query": f"preset {folder}-{item}"}
+                ),
+                iterations,
+            ),
+        ),
+        Result(
+            "get_browser_items_at_path",
+            timed(
+                lambda: client.send_command(
+                    "get_browser_items_at_path",
+                    {"path": f"Drums/Drums Folder {folder}"},
+                ),
+                iterations,
+            ),
+        ),
+    ]
+    live.surface._uri_cache.clear()
+    results.append(Result("load_browser_item cold", timed(load, 1)))
+    results.append(Result("load_browser_item warm", timed(load, iterations)))
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    size = SetSize(
+        tracks=args.tracks,
+        scenes=args.scenes,
+        notes_per_clip=args.notes_per_clip,
+        browser_folders=args.browser_folders,
+        browser_items_per_folder=args.browser_items,
+    )
+    live = start_control_surface(size, args.tick_ms / 1000)
+    client = SocketAbletonClient(port=live.port)
+    try:
+        live.wait_for_browser_index()
+        results = [
+            *bench_latency(client, args.iterations),
+            *bench_throughput(live.port, args.concurrency, args.iterations),
+            *bench_notes(client, args.notes, args.iterations),
+            *bench_transform(client, args.notes, args.iterations),
+            *bench_browser(client, live, size, args.iterations),
+        ]
+    finally:
+        client.disconnect()
+        live.stop()
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "settings": {
+            "set": asdict(size),
+            "tick_ms": args.tick_ms,
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "notes": args.notes,
+        },
+        "results": {result.name: result.summary() for result in results},
+    }
+
+
+def print_report(report: dict[str, Any], baseline: dict[str, Any] | None) -> None:
+    print(f"commit {report['commit']}, tick {report['settings']['tick_ms']}ms")
+    if baseline is not None:
+        print(f"compared with {baseline['commit']} (change in p50)")
+        if baseline["settings"] != report["settings"]:
+            print("warning: the baseline ran with different settings")
+    print(f"{'':<40} {'p50':>9} {'p95':>9} {'mean':>9} {'rate':>14}")
+    for name, summary in report["results"].items():
+        rate_key = next(key for key in summary if key.endswith("_per_s"))
+        unit = rate_key[: -len("_per_s")]
+        line = (
+            f"{name:<40} {summary['p50_ms']:>7.2f}ms {summary['p95_ms']:>7.2f}ms"
+            f" {summary['mean_ms']:>7.2f}ms {summary[rate_key]:>9.0f} {unit}/s"
+        )
+        before = (baseline or {}).get("results", {}).get(name)
+        if before:
+            change = summary["p50_ms"] / before["p50_ms"] - 1 if before["p50_ms"] else 0
+            line += f" {change:>+7.0%}"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=16)
+    parser.add_argument("--scenes", type=int, default=8)
+    parser.add_argument("--notes-per-clip", type=int, default=64)
+    parser.add_argument("--browser-folders", type=int, default=20)
+    parser.add_argument("--browser-items", type=int, default=100)
+    parser.add_argument(
+        "--tick-ms", type=float, default=100, help="Live main-thread tick interval"
+    )
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--notes", type=int, default=1000)
+    parser.add_argument("--json", type=Path, help="save the report here")
+    parser.add_argument("--compare", type=Path, help="a report saved with --json")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    report = run(args)
+    print_report(report, baseline)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Wire size and encode/decode time of note payloads, objects vs columnar.
+
+    python benchmarks/bench_notes.py
+
+``objects`` is the JSON list of note dicts, ``columnar`` the packed form
+from ``ableton_mcp.notes``. Times cover encoding to wire bytes and parsing
+back into a list of note dicts.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+
+from ableton_mcp.notes import decode_notes, encode_notes
+
+NOTE_COUNTS = [100, 1_000, 10_000, 50_000]
+
+
+def make_notes(count: int) -> list[dict]:
+    return [
+        {
+            "pitch": 36 + i % 12,
+            "start_time": i * 0.125,
+            "duration": 0.125,
+            "velocity": 64.0 + i % 64,
+            "mute": False,
+        }
+        for i in range(count)
+    ]
+
+
+def roundtrip_objects(notes: list[dict]) -> tuple[int, list[dict]]:
+    wire = json.dumps({"notes": notes}).encode("utf-8")
+    return len(wire), json.loads(wire)["notes"]
+
+
+def roundtrip_columnar(notes: list[dict]) -> tuple[int, list[dict]]:
+    wire = json.dumps({"notes": encode_notes(notes)}).encode("utf-8")
+    return len(wire), decode_notes(json.loads(wire)["notes"])
+
+
+def best_of(roundtrip, notes: list[dict], repeat: int = 5) -> tuple[int, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size, _ = roundtrip(notes)
+        best = min(best, time.perf_counter() - start)
+    return size, best
+
+
+def main() -> None:
+    print(
+        f"{'notes':>8} {'objects':>10} {'columnar':>10} {'ratio':>6}"
+        f" {'objects':>11} {'columnar':>11}"
+    )
+    for count in NOTE_COUNTS:
+        notes = make_notes(count)
+        object_size, object_time = best_of(roundtrip_objects, notes)
+        column_size, column_time = best_of(roundtrip_columnar, notes)
+        print(
+            f"{count:>8} {object_size / 1024:>8.0f}KB {column_size / 1024:>8.0f}KB"
+            f" {object_size / column_size:>5.1f}x"
+            f" {object_time * 1000:>9.2f}ms {column_time * 1000:>9.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
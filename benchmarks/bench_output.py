@@ -0,0 +1,111 @@
+"""Size and encode time of tool results in each output profile.
+
+    python benchmarks/bench_output.py [--tracks 16] [--notes 1000]
+
+Fetches real results from the control surface running on a simulated set
+(see ``live_model``), then encodes each with ``ableton_mcp.output`` in the
+pretty, compact and table profiles. Size is the UTF-8 bytes the MCP host
+transfers and the model reads.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import Any
+
+from live_model import SetSize, start_control_surface
+
+from ableton_mcp.client import SocketAbletonClient
+from ableton_mcp.output import PROFILES, OutputProfile, encode
+
+
+def fetch_results(
+    client: SocketAbletonClient, notes: int
+) -> list[tuple[str, dict[str, Any]]]:
+    clip = {"track_index": 1, "clip_index": 0}
+    client.send_command(
+        "add_notes_to_clip",
+        {
+            **clip,
+            "notes": [
+                {
+                    "pitch": 36 + i % 24,
+                    "start_time": i * 0.125,
+                    "duration": 0.125,
+                    "velocity": 64 + i % 64,
+                    "mute": False,
+                }
+                for i in range(notes)
+            ],
+        },
+    )
+    clip_notes = client.send_command(
+        "get_clip_notes", {**clip, "end_time": notes * 0.125}
+    )
+    return [
+        (f"get_clip_notes ({len(clip_notes['notes'])})", clip_notes),
+        ("get_track_info", client.send_command("get_track_info", {"track_index": 0})),
+        (
+            "get_device_parameters",
+            client.send_command(
+                "get_device_parameters", {"track_index": 0, "device_index": 0}
+            ),
+        ),
+        ("get_session_snapshot", client.send_command("get_session_snapshot")),
+    ]
+
+
+def time_encode(
+    result: dict[str, Any], profile: OutputProfile, min_time: float = 0.2
+) -> float:
+    """Seconds per encode, averaged over at least ``min_time`` seconds."""
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        encode(result, profile)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=16)
+    parser.add_argument("--scenes", type=int, default=8)
+    parser.add_argument("--notes", type=int, default=1000)
+    args = parser.parse_args()
+
+    live = start_control_surface(
+        SetSize(
+            tracks=args.tracks,
+            scenes=args.scenes,
+            browser_folders=1,
+            browser_items_per_folder=1,
+        ),
+        0.01,
+    )
+    client = SocketAbletonClient(port=live.port)
+    try:
+        results = fetch_results(client, args.notes)
+    finally:
+        client.disconnect()
+        live.stop()
+
+    print(
+        f"{'result':<28} {'profile':<8} {'bytes':>10} {'vs pretty':>10} {'encode':>11}"
+    )
+    for name, result in results:
+        pretty = len(encode(result, "pretty").encode("utf-8"))
+        for profile in PROFILES:
+            size = len(encode(result, profile).encode("utf-8"))
+            print(
+                f"{name:<28} {profile:<8} {size:>10,} {size / pretty:>10.0%}"
+                f" {time_encode(result, profile) * 1e6:>9.0f}us"
+            )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Cold start of the server and latency of the first tool call.
+
+    python benchmarks/bench_startup.py [--runs 5] [--tick-ms 10]
+
+Reports, each in fresh interpreters:
+
+- where import time goes, by top-level package, from ``python -X importtime``
+- time to import the ``ableton-mcp`` entry point, and to also build the
+  server, which is all it does before it can answer the host
+- the first command's latency from a new client, cold and after
+  ``warm_up``, against the control surface in a simulated Live (see
+  ``live_model``); the server warms up as a session starts
+
+Bytecode caches are written and reused like an installed package's, so
+compiling sources isn't counted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from live_model import SetSize, start_control_surface
+
+from ableton_mcp.client import AsyncAbletonClient
+
+# What ``ableton_mcp.__main__.main`` does before it runs the server
+IMPORT = "import ableton_mcp.__main__"
+BUILD = "import ableton_mcp.__main__ as entry; entry.create_server()"
+
+
+def _env() -> dict[str, str]:
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def time_python(code: str, runs: int) -> list[float]:
+    """Wall time of ``python -c code``, less an empty interpreter's."""
+    subprocess.run([sys.executable, "-c", code], env=_env(), check=True)
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], env=_env(), check=True)
+        elapsed = time.perf_counter() - started
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], env=_env(), check=True)
+        samples.append(elapsed - (time.perf_counter() - started))
+    return samples
+
+
+def import_profile(code: str) -> Counter[str]:
+    """Self import time in seconds by top-level package."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    totals: Counter[str] = Counter()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us) / 1e6
+    return totals
+
+
+async def first_call(port: int, warm: bool) -> float:
+    client = AsyncAbletonClient(port=port)
+    try:
+        if warm:
+            await client.warm_up()
+        started = time.perf_counter()
+        await client.send_command_async("get_session_info")
+        return time.perf_counter() - started
+    finally:
+        await client.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tick-ms", type=float, default=10.0)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    time_python(BUILD, 0)  # Write the bytecode caches
+    profile = import_profile(BUILD)
+    total = sum(profile.values())
+    print(f"import time of {BUILD!r}, by package (self):")
+    for package, seconds in profile.most_common(args.top):
+        print(f"  {package:<24} {seconds * 1000:>8.1f}ms {seconds / total:>6.1%}")
+    print(f"  {'total':<24} {total * 1000:>8.1f}ms")
+    print()
+
+    for name, code in [("import", IMPORT), ("import + build", BUILD)]:
+        samples = time_python(code, args.runs)
+        print(
+            f"{name:<16} median {statistics.median(samples) * 1000:>7.1f}ms"
+            f"  min {min(samples) * 1000:>7.1f}ms"
+        )
+    print()
+
+    live = start_control_surface(
+        SetSize(tracks=4, scenes=4, browser_folders=1, browser_items_per_folder=1),
+        args.tick_ms / 1000,
+    )
+    try:
+        for name, warm in [("cold", False), ("warmed up", True)]:
+            samples = [
+                asyncio.run(first_call(live.port, warm)) for _ in range(args.runs)
+            ]
+            print(
+                f"first call, {name:<10} median"
+                f" {statistics.median(samples) * 1000:>7.2f}ms"
+                f"  min {min(samples) * 1000:>7.2f}ms"
+            )
+    finally:
+        live.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,541 @@
+"""Simulated Live object model for running the real control surface.
+
+``start_control_surface`` loads ``control_surface/AbletonMCP`` against the
+stand-in ``_Framework`` and ``Live`` modules in ``simulated_live/`` and a
+``Song`` built here, then serves it on a free local port. The model covers
+what the script touches: tracks with clip slots, clips with both Live 11's
+note ids and Live 10's note calls, arrangement clips, devices with
+parameters, scenes, the master track and a browser tree. Properties fire
+``add_<name>_listener`` callbacks when set, like Live's do. Which note API
+the script uses follows the Live version it is started with.
+
+The tests drive the script through the same model, so changes made "in
+Live" should go through ``SimulatedLive.call``, on Live's main thread.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import itertools
+import socket
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+CONTROL_SURFACE = ROOT / "control_surface" / "AbletonMCP" / "__init__.py"
+SIMULATED_LIVE = Path(__file__).resolve().parent / "simulated_live"
+
+
+@dataclass
+class SetSize:
+    tracks: int = 16
+    scenes: int = 8
+    clips_per_track: int = 4
+    devices_per_track: int = 2
+    parameters_per_device: int = 16
+    notes_per_clip: int = 64
+    browser_folders: int = 20
+    browser_items_per_folder: int = 100
+
+
+class Listenable:
+    """Gives an object Live's ``add/remove/<name>_has_listener`` methods,
+    firing the listeners whenever a public attribute is assigned."""
+
+    def __getattr__(self, name: str) -> Any:
+        for prefix, suffix in (("add_", "_listener"), ("remove_", "_listener")):
+            if name.startswith(prefix) and name.endswith(suffix):
+                listeners = self._listeners_for(name[len(prefix) : -len(suffix)])
+                return listeners.append if prefix == "add_" else listeners.remove
+        if name.endswith("_has_listener"):
+            listeners = self._listeners_for(name[: -len("_has_listener")])
+            return lambda callback: callback in listeners
+        raise AttributeError(name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if not name.startswith("_"):
+            self.notify(name)
+
+    def notify(self, prop: str) -> None:
+        for callback in list(self.__dict__.get("_listeners", {}).get(prop, ())):
+            callback()
+
+    def _listeners_for(self, prop: str) -> list[Callable[[], None]]:
+        listeners = self.__dict__.setdefault("_listeners", {})
+        return listeners.setdefault(prop, [])
+
+
+_note_ids = itertools.count(1)
+
+
+class Note:
+    def __init__(
+        self,
+        pitch: int,
+        start_time: float,
+        duration: float,
+        velocity: float = 100,
+        mute: bool = False,
+        note_id: int | None = None,
+    ) -> None:
+        self.pitch = pitch
+        self.start_time = start_time
+        self.duration = duration
+        self.velocity = velocity
+        self.mute = mute
+        self.note_id = next(_note_ids) if note_id is None else note_id
+
+    def copy(self) -> Note:
+        return Note(
+            self.pitch,
+            self.start_time,
+            self.duration,
+            self.velocity,
+            self.mute,
+            self.note_id,
+        )
+
+
+class Clip(Listenable):
+    def __init__(self, length: float = 4.0, start_time: float = 0.0) -> None:
+        self.name = ""
+        self.length = length
+        self.start_time = start_time
+        self.end_time = start_time + length
+        self.loop_start = 0.0
+        self.loop_end = length
+        self.is_playing = False
+        self.is_recording = False
+        self.playing_status = 0
+        self._notes: list[Note] = []
+        self._selected = False
+
+    # Live 11 note API
+    def get_notes_extended(
+        self, from_pitch: int, pitch_span: int, from_time: float, time_span: float
+    ) -> list[Note]:
+        return [
+            note.copy()
+            for note in self._notes
+            if from_pitch <= note.pitch < from_pitch + pitch_span
+            and from_time <= note.start_time < from_time + time_span
+        ]
+
+    def get_notes_by_id(self, note_ids: list[int]) -> list[Note]:
+        wanted = set(note_ids)
+        return [note.copy() for note in self._notes if note.note_id in wanted]
+
+    def add_new_notes(self, specs: list[Any]) -> list[int]:
+        notes = [
+            Note(spec.pitch, spec.start_time, spec.duration, spec.velocity, spec.mute)
+            for spec in specs
+        ]
+        self._notes.extend(notes)
+        return [note.note_id for note in notes]
+
+    def apply_note_modifications(self, notes: list[Note]) -> None:
+        by_id = {note.note_id: note for note in notes}
+        self._notes = [by_id.get(note.note_id, note) for note in self._notes]
+
+    def remove_notes_by_id(self, note_ids: list[int]) -> None:
+        doomed = set(note_ids)
+        self._notes = [note for note in self._notes if note.note_id not in doomed]
+
+    # Selection-based API, used to replace every note at once
+    def select_all_notes(self) -> None:
+        self._selected = True
+
+    def deselect_all_notes(self) -> None:
+        self._selected = False
+
+    def replace_selected_notes(self, notes: list[tuple]) -> None:
+        if self._selected:
+            self._notes = []
+        self._notes.extend(Note(*note) for note in notes)
+
+    # Live 10 note API, as (pitch, start_time, duration, velocity, mute)
+    def get_notes(
+        self, from_time: float, from_pitch: int, time_span: float, pitch_span: int
+    ) -> tuple[tuple, ...]:
+        return tuple(
+            (note.pitch, note.start_time, note.duration, note.velocity, note.mute)
+            for note in self._in_window(from_time, from_pitch, time_span, pitch_span)
+        )
+
+    def remove_notes(
+        self, from_time: float, from_pitch: int, time_span: float, pitch_span: int
+    ) -> None:
+        doomed = self._in_window(from_time, from_pitch, time_span, pitch_span)
+        self._notes = [note for note in self._notes if note not in doomed]
+
+    def set_notes(self, notes: tuple[tuple, ...]) -> None:
+        self._notes.extend(Note(*note) for note in notes)
+
+    def _in_window(
+        self, from_time: float, from_pitch: int, time_span: float, pitch_span: int
+    ) -> list[Note]:
+        return [
+            note
+            for note in self._notes
+            if from_pitch <= note.pitch < from_pitch + pitch_span
+            and from_time <= note.start_time < from_time + time_span
+        ]
+
+
+class ClipSlot(Listenable):
+    def __init__(self) -> None:
+        self.clip: Clip | None = None
+        self._track: Track | None = None
+
+    @property
+    def has_clip(self) -> bool:
+        return self.clip is not None
+
+    def create_clip(self, length: float) -> None:
+        self.clip = Clip(length)
+        self.notify("has_clip")
+
+    def delete_clip(self) -> None:
+        self.clip = None
+        self.notify("has_clip")
+
+    def fire(self) -> None:
+        if self._track is not None:
+            self._track.fired_slot_index = self._track.clip_slots.index(self)
+
+    def stop(self) -> None:
+        if self._track is not None:
+            self._track.playing_slot_index = -1
+
+
+class Parameter(Listenable):
+    def __init__(self, name: str, value: float = 0.0) -> None:
+        self.name = name
+        self.value = value
+        self.min = 0.0
+        self.max = 1.0
+
+
+class Device(Listenable):
+    def __init__(self, name: str, parameters: int) -> None:
+        self.name = name
+        self.class_name = "OriginalSimpler"
+        self.is_active = True
+        self.parameters = [Parameter("Param %d" % i, 0.5) for i in range(parameters)]
+
+
+class MixerDevice:
+    def __init__(self) -> None:
+        self.volume = Parameter("Volume", 0.85)
+        self.panning = Parameter("Pan", 0.0)
+
+
+class Track(Listenable):
+    def __init__(self, name: str, scenes: int, has_slots: bool = True) -> None:
+        self.name = name
+        self.mute = False
+        self.solo = False
+        self.arm = False
+        self.can_be_armed = has_slots
+        self.playing_slot_index = -1
+        self.fired_slot_index = -1
+        self.devices: list[Device] = []
+        self.arrangement_clips: list[Clip] = []
+        self.mixer_device = MixerDevice()
+        self.clip_slots: list[ClipSlot] = []
+        for _ in range(scenes if has_slots else 0):
+            self._add_slot()
+
+    def _add_slot(self, index: int | None = None) -> None:
+        slot = ClipSlot()
+        slot._track = self
+        self.clip_slots.insert(len(self.clip_slots) if index is None else index, slot)
+
+    def delete_device(self, device: Device) -> None:
+        self.devices.remove(device)
+        self.notify("devices")
+
+    def create_midi_clip(self, start_time: float, length: float) -> Clip:
+        clip = Clip(length, start_time)
+        self.arrangement_clips.append(clip)
+        self.notify("arrangement_clips")
+        return clip
+
+    def duplicate_clip_to_arrangement(self, clip: Clip, time: float) -> Clip:
+        copy = self.create_midi_clip(time, clip.length)
+        copy._notes = [note.copy() for note in clip._notes]
+        return copy
+
+    def delete_clip(self, clip: Clip) -> None:
+        self.arrangement_clips.remove(clip)
+        self.notify("arrangement_clips")
+
+
+class Scene(Listenable):
+    def __init__(self, name: str, song: Song) -> None:
+        self.name = name
+        self._song = song
+
+    def fire(self) -> None:
+        index = self._song.scenes.index(self)
+        for track in self._song.tracks:
+            track.fired_slot_index = index
+
+
+class SongView:
+    def __init__(self) -> None:
+        self.selected_track: Track | None = None
+
+
+class Song(Listenable):
+    def __init__(self) -> None:
+        self.tempo = 120.0
+        self.signature_numerator = 4
+        self.signature_denominator = 4
+        self.is_playing = False
+        self.current_song_time = 0.0
+        self.loop_start = 0.0
+        self.loop_length = 16.0
+        self.view = SongView()
+        self.tracks: list[Track] = []
+        self.return_tracks: list[Track] = []
+        self.scenes: list[Scene] = []
+        self._master = Track("Master", 0, has_slots=False)
+
+    @property
+    def master_track(self) -> Track:
+        return self._master
+
+    def create_midi_track(self, index: int = -1) -> None:
+        self._insert_track(index, "MIDI")
+
+    def create_audio_track(self, index: int = -1) -> None:
+        self._insert_track(index, "Audio")
+
+    def _insert_track(self, index: int, kind: str) -> None:
+        index = len(self.tracks) if index == -1 else index
+        track = Track("%d-%s" % (index + 1, kind), len(self.scenes))
+        self.tracks.insert(index, track)
+        self.notify("tracks")
+
+    def delete_track(self, index: int) -> None:
+        del self.tracks[index]
+        self.notify("tracks")
+
+    def create_scene(self, index: int = -1) -> Scene:
+        index = len(self.scenes) if index == -1 else index
+        scene = Scene("", self)
+        self.scenes.insert(index, scene)
+        for track in self.tracks:
+            track._add_slot(index)
+        self.notify("scenes")
+        return scene
+
+    def delete_scene(self, index: int) -> None:
+        del self.scenes[index]
+        for track in self.tracks:
+            del track.clip_slots[index]
+        self.notify("scenes")
+
+    def back_to_arranger(self) -> None:
+        pass
+
+    def start_playing(self) -> None:
+        self.is_playing = True
+
+    def stop_playing(self) -> None:
+        self.is_playing = False
+
+
+class BrowserItem:
+    def __init__(
+        self,
+        name: str,
+        uri: str,
+        children: list[BrowserItem] | None = None,
+        is_folder: bool = False,
+    ) -> None:
+        self.name = name
+        self.uri = uri
+        self.children = children or []
+        self.is_folder = is_folder
+        self.is_loadable = not is_folder
+        self.is_device = not is_folder
+
+
+class Browser:
+    ROOTS = (
+        "instruments",
+        "audio_effects",
+        "midi_effects",
+        "sounds",
+        "drums",
+        "max_for_live",
+    )
+
+    def __init__(self, song: Song, folders: int, items_per_folder: int) -> None:
+        self._song = song
+        self._parameters = 8
+        for root in self.ROOTS:
+            setattr(self, root, self._make_root(root, folders, items_per_folder))
+
+    @staticmethod
+    def _make_root(root: str, folders: int, items: int) -> BrowserItem:
+        label = root.replace("_", " ").title()
+        return BrowserItem(
+            label,
+            "query:%s" % label.replace(" ", ""),
+            [
+                BrowserItem(
+                    "%s Folder %d" % (label, f),
+                    "query:%s#Folder%d" % (label.replace(" ", ""), f),
+                    [
+                        BrowserItem(
+                            "%s Preset %d-%d" % (label, f, i),
+                            "query:%s#Folder%d:Preset%d"
+                            % (label.replace(" ", ""), f, i),
+                        )
+                        for i in range(items)
+                    ],
+                    is_folder=True,
+                )
+                for f in range(folders)
+            ],
+            is_folder=True,
+        )
+
+    def load_item(self, item: BrowserItem) -> None:
+        track = self._song.view.selected_track
+        if track is not None:
+            track.devices.append(Device(item.name, self._parameters))
+            track.notify("devices")
+
+
+class Application:
+    def __init__(self, browser: Browser, version: tuple[int, int, int]) -> None:
+        self.browser = browser
+        self._version = version
+
+    def get_major_version(self) -> int:
+        return self._version[0]
+
+    def get_minor_version(self) -> int:
+        return self._version[1]
+
+    def get_bugfix_version(self) -> int:
+        return self._version[2]
+
+
+def build_song(size: SetSize) -> Song:
+    song = Song()
+    for s in range(size.scenes):
+        song.scenes.append(Scene("Scene %d" % (s + 1), song))
+    for t in range(size.tracks):
+        track = Track("Track %d" % (t + 1), size.scenes)
+        for d in range(size.devices_per_track):
+            track.devices.append(
+                Device("Device %d" % (d + 1), size.parameters_per_device)
+            )
+        for slot in track.clip_slots[: size.clips_per_track]:
+            slot.create_clip(4.0)
+            assert slot.clip is not None
+            slot.clip._notes = make_notes(size.notes_per_clip)
+        song.tracks.append(track)
+    song.return_tracks = [Track("A-Reverb", 0, has_slots=False)]
+    return song
+
+
+def make_notes(count: int) -> list[Note]:
+    return [Note(36 + i % 24, (i * 0.25) % 64, 0.25, 64 + i % 64) for i in range(count)]
+
+
+@dataclass
+class SimulatedLive:
+    song: Song
+    surface: Any
+    module: ModuleType
+    port: int
+
+    @property
+    def browser(self) -> Browser:
+        return self.surface.application().browser
+
+    def call(self, function: Callable[[], Any], timeout: float = 5.0) -> Any:
+        """Run ``function`` on Live's main thread, as an edit made in Live
+        would, and return its result."""
+        done = threading.Event()
+        outcome: list[Any] = []
+
+        def run() -> None:
+            try:
+                outcome.append((function(), None))
+            except Exception as e:
+                outcome.append((None, e))
+            done.set()
+
+        self.surface.schedule_message(0, run)
+        if not done.wait(timeout):
+            raise TimeoutError("Live's main thread didn't run the call")
+        result, error = outcome[0]
+        if error is not None:
+            raise error
+        return result
+
+    def wait_for_browser_index(self, timeout: float = 30.0) -> None:
+        deadline = time.monotonic() + timeout
+        while not self.surface._browser_index.ready:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Browser index was not built in time")
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        self.surface.disconnect()
+
+
+def start_control_surface(
+    size: SetSize,
+    tick: float,
+    live_version: tuple[int, int, int] = (12, 1, 0),
+    browser_index_path: str | None = None,
+) -> SimulatedLive:
+    """Load the real control surface against a simulated set and start it.
+
+    The browser index is kept at ``browser_index_path``, by default in a
+    new temporary directory so every start indexes from scratch.
+    """
+    if str(SIMULATED_LIVE) not in sys.path:
+        sys.path.insert(0, str(SIMULATED_LIVE))
+    from _Framework.ControlSurface import ControlSurface
+
+    song = build_song(size)
+    ControlSurface.TICK = tick
+    ControlSurface.song_obj = song
+    ControlSurface.app_obj = Application(
+        Browser(song, size.browser_folders, size.browser_items_per_folder),
+        live_version,
+    )
+
+    spec = importlib.util.spec_from_file_location("AbletonMCP", CONTROL_SURFACE)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.PORT = _free_port()
+    # Start from an empty browser index rather than one left by a real Live
+    module.BROWSER_INDEX_PATH = browser_index_path or str(
+        Path(tempfile.mkdtemp(prefix="ableton-mcp-bench-")) / "browser_index.json"
+    )
+    surface = module.create_instance(None)
+    return SimulatedLive(song, surface, module, module.PORT)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
@@ -0,0 +1,20 @@
+"""Stand-in for the parts of Live's ``Live`` module the script uses."""
+
+from __future__ import annotations
+
+
+class Clip:
+    class MidiNoteSpecification:
+        def __init__(
+            self,
+            pitch: int,
+            start_time: float,
+            duration: float,
+            velocity: float = 100,
+            mute: bool = False,
+        ) -> None:
+            self.pitch = pitch
+            self.start_time = start_time
+            self.duration = duration
+            self.velocity = velocity
+            self.mute = mute
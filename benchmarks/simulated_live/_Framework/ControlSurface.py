@@ -0,0 +1,61 @@
+"""Stand-in for Live's ``_Framework.ControlSurface`` base class.
+
+A daemon thread plays the part of Live's main thread: every ``TICK``
+seconds it runs the callbacks whose ``schedule_message`` delay has elapsed,
+then ``update_display``, as Live does on each tick. The song and
+application the script sees are set on the class before it is created.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable
+
+
+class ControlSurface:
+    #: Seconds between main-thread ticks
+    TICK = 0.1
+    song_obj: Any = None
+    app_obj: Any = None
+
+    def __init__(self, c_instance: Any) -> None:
+        self._scheduled: list[tuple[int, Callable[[], None]]] = []
+        self._schedule_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.log: list[str] = []
+        self._main_thread = threading.Thread(
+            target=self._run, name="live-main", daemon=True
+        )
+        self._main_thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.TICK):
+            with self._schedule_lock:
+                due = [callback for delay, callback in self._scheduled if delay <= 0]
+                self._scheduled = [
+                    (delay - 1, callback)
+                    for delay, callback in self._scheduled
+                    if delay > 0
+                ]
+            for callback in due:
+                callback()
+            self.update_display()
+
+    def schedule_message(self, delay_in_ticks: int, callback: Callable[[], None]):
+        with self._schedule_lock:
+            self._scheduled.append((delay_in_ticks, callback))
+
+    def update_display(self) -> None:
+        pass
+
+    def song(self) -> Any:
+        return self.song_obj
+
+    def application(self) -> Any:
+        return self.app_obj
+
+    def log_message(self, message: str) -> None:
+        self.log.append(message)
+
+    def disconnect(self) -> None:
+        self._stopped.set()
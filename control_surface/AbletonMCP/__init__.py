@@ -1,26 +1,886 @@
 from __future__ import absolute_import
 
+import array
+import base64
+import bisect
+import collections
+import difflib
+import hashlib
+import heapq
 import json
+import math
+import os
+import re
 import socket
+import struct
+import sys
 import threading
 import time
 import traceback
+import types
 
 try:
     import Queue as queue
 except ImportError:
     import queue
 
+try:
+    import Live
+except ImportError:
+    Live = None  # Only importable inside Live
+
 from _Framework.ControlSurface import ControlSurface
 
 HOST = "127.0.0.1"
 PORT = 9877
+RECV_SIZE = 8192
+# Seconds of queued main-thread work to run per Live tick before yielding
+# back to Live. Whatever is left over runs on the following tick.
+TICK_BUDGET = 0.02
+# How long a browser load may take before the new device is reported missing,
+# and how long a track selection is given to settle before loading onto it.
+DEVICE_LOAD_TIMEOUT = 3.0
+TRACK_SELECT_SETTLE = 0.2
+BROWSER_INDEX_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "browser_index.json"
+)
+# Maximum number of browser items kept in the URI lookup cache, and how often
+# (in seconds) the browser is checked for changed content.
+URI_CACHE_SIZE = 512
+BROWSER_CHECK_INTERVAL = 30.0
+# Number of recent idempotency keys whose responses are remembered, so a
+# command retried after a dropped connection is answered instead of re-run.
+IDEMPOTENCY_CACHE_SIZE = 256
+# Upper bounds, in milliseconds, of the buckets command latencies are counted
+# in: four per doubling from 10 us to about 70 s, so a percentile read from
+# the buckets is within 19% of the true value.
+LATENCY_BUCKETS_MS = [0.01 * 2 ** (i / 4.0) for i in range(92)]
+# Default seconds between transport updates pushed to a subscriber. Updates
+# are sent from update_display, so Live's display refresh (around 100 ms)
+# is the fastest they can come.
+TRANSPORT_INTERVAL = 0.1
+
+# Parts of the set get_session_snapshot can describe. Clip slots,
+# arrangement clips and devices are nested in each track.
+SNAPSHOT_SECTIONS = (
+    "tracks",
+    "return_tracks",
+    "master",
+    "scenes",
+    "clip_slots",
+    "arrangement_clips",
+    "devices",
+)
+
+# Clip properties watched for change events: those the snapshot reports,
+# and the loop and markers a clip's length follows, as Live has no listener
+# for the length itself. Properties Live can't watch are skipped.
+WATCHED_CLIP_PROPERTIES = (
+    "name",
+    "length",
+    "is_playing",
+    "playing_status",
+    "start_time",
+    "end_time",
+    "looping",
+    "loop_start",
+    "loop_end",
+    "start_marker",
+    "end_marker",
+)
+
+# What else reads report about a clip or the song. No event describes these,
+# but a change still moves the change counter, so cached reads see it.
+UNREPORTED_CLIP_PROPERTIES = ("notes", "is_recording")
+UNREPORTED_SONG_PROPERTIES = ("loop", "loop_start", "loop_length")
+
+# Browser roots that are indexed and searched, keyed as in get_browser_tree
+BROWSER_ROOT_NAMES = {
+    "instruments": "Instruments",
+    "audio_effects": "Audio Effects",
+    "midi_effects": "MIDI Effects",
+    "sounds": "Sounds",
+    "drums": "Drums",
+    "max_for_live": "Max for Live",
+}
+
+MAX_RECV_SIZE = 1024 * 1024
+# Largest message accepted from a client. A connection announcing or sending
+# a bigger one is closed rather than buffered, so a corrupt length header
+# can't make the socket thread hold gigabytes.
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+# Framed connections prefix every JSON message with its byte length as a
+# 4-byte big-endian unsigned int. Connections start unframed (legacy) and are
+# upgraded when the client asks for framing in its "hello" (or, from older
+# clients, a "set_framing" command).
+FRAME_HEADER = struct.Struct(">I")
+FRAMING_LENGTH_PREFIXED = "length"
+# Bumped when the messages themselves change, so a client can tell what it
+# is talking to from the hello reply
+PROTOCOL_VERSION = 1
+# What a framed connection offers, reported by the handshake. Live 11+ also
+# offers "note_ids": notes with stable IDs, edited in place.
+FEATURES = ("idempotency", "columnar_notes", "events", "transport")
+_WHITESPACE = frozenset(bytearray(b" \t\r\n"))
+_CLOSE_BRACE = ord("}")
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+# Notes travel either as a list of {pitch, start_time, ...} objects or, much
+# more compactly, in columnar form: one little-endian packed array per field,
+# base64 encoded, with the array typecode each field is packed as. Notes read
+# from Live 11+ also carry their note_id.
+NOTE_FORMAT_OBJECTS = "objects"
+NOTE_FORMAT_COLUMNAR = "columnar"
+_NOTE_FIELDS = ("pitch", "start_time", "duration", "velocity", "mute")
+_NOTE_TYPECODES = ("B", "d", "d", "f", "B")
+_NOTE_ID_TYPECODE = "I"
+# How far (in beats) a note may be from the start_time it is looked up by
+NOTE_TIME_TOLERANCE = 1e-4
+
+
+def _tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _pack_column(typecode, values):
+    packed = array.array(typecode, values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    to_bytes = getattr(packed, "tobytes", None) or packed.tostring
+    return base64.b64encode(to_bytes()).decode("ascii")
+
+
+def _unpack_column(typecode, data):
+    packed = array.array(typecode)
+    from_bytes = getattr(packed, "frombytes", None) or packed.fromstring
+    from_bytes(base64.b64decode(data))
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed
+
+
+def _note_position(note):
+    """Sort key for note tuples: start_time, then pitch."""
+    return note[1], note[0]
+
+
+def _encode_note_columns(notes):
+    """Pack (pitch, start_time, duration, velocity, mute[, note_id]) tuples
+    by column."""
+    columns = {"format": NOTE_FORMAT_COLUMNAR, "count": len(notes)}
+    values = list(zip(*notes)) or [()] * len(_NOTE_FIELDS)
+    for field, typecode, column in zip(_NOTE_FIELDS, _NOTE_TYPECODES, values):
+        columns[field] = _pack_column(typecode, column)
+    if len(values) > len(_NOTE_FIELDS):
+        columns["note_id"] = _pack_column(_NOTE_ID_TYPECODE, values[-1])
+    return columns
+
+
+def _decode_note_columns(columns):
+    """Unpack columnar notes into (pitch, start, duration, velocity, mute)."""
+    count = columns.get("count", 0)
+    unpacked = []
+    for field, typecode in zip(_NOTE_FIELDS, _NOTE_TYPECODES):
+        column = _unpack_column(typecode, columns.get(field, ""))
+        if len(column) != count:
+            raise ValueError(
+                "Column '%s' holds %d notes, expected %d"
+                % (field, len(column), count)
+            )
+        unpacked.append(column)
+    pitches, starts, durations, velocities, mutes = unpacked
+    return [
+        (pitches[i], starts[i], durations[i], int(velocities[i]), bool(mutes[i]))
+        for i in range(count)
+    ]
+
+
+# Note transforms for transform_clip_notes. Each takes notes as
+# [pitch, start_time, duration, velocity, mute, key] lists, changes them in
+# place and returns those to keep; key is how the caller finds each note's
+# original. ableton_mcp.transforms applies the same ones on the server.
+
+
+def _op_number(operation, name, default=None):
+    value = operation.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError("%s needs a number for %s" % (operation.get("op"), name))
+    return value
+
+
+def _transpose(notes, operation):
+    semitones = int(_op_number(operation, "semitones"))
+    kept = []
+    for note in notes:
+        note[0] += semitones
+        if 0 <= note[0] <= 127:
+            kept.append(note)
+    return kept
+
+
+def _quantize(notes, operation):
+    grid = _op_number(operation, "grid")
+    strength = _op_number(operation, "strength", 1.0)
+    if grid <= 0 or not 0 <= strength <= 1:
+        raise ValueError("quantize needs a grid above 0 and strength from 0 to 1")
+    for note in notes:
+        target = math.floor(note[1] / grid + 0.5) * grid
+        note[1] += (target - note[1]) * strength
+    return notes
+
+
+def _velocity(notes, operation):
+    curve = _op_number(operation, "curve", 1.0)
+    scale = _op_number(operation, "scale", 1.0)
+    offset = _op_number(operation, "offset", 0.0)
+    low = _op_number(operation, "min", 1)
+    high = _op_number(operation, "max", 127)
+    if curve <= 0 or not 0 <= low <= high <= 127:
+        raise ValueError("velocity needs a curve above 0 and 0 <= min <= max <= 127")
+    for note in notes:
+        value = 127.0 * (note[3] / 127.0) ** curve * scale + offset
+        note[3] = min(high, max(low, value))
+    return notes
+
+
+def _stretch(notes, operation):
+    factor = _op_number(operation, "factor")
+    origin = _op_number(operation, "origin", 0.0)
+    if factor <= 0:
+        raise ValueError("stretch needs a factor above 0")
+    for note in notes:
+        note[1] = max(0.0, origin + (note[1] - origin) * factor)
+        note[2] *= factor
+    return notes
+
+
+def _pitch_filter(notes, operation):
+    low = _op_number(operation, "pitch_min", 0)
+    high = _op_number(operation, "pitch_max", 127)
+    return [note for note in notes if low <= note[0] <= high]
+
+
+def _legato(notes, operation):
+    gap = _op_number(operation, "gap", 0.0)
+    if gap < 0:
+        raise ValueError("legato needs a gap of at least 0")
+    starts = sorted(set(note[1] for note in notes))
+    for note in notes:
+        # Until the next note to start, of any pitch; the last ones keep
+        # their length
+        i = bisect.bisect_right(starts, note[1])
+        if i < len(starts):
+            length = starts[i] - note[1]
+            note[2] = length - gap if length > gap else length
+    return notes
+
+
+NOTE_TRANSFORMS = {
+    "transpose": _transpose,
+    "quantize": _quantize,
+    "velocity": _velocity,
+    "stretch": _stretch,
+    "pitch_filter": _pitch_filter,
+    "legato": _legato,
+}
+
+
+def _transform_notes(notes, operations):
+    """Apply transform operations in order, e.g. [{"op": "transpose",
+    "semitones": 12}, {"op": "quantize", "grid": 0.25}]."""
+    for operation in operations:
+        transform = NOTE_TRANSFORMS.get(operation.get("op"))
+        if transform is None:
+            raise ValueError("Unknown note transform: %s" % operation.get("op"))
+        notes = transform(notes, operation)
+    return notes
 
 
 def create_instance(c_instance):
     return AbletonMCP(c_instance)
 
 
+class _Result(object):
+    """Yielded by a continuation handler to finish with ``value``.
+
+    Handlers that must wait on Live (e.g. for a device to load) are written
+    as generators: each bare ``yield`` hands the main thread back to Live
+    until the next tick, and the final ``yield _Result(value)`` completes the
+    command. This keeps the script compatible with Live's Python 2 runtime,
+    where generators cannot return values.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class _MessageStream(object):
+    """Reads and writes JSON messages on one client socket.
+
+    In legacy mode messages are written back to back and the end of a message
+    is only known once the buffer parses, so a parse is attempted only when
+    the buffer could plausibly be complete. In framed mode each message is
+    read by its length prefix and parsed exactly once.
+
+    Outgoing messages go through a queue drained by a dedicated writer thread,
+    so replies can be sent from any thread (including Live's main thread)
+    without blocking on the socket.
+    """
+
+    def __init__(self, sock):
+        self._sock = sock
+        self._buffer = bytearray()
+        self._outbox = queue.Queue()
+        self.framed = False
+        # Seconds the last message took to arrive once its first byte had,
+        # and to parse
+        self.receive_time = 0.0
+        self.parse_time = 0.0
+        self._receive_started = None
+        writer = threading.Thread(target=self._write_loop)
+        writer.daemon = True
+        writer.start()
+
+    def read(self):
+        """Return the next message, or None once the peer has disconnected."""
+        self._receive_started = time.time() if self._buffer else None
+        if self.framed:
+            return self._read_frame()
+        return self._read_legacy()
+
+    def send(self, message, on_sent=None):
+        """Queue a message for sending, encoded in the current framing mode.
+
+        ``on_sent`` is called from the writer thread once it has been sent.
+        """
+        self._outbox.put((message, self.framed, on_sent))
+
+    def close(self):
+        """Close the socket once every queued message has been sent."""
+        self._outbox.put(None)
+
+    def _write_loop(self):
+        try:
+            while True:
+                item = self._outbox.get()
+                if item is None:
+                    break
+                message, framed, on_sent = item
+                payload = json.dumps(message).encode("utf-8")
+                if framed:
+                    payload = FRAME_HEADER.pack(len(payload)) + payload
+                self._sock.sendall(payload)
+                if on_sent is not None:
+                    on_sent()
+        except Exception:
+            pass
+        finally:
+            try:
+                self._sock.close()
+            except Exception:
+                pass
+
+    def _fill(self, size=RECV_SIZE):
+        data = self._sock.recv(size)
+        if not data:
+            return False
+        if self._receive_started is None:
+            self._receive_started = time.time()
+        self._buffer.extend(data)
+        return True
+
+    def _parse(self, payload):
+        received = time.time()
+        self.receive_time = received - self._receive_started
+        message = json.loads(payload.decode("utf-8"))
+        self.parse_time = time.time() - received
+        return message
+
+    def _read_frame(self):
+        while len(self._buffer) < FRAME_HEADER.size:
+            if not self._fill():
+                return None
+        length = FRAME_HEADER.unpack(bytes(self._buffer[:FRAME_HEADER.size]))[0]
+        if length > MAX_MESSAGE_SIZE:
+            raise ValueError(
+                "Frame of %d bytes exceeds the %d byte limit"
+                % (length, MAX_MESSAGE_SIZE)
+            )
+        end = FRAME_HEADER.size + length
+        while len(self._buffer) < end:
+            remaining = end - len(self._buffer)
+            if not self._fill(max(RECV_SIZE, min(remaining, MAX_RECV_SIZE))):
+                return None
+        payload = bytes(self._buffer[FRAME_HEADER.size:end])
+        del self._buffer[:end]
+        return self._parse(payload)
+
+    def _read_legacy(self):
+        while True:
+            if self._may_be_complete():
+                try:
+                    message = self._parse(bytes(self._buffer))
+                except ValueError:
+                    # Incomplete JSON, keep buffering
+                    pass
+                else:
+                    del self._buffer[:]
+                    return message
+            if len(self._buffer) > MAX_MESSAGE_SIZE:
+                raise ValueError(
+                    "Message exceeds the %d byte limit" % MAX_MESSAGE_SIZE
+                )
+            if not self._fill():
+                return None
+
+    def _may_be_complete(self):
+        # A complete JSON object ends with "}". Only the tail is inspected so
+        # the check stays O(1) as the buffer grows.
+        i = len(self._buffer) - 1
+        while i >= 0 and self._buffer[i] in _WHITESPACE:
+            i -= 1
+        return i >= 0 and self._buffer[i] == _CLOSE_BRACE
+
+
+class _LRUCache(object):
+    """Thread-safe, size-bounded mapping that evicts least recently used keys."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                # Re-insert to mark as most recently used
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+class _LatencyHistogram(object):
+    """Counts latencies in the fixed ``LATENCY_BUCKETS_MS`` buckets, so memory
+    stays constant however many commands are recorded."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile."""
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                if i < len(LATENCY_BUCKETS_MS):
+                    return min(LATENCY_BUCKETS_MS[i], self.max)
+                break
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50), 3),
+            "p90_ms": round(self.percentile(90), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(self.max, 3),
+        }
+
+
+class _CommandTiming(object):
+    """Seconds one command spent in each phase on its way through."""
+
+    __slots__ = ("command_type", "phases", "received")
+
+    def __init__(self, command_type, receive, parse):
+        self.command_type = command_type
+        self.phases = {"receive": receive, "parse": parse}
+        self.received = time.time()
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+class _PerformanceStats(object):
+    """Latency histograms per command type and phase.
+
+    The phases are ``receive`` (first byte to last), ``parse``, ``queue``
+    (waiting for the main thread), ``handler`` (running on it, summed over
+    every tick a continuation takes), ``serialize`` (encoding and writing
+    the reply) and ``total``, from first byte to reply sent.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def record(self, timing):
+        phases = dict(timing.phases)
+        phases["total"] = (
+            time.time() - timing.received + phases["receive"] + phases["parse"]
+        )
+        with self._lock:
+            by_phase = self._histograms.setdefault(timing.command_type, {})
+            for phase, seconds in phases.items():
+                histogram = by_phase.get(phase)
+                if histogram is None:
+                    histogram = by_phase[phase] = _LatencyHistogram()
+                histogram.add(seconds * 1000.0)
+
+    def summary(self):
+        summary = {}
+        with self._lock:
+            for command_type, by_phase in self._histograms.items():
+                summary[command_type] = dict(
+                    (phase, histogram.summary())
+                    for phase, histogram in by_phase.items()
+                )
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+
+class _BrowserIndex(object):
+    """URI -> item and name -> items index over Live's browser.
+
+    It also keeps an inverted index from name and path tokens to URIs, which
+    backs ranked full-text search (see ``search``).
+
+    The index is filled a time slice at a time on the main thread (see
+    ``build``) and persisted as URI -> browser path. After a Live restart the
+    saved paths answer lookups straight away: resolving one means walking a
+    single path rather than searching the whole tree. A fingerprint of the
+    Live version and the top two levels of the browser stops an index built
+    for another library from being reused, and the tree is walked again in
+    the background to catch changes further down. Changes made after that
+    walk below the top two levels don't move the fingerprint; a lookup that
+    finds one marks the index ``stale`` instead, so it is rebuilt.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path):
+        self._path = path
+        self._items = {}  # uri -> browser item resolved in this session
+        self._paths = {}  # uri -> [root key, child name, ...]
+        self._folders = set()  # uris of folder items
+        self._by_name = {}  # item name -> [uri, ...]
+        self._postings = {}  # token -> {uri: token is in the item's own name}
+        self._sorted_tokens = None  # sorted postings keys, for prefix lookup
+        # Guards what search reads off the main thread: postings, paths and
+        # folders
+        self._lock = threading.Lock()
+        self._persisted = None
+        self._load_done = threading.Event()
+        self._cancelled = False
+        self.ready = False
+        # Set once the walk has finished, after which a lookup that finds
+        # an item the index lacks, or a path that no longer resolves, sets
+        # stale: the library has changed since
+        self.built = False
+        self.stale = False
+
+    def __len__(self):
+        return len(self._paths)
+
+    def cancel(self):
+        """Stop an in-progress ``build`` without saving."""
+        self._cancelled = True
+
+    def skip_load(self):
+        """Build from the live browser without consulting the persisted index."""
+        self._load_done.set()
+
+    def stats(self):
+        return {
+            "ready": self.ready,
+            "items": len(self._paths),
+            "resolved": len(self._items),
+        }
+
+    def load(self):
+        """Read the persisted index. Safe to call off the main thread."""
+        try:
+            with open(self._path) as f:
+                data = json.load(f)
+            if data.get("version") == self.VERSION:
+                self._persisted = data
+        except (IOError, OSError, ValueError):
+            pass
+        finally:
+            self._load_done.set()
+
+    def build(self, roots, fingerprint, max_depth=25, time_slice=0.005):
+        """Continuation that indexes every browser item under ``roots``.
+
+        ``roots`` is a list of (key, browser item) pairs. A persisted index
+        with a matching fingerprint is adopted and answers straight away.
+        Either way the tree is walked breadth-first, yielding to Live
+        whenever ``time_slice`` seconds have been spent on the current tick,
+        and items the walk no longer finds are dropped.
+        """
+        while not self._load_done.is_set():
+            yield
+        persisted, self._persisted = self._persisted, None
+        if persisted is not None and persisted.get("fingerprint") == fingerprint:
+            for uri, (path, is_folder) in persisted["entries"].items():
+                self._add(uri, None, path, is_folder)
+            self.ready = True
+        seen = set()
+        pending = collections.deque(
+            (child, [key], 1) for key, root in roots for child in root.children
+        )
+        deadline = time.time() + time_slice
+        while pending:
+            if time.time() >= deadline:
+                yield
+                if self._cancelled:
+                    yield _Result(len(self))
+                deadline = time.time() + time_slice
+            item, parent_path, depth = pending.popleft()
+            path = parent_path + [item.name]
+            uri = getattr(item, "uri", "")
+            if uri:
+                seen.add(uri)
+                self._add(uri, item, path, getattr(item, "is_folder", True))
+            if depth < max_depth and hasattr(item, "children"):
+                pending.extend((c, path, depth + 1) for c in item.children)
+        self._drop([uri for uri in self._paths if uri not in seen])
+        self.ready = self.built = True
+        self._save(fingerprint)
+        yield _Result(len(self))
+
+    def remember(self, uri, item, path):
+        """Index an item found by walking the tree after ``find`` missed."""
+        self._add(uri, item, path, getattr(item, "is_folder", False))
+        if self.built:
+            self.stale = True
+
+    def find(self, uri, roots):
+        item = self._items.get(uri)
+        if item is None and uri in self._paths:
+            item = self._resolve(self._paths[uri], roots)
+            if item is not None:
+                self._items[uri] = item
+            elif self.built:
+                self.stale = True
+        return item
+
+    def find_by_name(self, name, roots):
+        for uri in self._by_name.get(name, ()):
+            if uri not in self._folders:
+                item = self.find(uri, roots)
+                if item is not None:
+                    return item
+        return None
+
+    def search(self, query, category=None, limit=20):
+        """Rank indexed items against ``query``. Safe off the main thread.
+
+        Every query term must match a token of the item's name or path, either
+        exactly or as a prefix; a term that matches no token at all is
+        replaced by its closest tokens to tolerate typos. Name matches rank
+        above path matches, and an exact full-name match ranks first.
+        """
+        terms = _tokenize(query)
+        if not terms:
+            return []
+        wanted = query.strip().lower()
+        with self._lock:
+            if self._sorted_tokens is None:
+                self._sorted_tokens = sorted(self._postings)
+            scores = None
+            for term in terms:
+                term_scores = {}
+                for token in self._expand(term):
+                    exact = token == term
+                    for uri, in_name in self._postings[token].items():
+                        weight = (3 if exact else 2) if in_name else 1
+                        if weight > term_scores.get(uri, 0):
+                            term_scores[uri] = weight
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = dict(
+                        (uri, score + term_scores[uri])
+                        for uri, score in scores.items()
+                        if uri in term_scores
+                    )
+                if not scores:
+                    return []
+            ranked = []
+            for uri, score in scores.items():
+                path = self._paths[uri]
+                if category and path[0] != category:
+                    continue
+                if os.path.splitext(path[-1])[0].lower() == wanted:
+                    score += 5
+                if uri not in self._folders:
+                    score += 1
+                ranked.append((-score, len(path[-1]), path[-1], uri))
+            best = heapq.nsmallest(limit, ranked)
+            return [
+                {
+                    "name": name,
+                    "uri": uri,
+                    "path": "/".join(
+                        [BROWSER_ROOT_NAMES.get(self._paths[uri][0], "")]
+                        + self._paths[uri][1:]
+                    ),
+                    "is_folder": uri in self._folders,
+                    "score": -neg_score,
+                }
+                for neg_score, _, name, uri in best
+            ]
+
+    def _expand(self, term):
+        tokens = self._sorted_tokens
+        matches = []
+        i = bisect.bisect_left(tokens, term)
+        while i < len(tokens) and tokens[i].startswith(term):
+            matches.append(tokens[i])
+            i += 1
+        if not matches:
+            matches = difflib.get_close_matches(term, tokens, n=3, cutoff=0.8)
+        return matches
+
+    def _add(self, uri, item, path, is_folder):
+        if self._paths.get(uri, path) != path:
+            self._drop([uri])  # Moved or renamed, so index it afresh
+        # Everything search reads about an item is in place before the
+        # postings that lead search to it are published
+        with self._lock:
+            is_new = uri not in self._paths
+            if is_new:
+                self._by_name.setdefault(path[-1], []).append(uri)
+            self._paths[uri] = path
+            if item is not None:
+                self._items[uri] = item
+            if is_folder:
+                self._folders.add(uri)
+            if is_new:
+                self._index_tokens(uri, path)
+
+    def _drop(self, uris):
+        with self._lock:
+            for uri in uris:
+                path = self._paths.pop(uri)
+                self._items.pop(uri, None)
+                self._folders.discard(uri)
+                names = self._by_name.get(path[-1], [])
+                if uri in names:
+                    names.remove(uri)
+                name_tokens, path_tokens = self._tokens(path)
+                for token in name_tokens | path_tokens:
+                    postings = self._postings[token]
+                    postings.pop(uri, None)
+                    if not postings:
+                        del self._postings[token]
+                        self._sorted_tokens = None
+
+    def _tokens(self, path):
+        """Tokens of an item's own name, and of the folders above it."""
+        name_tokens = set(_tokenize(path[-1]))
+        path_tokens = set(_tokenize(" ".join(
+            [BROWSER_ROOT_NAMES.get(path[0], path[0])] + path[1:-1]
+        )))
+        return name_tokens, path_tokens
+
+    def _index_tokens(self, uri, path):
+        name_tokens, path_tokens = self._tokens(path)
+        for token in name_tokens | path_tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._sorted_tokens = None
+            postings[uri] = token in name_tokens
+
+    def _resolve(self, path, roots):
+        items = [root for key, root in roots if key == path[0]]
+        for name in path[1:]:
+            if not items:
+                return None
+            items = [c for c in items[0].children if c.name == name]
+        return items[0] if items else None
+
+    def _save(self, fingerprint):
+        data = {
+            "version": self.VERSION,
+            "fingerprint": fingerprint,
+            "entries": dict(
+                (uri, [path, uri in self._folders])
+                for uri, path in self._paths.items()
+            ),
+        }
+
+        def write():
+            tmp_path = self._path + ".tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump(data, f)
+                if os.path.exists(self._path):
+                    os.remove(self._path)
+                os.rename(tmp_path, self._path)
+            except (IOError, OSError):
+                pass
+
+        t = threading.Thread(target=write)
+        t.daemon = True
+        t.start()
+
+
 class AbletonMCP(ControlSurface):
 
     # Registry: command_type -> (method_name, requires_main_thread)
@@ -28,8 +888,11 @@ class AbletonMCP(ControlSurface):
         # Read-only (safe on socket thread)
         "get_session_info": ("_get_session_info", False),
         "get_track_info": ("_get_track_info", False),
+        "get_session_snapshot": ("_get_session_snapshot", False),
+        "get_transport": ("_get_transport", False),
         "get_browser_tree": ("_get_browser_tree", False),
         "get_browser_items_at_path": ("_get_browser_items_at_path", False),
+        "search_browser": ("_search_browser", False),
         # State-modifying (must run on main thread)
         "create_midi_track": ("_create_midi_track", True),
         "create_audio_track": ("_create_audio_track", True),
@@ -42,6 +905,8 @@ class AbletonMCP(ControlSurface):
         "set_track_solo": ("_set_track_solo", True),
         "create_clip": ("_create_clip", True),
         "add_notes_to_clip": ("_add_notes_to_clip", True),
+        "apply_note_diff": ("_apply_note_diff", True),
+        "transform_clip_notes": ("_transform_clip_notes", True),
         "set_clip_name": ("_set_clip_name", True),
         "fire_clip": ("_fire_clip", True),
         "stop_clip": ("_stop_clip", True),
@@ -60,6 +925,11 @@ class AbletonMCP(ControlSurface):
         "duplicate_arrangement_clip": ("_duplicate_arrangement_clip", True),
         "get_arrangement_clip_notes": ("_get_arrangement_clip_notes", False),
         "set_arrangement_clip_notes": ("_set_arrangement_clip_notes", True),
+        "apply_arrangement_note_diff": ("_apply_arrangement_note_diff", True),
+        "transform_arrangement_clip_notes": (
+            "_transform_arrangement_clip_notes",
+            True,
+        ),
         "set_song_time": ("_set_song_time", True),
         "get_arrangement_loop": ("_get_arrangement_loop", False),
         "set_arrangement_loop": ("_set_arrangement_loop", True),
@@ -84,20 +954,66 @@ class AbletonMCP(ControlSurface):
         "get_device_parameters": ("_get_device_parameters", False),
         "set_device_parameter": ("_set_device_parameter", True),
         "undo": ("_undo", True),
+        # Batching
+        "batch": ("_batch", True),
+        # Diagnostics
+        "get_cache_stats": ("_get_cache_stats", False),
+        "get_performance_stats": ("_get_performance_stats", False),
     }
 
     def __init__(self, c_instance):
         ControlSurface.__init__(self, c_instance)
         self._command_queue = queue.Queue()
-        self._response_queues = {}
+        self._tick_budget = TICK_BUDGET
+        self._drain_lock = threading.Lock()
+        self._drain_scheduled = False
+        # (generator, reply, timing) resumed next tick
+        self._continuations = []
+        self._performance = _PerformanceStats()
+        self._max_queue_depth = 0
+        self._loading_device = False
         self._server_socket = None
         self._running = False
-        self._uri_cache = {}  # URI -> browser item, avoids repeated deep tree searches
+        # URI -> browser item, avoids repeated deep tree searches
+        self._uri_cache = _LRUCache(URI_CACHE_SIZE)
+        # Idempotency key -> response, or the replies waiting on it if the
+        # original command is still running
+        self._idempotency_keys = _LRUCache(IDEMPOTENCY_CACHE_SIZE)
+        self._idempotency_lock = threading.Lock()
+        # Connections subscribed to change events. The Live listeners that
+        # feed them are grouped by what they watch, e.g. ("tracks", 2), and
+        # record what changed until the next push (main thread only). They
+        # stay installed with no one subscribed, as they also move the
+        # change counter below.
+        self._event_streams = set()
+        self._events_lock = threading.Lock()
+        self._listeners = {}
+        self._dirty = set()
+        self._rewatch = set()
+        # Counts changes to the set: bumped after every main-thread command
+        # and every change Live's listeners report, and sent with each reply
+        # and event so clients can tell cheaply whether what they hold is
+        # still current
+        self._version = 0
+        # Connections following the transport, mapped to
+        # [interval, next update due, last state sent]
+        self._transport_streams = {}
+        self._transport_lock = threading.Lock()
+        # Read once: the note API and what the handshake reports follow
+        # from it
+        self._live_version = self._read_live_version()
+        self._note_ids = self._live_version >= (11,)
+        self._browser_index = _BrowserIndex(BROWSER_INDEX_PATH)
+        self._browser_fingerprint_value = None
+        self._next_browser_check = time.time() + BROWSER_CHECK_INTERVAL
+        self._enqueue_main_thread(self._watch_song)
         self._start_server()
+        self._start_browser_index()
         self.log_message("AbletonMCP: Listening on port %d" % PORT)
 
     def disconnect(self):
         self._running = False
+        self._unwatch_all()
         if self._server_socket:
             try:
                 self._server_socket.close()
@@ -106,6 +1022,18 @@ class AbletonMCP(ControlSurface):
         ControlSurface.disconnect(self)
         self.log_message("AbletonMCP: Disconnected")
 
+    def update_display(self):
+        ControlSurface.update_display(self)
+        if self._dirty:
+            # Changed from Live itself rather than by a command
+            self._version += 1
+            self._flush_events()
+        if self._transport_streams:
+            self._push_transport()
+        if time.time() >= self._next_browser_check:
+            self._next_browser_check = time.time() + BROWSER_CHECK_INTERVAL
+            self._check_browser_changed()
+
     # ── Socket Server ───────────────────────────────────────────────
 
     def _start_server(self):
@@ -126,6 +1054,14 @@ class AbletonMCP(ControlSurface):
             try:
                 client_sock, addr = self._server_socket.accept()
                 self.log_message("AbletonMCP: Client connected from %s" % str(addr))
+                try:
+                    # Replies are small and often pipelined; without this,
+                    # Nagle holds one back until the previous is acked
+                    client_sock.setsockopt(
+                        socket.IPPROTO_TCP, socket.TCP_NODELAY, 1
+                    )
+                except (OSError, socket.error):
+                    pass
                 t = threading.Thread(
                     target=self._handle_client, args=(client_sock,)
                 )
@@ -140,83 +1076,953 @@ class AbletonMCP(ControlSurface):
                     )
 
     def _handle_client(self, client_sock):
-        buffer = ""
+        stream = _MessageStream(client_sock)
         try:
             client_sock.settimeout(None)
             while self._running:
-                data = client_sock.recv(8192)
-                if not data:
+                command = stream.read()
+                if command is None:
                     break
-                buffer += data.decode("utf-8")
-                try:
-                    command = json.loads(buffer)
-                    buffer = ""
-                    response = self._dispatch_command(command)
-                    response_bytes = json.dumps(response).encode("utf-8")
-                    client_sock.sendall(response_bytes)
-                except ValueError:
-                    # Incomplete JSON, keep buffering
-                    continue
+                if command.get("type") == "hello":
+                    self._hello(stream, command.get("params") or {})
+                elif command.get("type") == "set_framing":
+                    self._set_framing(stream, command.get("params") or {})
+                elif command.get("type") == "subscribe_events":
+                    self._subscribe_events(stream, command.get("id"))
+                elif command.get("type") == "subscribe_transport":
+                    self._subscribe_transport(
+                        stream, command.get("id"), command.get("params") or {}
+                    )
+                else:
+                    self._handle_command(stream, command)
         except Exception:
             self.log_message(
                 "AbletonMCP: Client error: %s" % traceback.format_exc()
             )
         finally:
+            self._unsubscribe_events(stream)
+            with self._transport_lock:
+                self._transport_streams.pop(stream, None)
+            stream.close()
+
+    def _handle_command(self, stream, command):
+        timing = _CommandTiming(
+            command.get("type"), stream.receive_time, stream.parse_time
+        )
+        reply = self._replier(stream, command.get("id"), timing)
+        if stream.framed:
+            # Don't wait for main-thread commands: keep reading so later
+            # commands (e.g. reads) can answer first. Replies carry the
+            # request id so the client can match them.
+            self._submit_command(command, reply, timing)
+        else:
+            reply(self._dispatch_command(command, timing))
+
+    def _replier(self, stream, request_id, timing=None):
+        def reply(response):
+            if request_id is not None:
+                response["id"] = request_id
+            response["version"] = self._version
+            if timing is None:
+                stream.send(response)
+                return
+            reply_started = time.time()
+
+            def on_sent():
+                timing.add("serialize", time.time() - reply_started)
+                self._performance.record(timing)
+
+            stream.send(response, on_sent)
+
+        return reply
+
+    def _hello(self, stream, params):
+        """Connection-level handshake: what this script and Live support,
+        and optionally a switch to framed messages, in one round trip.
+
+        The reply is still sent in the current mode, and only later
+        messages use the negotiated framing.
+        """
+        framing = params.get("framing")
+        if framing is not None and framing != FRAMING_LENGTH_PREFIXED:
+            stream.send({
+                "status": "error",
+                "message": "Unsupported framing: %s" % framing,
+            })
+            return
+        result = {
+            "protocol": PROTOCOL_VERSION,
+            "live_version": "%d.%d.%d" % self._live_version,
+            "commands": sorted(self.COMMANDS),
+            "features": self._features(),
+        }
+        if framing is not None:
+            result.update({"framing": framing, "request_ids": True})
+        stream.send({"status": "success", "result": result})
+        if framing is not None:
+            stream.framed = True
+
+    def _set_framing(self, stream, params):
+        # The handshake of clients that predate hello
+        framing = params.get("framing")
+        if framing != FRAMING_LENGTH_PREFIXED:
+            stream.send({
+                "status": "error",
+                "message": "Unsupported framing: %s" % framing,
+            })
+            return
+        stream.send({
+            "status": "success",
+            "result": {
+                "framing": framing,
+                "request_ids": True,
+                "features": self._features(),
+            },
+        })
+        stream.framed = True
+
+    def _features(self):
+        if self._note_ids:
+            return list(FEATURES) + ["note_ids"]
+        return list(FEATURES)
+
+    def _read_live_version(self):
+        """Live's (major, minor, bugfix) version, zeros where unknown."""
+        app = self.application()
+        version = []
+        for part in ("major", "minor", "bugfix"):
+            getter = getattr(app, "get_%s_version" % part, None)
+            try:
+                version.append(int(getter()) if getter else 0)
+            except (TypeError, ValueError):
+                version.append(0)
+        return tuple(version)
+
+    # ── Change Events ───────────────────────────────────────────────
+
+    def _subscribe_events(self, stream, request_id):
+        """Push changes to the set to this connection until it closes.
+
+        The subscriber first gets a full snapshot, then an event whenever a
+        song property, track or scene changes.
+        """
+        reply = self._replier(stream, request_id)
+        if not stream.framed:
+            reply({
+                "status": "error",
+                "message": "Change events need a framed connection",
+            })
+            return
+
+        def task():
+            event = self._snapshot_event()
+            event["version"] = self._version
+            stream.send(event)
+            with self._events_lock:
+                self._event_streams.add(stream)
+            reply({"status": "success", "result": {"subscribed": True}})
+
+        self._enqueue_main_thread(task)
+
+    def _unsubscribe_events(self, stream):
+        with self._events_lock:
+            self._event_streams.discard(stream)
+
+    def _after_command(self, reply):
+        """Wrap a main-thread reply to count the change and push pending
+        events first.
+
+        A subscribed client then always sees the effects of a command before
+        its reply, and a local copy of the set stays consistent with it.
+        """
+
+        def flush_then_reply(response):
+            self._version += 1
+            self._flush_events()
+            reply(response)
+
+        return flush_then_reply
+
+    def _flush_events(self):
+        """Push what changed since the last flush to subscribed connections.
+
+        Listeners only record what changed, so a burst of changes to one
+        track costs one event, built here on the main thread.
+        """
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        rewatch, self._rewatch = self._rewatch, set()
+        structure = ("structure",) in dirty
+        if structure:
+            # Tracks or scenes were added, removed or moved, so indexes may
+            # have shifted: watch everything afresh and resend it all
+            self._unwatch_all()
+            self._watch_song()
+        else:
+            for key in rewatch:
+                self._unwatch(key)
+                self._watch_track(key, self._track_for(key))
+        with self._events_lock:
+            streams = list(self._event_streams)
+        if not streams:
+            return
+        if structure:
+            events = [self._snapshot_event()]
+        else:
+            events = [
+                self._change_event(key)
+                for key in sorted(dirty)
+                if key != ("unreported",)
+            ]
+        for event in events:
+            event["version"] = self._version
+        for stream in streams:
+            for event in events:
+                stream.send(event)
+
+    def _snapshot_event(self):
+        return {"event": "snapshot", "snapshot": self._get_session_snapshot()}
+
+    def _change_event(self, key):
+        if key[0] == "song":
+            return {"event": "song", "song": self._get_session_info()}
+        if key[0] == "scenes":
+            scene = self.song().scenes[key[1]]
+            return {
+                "event": "scene",
+                "index": key[1],
+                "scene": {"index": key[1], "name": scene.name},
+            }
+        if key[0] == "master":
+            track = self._describe_track(
+                self.song().master_track, SNAPSHOT_SECTIONS, is_master=True
+            )
+            return {"event": "track", "section": "master", "track": track}
+        track = self._describe_track(
+            self._track_for(key), SNAPSHOT_SECTIONS, index=key[1]
+        )
+        return {"event": "track", "section": key[0], "index": key[1], "track": track}
+
+    def _track_for(self, key):
+        song = self.song()
+        if key[0] == "master":
+            return song.master_track
+        return getattr(song, key[0])[key[1]]
+
+    def _watch_song(self):
+        song = self.song()
+        group = self._listeners.setdefault(("song",), [])
+        for prop in ("tracks", "return_tracks", "scenes"):
+            self._listen(group, song, prop, self._mark(("structure",)))
+        song_changed = self._mark(("song",))
+        for prop in (
+            "tempo",
+            "is_playing",
+            "signature_numerator",
+            "signature_denominator",
+        ):
+            self._listen(group, song, prop, song_changed)
+        for prop in UNREPORTED_SONG_PROPERTIES:
+            self._listen(group, song, prop, self._mark(("unreported",)))
+        for i, track in enumerate(song.tracks):
+            self._watch_track(("tracks", i), track)
+        for i, track in enumerate(song.return_tracks):
+            self._watch_track(("return_tracks", i), track)
+        self._watch_track(("master",), song.master_track)
+        for i, scene in enumerate(song.scenes):
+            key = ("scenes", i)
+            group = self._listeners.setdefault(key, [])
+            self._listen(group, scene, "name", self._mark(key))
+
+    def _watch_track(self, key, track):
+        """Listen for a change to anything the snapshot reports about a
+        track, its clips and its devices."""
+        group = self._listeners.setdefault(key, [])
+        changed = self._mark(key)
+        unreported = self._mark(("unreported",))
+
+        def contents_changed():
+            # New clips and devices need listeners of their own
+            self._dirty.add(key)
+            self._rewatch.add(key)
+
+        for prop in ("name", "mute", "solo"):
+            self._listen(group, track, prop, changed)
+        if getattr(track, "can_be_armed", False):
+            self._listen(group, track, "arm", changed)
+        self._listen(group, track.mixer_device.volume, "value", changed)
+        self._listen(group, track.mixer_device.panning, "value", changed)
+        for prop in ("devices", "arrangement_clips"):
+            self._listen(group, track, prop, contents_changed)
+        for device in track.devices:
+            self._listen(group, device, "name", changed)
+            self._listen(group, device, "is_active", changed)
+        for slot in getattr(track, "clip_slots", ()):
+            self._listen(group, slot, "has_clip", contents_changed)
+            if slot.has_clip:
+                self._watch_clip(group, slot.clip, changed, unreported)
+        for clip in getattr(track, "arrangement_clips", ()):
+            self._watch_clip(group, clip, changed, unreported)
+
+    def _watch_clip(self, group, clip, changed, unreported):
+        for prop in WATCHED_CLIP_PROPERTIES:
+            self._listen(group, clip, prop, changed)
+        for prop in UNREPORTED_CLIP_PROPERTIES:
+            self._listen(group, clip, prop, unreported)
+
+    def _mark(self, key):
+        def changed():
+            self._dirty.add(key)
+
+        return changed
+
+    def _listen(self, group, subject, prop, callback):
+        add = getattr(subject, "add_%s_listener" % prop, None)
+        if add is None:
+            return
+        add(callback)
+        group.append((subject, prop, callback))
+
+    def _unwatch(self, key):
+        for subject, prop, callback in self._listeners.pop(key, ()):
             try:
-                client_sock.close()
+                if getattr(subject, "%s_has_listener" % prop)(callback):
+                    getattr(subject, "remove_%s_listener" % prop)(callback)
             except Exception:
-                pass
+                pass  # The object is gone, and its listeners with it
+
+    def _unwatch_all(self):
+        for key in list(self._listeners):
+            self._unwatch(key)
+
+    # ── Transport ───────────────────────────────────────────────────
+
+    def _subscribe_transport(self, stream, request_id, params):
+        """Push the transport state to this connection until it closes.
+
+        The subscriber gets the current state right away, then the new state
+        at most every ``interval`` seconds, whenever it has changed.
+        Subscribing again changes the interval.
+        """
+        reply = self._replier(stream, request_id)
+        if not stream.framed:
+            reply({
+                "status": "error",
+                "message": "Transport updates need a framed connection",
+            })
+            return
+        try:
+            interval = max(0.0, float(params.get("interval", TRANSPORT_INTERVAL)))
+        except (TypeError, ValueError):
+            reply({"status": "error", "message": "Invalid transport interval"})
+            return
+
+        def task():
+            state = self._get_transport()
+            stream.send(self._transport_event(state))
+            with self._transport_lock:
+                self._transport_streams[stream] = [
+                    interval,
+                    time.time() + interval,
+                    state,
+                ]
+            reply({"status": "success", "result": {"interval": interval}})
+
+        self._enqueue_main_thread(task)
+
+    def _push_transport(self):
+        now = time.time()
+        with self._transport_lock:
+            due = [
+                (stream, subscription)
+                for stream, subscription in self._transport_streams.items()
+                if now >= subscription[1]
+            ]
+        if not due:
+            return
+        # Built once per tick however many connections are following it
+        state = self._get_transport()
+        for stream, subscription in due:
+            subscription[1] = now + subscription[0]
+            if state != subscription[2]:
+                subscription[2] = state
+                stream.send(self._transport_event(state))
+
+    def _transport_event(self, state):
+        return {"event": "transport", "transport": state, "version": self._version}
 
     # ── Command Dispatch ────────────────────────────────────────────
 
-    def _dispatch_command(self, command):
+    def _dispatch_command(self, command, timing=None):
+        """Run a command and block until its response is ready."""
+        response_q = queue.Queue()
+        self._submit_command(command, response_q.put, timing)
+        try:
+            return response_q.get(timeout=30.0)
+        except queue.Empty:
+            return {
+                "status": "error",
+                "message": "Timeout waiting for Ableton main thread",
+            }
+
+    def _submit_command(self, command, reply, timing=None):
+        """Run or schedule a command, passing its response to ``reply``.
+
+        Read-only commands run immediately on the calling thread. Main-thread
+        commands are scheduled, and ``reply`` is called from the main thread
+        once they have run. Time spent queued and in the handler is added to
+        ``timing`` if given.
+        """
         command_type = command.get("type", "")
         params = command.get("params", {})
 
         entry = self.COMMANDS.get(command_type)
         if entry is None:
-            return {
+            reply({
                 "status": "error",
                 "message": "Unknown command: %s" % command_type,
-            }
+            })
+            return
 
         method_name, needs_main_thread = entry
         handler = getattr(self, method_name)
 
+        key = command.get("idempotency_key")
+        if key is not None:
+            reply = self._claim_idempotency_key(key, reply)
+            if reply is None:
+                return
+
         if not needs_main_thread:
-            try:
-                result = handler(**params) if params else handler()
-                return {"status": "success", "result": result}
-            except Exception as e:
-                return {"status": "error", "message": str(e)}
+            started = time.time()
+            response = self._run_handler(handler, params)
+            if timing is not None:
+                timing.add("handler", time.time() - started)
+            reply(response)
+            return
 
-        # Schedule on main thread and wait for result
-        response_q = queue.Queue()
-        request_id = id(response_q)
-        self._response_queues[request_id] = response_q
+        queued = time.time()
 
         def task():
+            if timing is not None:
+                timing.add("queue", time.time() - queued)
+            self._start_continuation(
+                handler, params, self._after_command(reply), timing
+            )
+
+        self._enqueue_main_thread(task)
+
+    def _claim_idempotency_key(self, key, reply):
+        """Return the reply to run a keyed command with, or None if the key
+        has been seen before.
+
+        A repeated key is answered with the original command's response; if
+        the original is still running, the reply is sent when it finishes.
+        """
+        with self._idempotency_lock:
+            entry = self._idempotency_keys.get(key)
+            if entry is None:
+                waiting = [reply]
+                self._idempotency_keys.put(key, waiting)
+            elif isinstance(entry, list):
+                entry.append(reply)
+                return None
+        if entry is not None:
+            # Each reply gets its own copy, since it is tagged with a request id
+            reply(dict(entry))
+            return None
+
+        def finish(response):
+            with self._idempotency_lock:
+                self._idempotency_keys.put(key, response)
+                replies = list(waiting)
+                del waiting[:]
+            for waiting_reply in replies:
+                waiting_reply(dict(response))
+
+        return finish
+
+    # ── Main-Thread Scheduler ───────────────────────────────────────
+
+    def _enqueue_main_thread(self, task):
+        """Queue a task for the main thread, arming the drain if it's idle."""
+        self._command_queue.put(task)
+        # Approximate, as other threads may be queueing at the same time
+        self._max_queue_depth = max(
+            self._max_queue_depth, self._command_queue.qsize()
+        )
+        with self._drain_lock:
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+        self.schedule_message(0, self._drain_command_queue)
+
+    def _drain_command_queue(self):
+        """Run queued tasks until the queue is empty or the budget is spent.
+
+        Continuations parked on the previous tick are resumed first. Then
+        every command queued since the last tick runs in this one callback,
+        so concurrent clients share a tick instead of each waiting for its
+        own. The drain only re-arms itself while work remains.
+        """
+        deadline = time.time() + self._tick_budget
+        parked, self._continuations = self._continuations, []
+        for continuation, reply, timing in parked:
+            self._resume(continuation, reply, timing)
+        while time.time() < deadline:
             try:
-                result = handler(**params) if params else handler()
-                response_q.put({"status": "success", "result": result})
-            except Exception as e:
-                response_q.put({"status": "error", "message": str(e)})
-            finally:
-                self._response_queues.pop(request_id, None)
+                task = self._command_queue.get_nowait()
+            except queue.Empty:
+                with self._drain_lock:
+                    # Re-check under the lock so a task queued right now
+                    # either gets drained here or re-arms the scheduler.
+                    if not self._command_queue.empty():
+                        continue
+                    if not self._continuations:
+                        self._drain_scheduled = False
+                        return
+                break
+            try:
+                task()
+            except Exception:
+                self.log_message(
+                    "AbletonMCP: Task error: %s" % traceback.format_exc()
+                )
+        self.schedule_message(1, self._drain_command_queue)
 
-        self.schedule_message(0, task)
+    def _start_continuation(self, handler, params, reply, timing=None):
+        started = time.time()
+        try:
+            result = handler(**params) if params else handler()
+        except Exception as e:
+            response = {"status": "error", "message": str(e)}
+        else:
+            if isinstance(result, types.GeneratorType):
+                if timing is not None:
+                    timing.add("handler", time.time() - started)
+                self._resume(result, reply, timing)
+                return
+            response = {"status": "success", "result": result}
+        if timing is not None:
+            timing.add("handler", time.time() - started)
+        reply(response)
+
+    def _resume(self, continuation, reply, timing=None):
+        """Advance a continuation one step, parking it until the next tick."""
+        started = time.time()
+        response = None
+        try:
+            step = next(continuation)
+        except StopIteration:
+            response = {"status": "success", "result": None}
+        except Exception as e:
+            response = {"status": "error", "message": str(e)}
+        else:
+            if isinstance(step, _Result):
+                continuation.close()
+                response = {"status": "success", "result": step.value}
+        # Before replying, as the reply is what records the timing
+        if timing is not None:
+            timing.add("handler", time.time() - started)
+        if response is None:
+            self._continuations.append((continuation, reply, timing))
+        else:
+            reply(response)
 
+    def _run_handler(self, handler, params):
         try:
-            return response_q.get(timeout=30.0)
-        except queue.Empty:
-            self._response_queues.pop(request_id, None)
-            return {
-                "status": "error",
-                "message": "Timeout waiting for Ableton main thread",
-            }
+            result = handler(**params) if params else handler()
+            return {"status": "success", "result": result}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    # ── Batching ────────────────────────────────────────────────────
+
+    def _batch(self, operations, stop_on_error=True):
+        """Run a list of {type, params} operations in one main-thread task.
+
+        Every operation runs here on the main thread, including read-only
+        ones, so the whole batch costs a single tick instead of one per
+        mutating command. Operations that wait on Live, such as device
+        loads, suspend the batch between ticks without blocking.
+        """
+        results = []
+        failed = 0
+        for i, operation in enumerate(operations):
+            command_type = operation.get("type", "")
+            entry = self.COMMANDS.get(command_type)
+            if command_type == "batch":
+                response = {
+                    "status": "error",
+                    "message": "Batches cannot be nested",
+                }
+            elif entry is None:
+                response = {
+                    "status": "error",
+                    "message": "Unknown command: %s" % command_type,
+                }
+            else:
+                handler = getattr(self, entry[0])
+                params = operation.get("params") or {}
+                try:
+                    result = handler(**params) if params else handler()
+                    if isinstance(result, types.GeneratorType):
+                        continuation, result = result, None
+                        for step in continuation:
+                            if isinstance(step, _Result):
+                                result = step.value
+                                break
+                            yield
+                        continuation.close()
+                    response = {"status": "success", "result": result}
+                except Exception as e:
+                    response = {"status": "error", "message": str(e)}
+            response["index"] = i
+            response["type"] = command_type
+            results.append(response)
+            if response["status"] == "error":
+                failed += 1
+                if stop_on_error:
+                    break
+        yield _Result({
+            "results": results,
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "skipped": len(operations) - len(results),
+        })
+
+    # ── Diagnostics ─────────────────────────────────────────────────
+
+    def _get_cache_stats(self):
+        return {
+            "uri_cache": self._uri_cache.stats(),
+            "idempotency_keys": self._idempotency_keys.stats(),
+            "browser_index": self._browser_index.stats(),
+        }
+
+    def _get_performance_stats(self, reset=False):
+        """Latency per command type and phase, and main-thread queue depth.
+
+        Timings are recorded when a reply has been written, so this call's
+        own timing isn't included. ``reset`` starts the counts over after
+        reading them.
+        """
+        stats = {
+            "commands": self._performance.summary(),
+            "queue_depth": self._command_queue.qsize(),
+            "max_queue_depth": self._max_queue_depth,
+            "parked_continuations": len(self._continuations),
+        }
+        if reset:
+            self._performance.reset()
+            self._max_queue_depth = 0
+        return stats
 
     # ── Helpers ─────────────────────────────────────────────────────
 
+    def _note_tuples(self, notes):
+        """Note tuples for replace_selected_notes from objects or columns."""
+        if isinstance(notes, dict):
+            if notes.get("format") != NOTE_FORMAT_COLUMNAR:
+                raise ValueError("Unsupported note format: %s" % notes.get("format"))
+            return _decode_note_columns(notes)
+        return [
+            (
+                int(n.get("pitch", 60)),
+                float(n.get("start_time", 0.0)),
+                float(n.get("duration", 0.5)),
+                int(n.get("velocity", 100)),
+                bool(n.get("mute", False)),
+            )
+            for n in notes
+        ]
+
+    def _query_notes(
+        self,
+        clip,
+        note_format,
+        pitch_min,
+        pitch_max,
+        start_time,
+        end_time,
+        limit,
+        cursor,
+    ):
+        """Read the notes in a pitch and time window, a page at a time.
+
+        Without a limit or cursor every note in the window is returned. With
+        them, notes are ordered by start_time then pitch and at most
+        ``limit`` are returned, plus a ``next_cursor`` while more remain.
+        Passing that cursor back resumes reading from the last note returned,
+        so each page only asks Live for the rest of the window.
+        """
+        pitch_min = int(pitch_min)
+        pitch_max = int(pitch_max)
+        start_time = float(start_time)
+        end_time = clip.length if end_time is None else float(end_time)
+        if not 0 <= pitch_min <= pitch_max <= 127:
+            raise ValueError(
+                "Invalid pitch range %d-%d (0-127)" % (pitch_min, pitch_max)
+            )
+        if limit is not None and int(limit) < 1:
+            raise ValueError("limit must be at least 1")
+        after = None
+        if cursor is not None:
+            after = self._parse_note_cursor(cursor)
+            start_time = max(start_time, after[0])
+        notes = []
+        if end_time > start_time:
+            notes = self._read_notes(
+                clip,
+                pitch_min,
+                pitch_max - pitch_min + 1,
+                start_time,
+                end_time - start_time,
+            )
+        result = {}
+        if limit is not None or after is not None:
+            notes.sort(key=_note_position)
+            if after is not None:
+                notes = [note for note in notes if _note_position(note) > after]
+            if limit is not None and len(notes) > int(limit):
+                notes = notes[:int(limit)]
+                result["next_cursor"] = "%r:%d" % _note_position(notes[-1])
+        result["notes"] = self._format_notes(notes, note_format)
+        return result
+
+    def _parse_note_cursor(self, cursor):
+        try:
+            start_time, pitch = str(cursor).rsplit(":", 1)
+            return float(start_time), int(pitch)
+        except ValueError:
+            raise ValueError("Invalid cursor: %s" % cursor)
+
+    def _read_notes(
+        self, clip, from_pitch=0, pitch_span=128, from_time=0.0, time_span=None
+    ):
+        """Notes in a window as (pitch, start, duration, velocity, mute),
+        followed by the note_id where Live has one. The whole clip by
+        default."""
+        if time_span is None:
+            time_span = clip.length
+        if self._note_ids:
+            return [
+                (
+                    note.pitch,
+                    note.start_time,
+                    note.duration,
+                    note.velocity,
+                    note.mute,
+                    note.note_id,
+                )
+                for note in clip.get_notes_extended(
+                    from_pitch, pitch_span, from_time, time_span
+                )
+            ]
+        return [
+            tuple(note[:5])
+            for note in clip.get_notes(from_time, from_pitch, time_span, pitch_span)
+        ]
+
+    def _format_notes(self, notes, note_format):
+        if note_format == NOTE_FORMAT_COLUMNAR:
+            return _encode_note_columns(notes)
+        if note_format != NOTE_FORMAT_OBJECTS:
+            raise ValueError("Unsupported note format: %s" % note_format)
+        return [dict(zip(_NOTE_FIELDS + ("note_id",), note)) for note in notes]
+
+    def _apply_diff(self, clip, add, remove, modify):
+        """Add, remove and modify individual notes, leaving the rest alone.
+
+        ``remove`` and ``modify`` entries name a note by "note_id", or by
+        "pitch" and "start_time"; modify entries put the new field values in
+        "changes". Every reference is resolved before anything is changed,
+        so a diff naming a missing note changes nothing.
+        """
+        add = self._note_tuples(add or [])
+        remove = remove or []
+        modify = modify or []
+        if self._note_ids:
+            result = self._apply_diff_by_id(clip, add, remove, modify)
+        else:
+            result = self._apply_diff_by_key(clip, add, remove, modify)
+        result.update({
+            "removed": len(remove),
+            "modified": len(modify),
+            "added": len(add),
+        })
+        return result
+
+    def _transform(self, clip, operations):
+        """Read the clip's notes, transform them and write them back, all in
+        one main-thread call."""
+        if self._note_ids:
+            # Edit Live's notes in place, which keeps their IDs and any
+            # properties the transforms don't touch
+            vector = clip.get_notes_extended(0, 128, 0.0, clip.length)
+            originals = list(vector)
+            notes = [
+                [note.pitch, note.start_time, note.duration, note.velocity,
+                 note.mute, i]
+                for i, note in enumerate(originals)
+            ]
+        else:
+            notes = [
+                list(note) + [i] for i, note in enumerate(self._read_notes(clip))
+            ]
+        count = len(notes)
+        notes = _transform_notes(notes, operations)
+        for note in notes:
+            # Whole velocities, as every other note write stores them
+            note[3] = int(note[3])
+        if self._note_ids:
+            kept = set()
+            for pitch, start_time, duration, velocity, mute, i in notes:
+                note = originals[i]
+                note.pitch = pitch
+                note.start_time = start_time
+                note.duration = duration
+                note.velocity = velocity
+                note.mute = mute
+                kept.add(i)
+            clip.apply_note_modifications(vector)
+            removed = [
+                note.note_id
+                for i, note in enumerate(originals)
+                if i not in kept
+            ]
+            if removed:
+                clip.remove_notes_by_id(removed)
+        else:
+            clip.select_all_notes()
+            clip.replace_selected_notes(tuple(tuple(note[:5]) for note in notes))
+        return {"notes": len(notes), "removed": count - len(notes)}
+
+    def _apply_diff_by_id(self, clip, add, remove, modify):
+        # Live 11+: notes have stable IDs and can be edited in place.
+        # Everything is checked before the clip is touched.
+        removed, _ = self._resolve_notes(clip, remove)
+        modified, vectors = self._resolve_notes(clip, modify)
+        changes = [(note, self._note_changes(ref)) for ref, note in modified]
+        removed_ids = set(note.note_id for _, note in removed)
+        for _, note in modified:
+            if note.note_id in removed_ids:
+                raise ValueError(
+                    "Note %s is both removed and modified" % note.note_id
+                )
+        specs = [
+            Live.Clip.MidiNoteSpecification(**dict(zip(_NOTE_FIELDS, note)))
+            for note in add
+        ]
+        if removed_ids:
+            clip.remove_notes_by_id(list(removed_ids))
+        for note, fields in changes:
+            for field, value in fields.items():
+                setattr(note, field, value)
+        for vector in vectors:
+            clip.apply_note_modifications(vector)
+        result = {}
+        if specs:
+            result["note_ids"] = list(clip.add_new_notes(tuple(specs)) or [])
+        return result
+
+    def _resolve_notes(self, clip, refs):
+        """Map note references to Live's note objects.
+
+        Returns (ref, note) pairs, plus the note vectors the notes came
+        from, which apply_note_modifications needs handed back.
+        """
+        pairs = []
+        vectors = []
+        ids = [ref["note_id"] for ref in refs if ref.get("note_id") is not None]
+        by_id = {}
+        if ids:
+            vector = clip.get_notes_by_id(ids)
+            vectors.append(vector)
+            by_id = dict((note.note_id, note) for note in vector)
+        for ref in refs:
+            if ref.get("note_id") is not None:
+                note = by_id.get(ref["note_id"])
+                if note is None:
+                    raise ValueError("No note with id %s" % ref["note_id"])
+            else:
+                pitch, start_time = self._note_key(ref)
+                vector = clip.get_notes_extended(
+                    pitch,
+                    1,
+                    max(0.0, start_time - NOTE_TIME_TOLERANCE),
+                    2 * NOTE_TIME_TOLERANCE,
+                )
+                if not len(vector):
+                    raise ValueError(
+                        "No note with pitch %d at %s" % (pitch, start_time)
+                    )
+                note = vector[0]
+                vectors.append(vector)
+            pairs.append((ref, note))
+        return pairs, vectors
+
+    def _apply_diff_by_key(self, clip, add, remove, modify):
+        # Live 10: no note IDs, so each edited note is removed and re-added
+        found = {}
+        for ref in list(remove) + list(modify):
+            if ref.get("note_id") is not None:
+                raise ValueError("Note IDs require Live 11 or later")
+            key = self._note_key(ref)
+            pitch, start_time = key
+            matches = clip.get_notes(
+                max(0.0, start_time - NOTE_TIME_TOLERANCE),
+                pitch,
+                2 * NOTE_TIME_TOLERANCE,
+                1,
+            )
+            if not matches:
+                raise ValueError("No note with pitch %d at %s" % key)
+            found[key] = tuple(matches[0][:5])
+        removed = set(found[self._note_key(ref)][:2] for ref in remove)
+        for ref in modify:
+            note = found[self._note_key(ref)]
+            if note[:2] in removed:
+                raise ValueError(
+                    "Note with pitch %d at %s is both removed and modified"
+                    % note[:2]
+                )
+        replacements = []
+        for ref in modify:
+            note = dict(zip(_NOTE_FIELDS, found[self._note_key(ref)]))
+            note.update(self._note_changes(ref))
+            replacements.append(tuple(note[field] for field in _NOTE_FIELDS))
+        for pitch, start_time in found:
+            clip.remove_notes(
+                max(0.0, start_time - NOTE_TIME_TOLERANCE),
+                pitch,
+                2 * NOTE_TIME_TOLERANCE,
+                1,
+            )
+        if replacements or add:
+            clip.set_notes(tuple(replacements + list(add)))
+        return {}
+
+    def _note_key(self, ref):
+        if "pitch" not in ref or "start_time" not in ref:
+            raise ValueError("Notes are referenced by note_id or pitch and start_time")
+        return int(ref["pitch"]), float(ref["start_time"])
+
+    def _note_changes(self, ref):
+        changes = ref.get("changes") or {}
+        unknown = set(changes) - set(_NOTE_FIELDS)
+        if unknown:
+            raise ValueError("Unknown note fields: %s" % ", ".join(sorted(unknown)))
+        casts = {
+            "pitch": int,
+            "start_time": float,
+            "duration": float,
+            "velocity": float,
+            "mute": bool,
+        }
+        return dict((field, casts[field](value)) for field, value in changes.items())
+
     def _get_track(self, track_index):
         tracks = self.song().tracks
         if track_index < 0 or track_index >= len(tracks):
@@ -266,6 +2072,36 @@ class AbletonMCP(ControlSurface):
             "is_playing": song.is_playing,
         }
 
+    def _get_transport(self):
+        """Playhead, tempo and the session clips that are playing or queued.
+
+        Uses each track's playing and fired slot index, so it stays cheap
+        enough to build every tick in large sets.
+        """
+        song = self.song()
+        clips = []
+        for i, track in enumerate(song.tracks):
+            playing = getattr(track, "playing_slot_index", -1)
+            fired = getattr(track, "fired_slot_index", -1)
+            if playing >= 0:
+                clips.append({
+                    "track_index": i,
+                    "clip_index": playing,
+                    "playing_status": "playing",
+                })
+            if fired >= 0 and fired != playing:
+                clips.append({
+                    "track_index": i,
+                    "clip_index": fired,
+                    "playing_status": "triggered",
+                })
+        return {
+            "current_song_time": song.current_song_time,
+            "is_playing": song.is_playing,
+            "tempo": song.tempo,
+            "clips": clips,
+        }
+
     def _get_track_info(self, track_index):
         track = self._get_track(track_index)
         clip_slots = []
@@ -278,15 +2114,6 @@ class AbletonMCP(ControlSurface):
                 slot_info["is_playing"] = clip.is_playing
             clip_slots.append(slot_info)
 
-        devices = []
-        for i, device in enumerate(track.devices):
-            devices.append({
-                "index": i,
-                "name": device.name,
-                "class_name": device.class_name,
-                "is_active": device.is_active,
-            })
-
         return {
             "name": track.name,
             "mute": track.mute,
@@ -295,8 +2122,103 @@ class AbletonMCP(ControlSurface):
             "volume": track.mixer_device.volume.value,
             "pan": track.mixer_device.panning.value,
             "clip_slots": clip_slots,
-            "devices": devices,
+            "devices": self._describe_devices(track),
+        }
+
+    def _get_session_snapshot(self, include=None):
+        """Describe the whole set in a single pass over Live's objects.
+
+        ``include`` lists the SNAPSHOT_SECTIONS to describe, all of them by
+        default. Clip slots are listed only when they hold a clip.
+        """
+        sections = set(SNAPSHOT_SECTIONS if include is None else include)
+        unknown = sections.difference(SNAPSHOT_SECTIONS)
+        if unknown:
+            raise ValueError(
+                "Unknown snapshot sections: %s" % ", ".join(sorted(unknown))
+            )
+        song = self.song()
+        snapshot = {"song": self._get_session_info()}
+        if "tracks" in sections:
+            snapshot["tracks"] = [
+                self._describe_track(track, sections, index=i)
+                for i, track in enumerate(song.tracks)
+            ]
+        if "return_tracks" in sections:
+            snapshot["return_tracks"] = [
+                self._describe_track(track, sections, index=i)
+                for i, track in enumerate(song.return_tracks)
+            ]
+        if "master" in sections:
+            snapshot["master"] = self._describe_track(
+                song.master_track, sections, is_master=True
+            )
+        if "scenes" in sections:
+            snapshot["scenes"] = [
+                {"index": i, "name": scene.name}
+                for i, scene in enumerate(song.scenes)
+            ]
+        return snapshot
+
+    def _describe_track(self, track, sections, index=None, is_master=False):
+        mixer = track.mixer_device
+        info = {
+            "name": track.name,
+            "volume": mixer.volume.value,
+            "pan": mixer.panning.value,
         }
+        if index is not None:
+            info["index"] = index
+        if not is_master:
+            info["mute"] = track.mute
+            info["solo"] = track.solo
+        if getattr(track, "can_be_armed", False):
+            info["arm"] = track.arm
+        if "clip_slots" in sections and not is_master:
+            clips = []
+            for i, slot in enumerate(track.clip_slots):
+                if slot.has_clip:
+                    clip = slot.clip
+                    clips.append({
+                        "index": i,
+                        "name": clip.name,
+                        "length": clip.length,
+                        "is_playing": clip.is_playing,
+                    })
+            info["clip_slots"] = clips
+        if (
+            "arrangement_clips" in sections
+            and not is_master
+            and hasattr(track, "arrangement_clips")
+        ):
+            info["arrangement_clips"] = self._describe_arrangement_clips(track)
+        if "devices" in sections:
+            info["devices"] = self._describe_devices(track)
+        return info
+
+    def _describe_devices(self, track):
+        return [
+            {
+                "index": i,
+                "name": device.name,
+                "class_name": device.class_name,
+                "is_active": device.is_active,
+            }
+            for i, device in enumerate(track.devices)
+        ]
+
+    def _describe_arrangement_clips(self, track):
+        return [
+            {
+                "index": i,
+                "name": clip.name,
+                "start_time": clip.start_time,
+                "end_time": clip.end_time,
+                "length": clip.length,
+                "is_playing": clip.is_playing,
+            }
+            for i, clip in enumerate(track.arrangement_clips)
+        ]
 
     # ── Track Management Handlers ───────────────────────────────────
 
@@ -378,15 +2300,7 @@ class AbletonMCP(ControlSurface):
 
     def _add_notes_to_clip(self, track_index, clip_index, notes, append=False):
         clip = self._get_clip(track_index, clip_index)
-        note_tuples = []
-        for n in notes:
-            note_tuples.append((
-                int(n.get("pitch", 60)),
-                float(n.get("start_time", 0.0)),
-                float(n.get("duration", 0.5)),
-                int(n.get("velocity", 100)),
-                bool(n.get("mute", False)),
-            ))
+        note_tuples = self._note_tuples(notes)
         if append:
             # Deselect so replace_selected_notes adds without removing
             clip.deselect_all_notes()
@@ -395,6 +2309,16 @@ class AbletonMCP(ControlSurface):
         clip.replace_selected_notes(tuple(note_tuples))
         return {"notes_added": len(note_tuples)}
 
+    def _apply_note_diff(
+        self, track_index, clip_index, add=None, remove=None, modify=None
+    ):
+        clip = self._get_clip(track_index, clip_index)
+        return self._apply_diff(clip, add, remove, modify)
+
+    def _transform_clip_notes(self, track_index, clip_index, operations):
+        clip = self._get_clip(track_index, clip_index)
+        return self._transform(clip, operations)
+
     def _set_clip_name(self, track_index, clip_index, name):
         clip = self._get_clip(track_index, clip_index)
         clip.name = name
@@ -410,30 +2334,29 @@ class AbletonMCP(ControlSurface):
         slot.stop()
         return {"stopped": True}
 
-    def _get_clip_notes(self, track_index, clip_index):
+    def _get_clip_notes(
+        self,
+        track_index,
+        clip_index,
+        note_format=NOTE_FORMAT_OBJECTS,
+        pitch_min=0,
+        pitch_max=127,
+        start_time=0.0,
+        end_time=None,
+        limit=None,
+        cursor=None,
+    ):
         clip = self._get_clip(track_index, clip_index)
-        notes = []
-        if hasattr(clip, "get_notes_extended"):
-            raw = clip.get_notes_extended(0, 128, 0.0, clip.length)
-            for note in raw:
-                notes.append({
-                    "pitch": note.pitch,
-                    "start_time": note.start_time,
-                    "duration": note.duration,
-                    "velocity": note.velocity,
-                    "mute": note.mute,
-                })
-        else:
-            raw = clip.get_notes(0.0, 0, clip.length, 128)
-            for note in raw:
-                notes.append({
-                    "pitch": note[0],
-                    "start_time": note[1],
-                    "duration": note[2],
-                    "velocity": note[3],
-                    "mute": note[4],
-                })
-        return {"notes": notes}
+        return self._query_notes(
+            clip,
+            note_format,
+            pitch_min,
+            pitch_max,
+            start_time,
+            end_time,
+            limit,
+            cursor,
+        )
 
     def _get_clip_info(self, track_index, clip_index):
         clip = self._get_clip(track_index, clip_index)
@@ -469,7 +2392,7 @@ class AbletonMCP(ControlSurface):
         dest_clip = dest_slot.clip
         dest_clip.name = source_clip.name
         # Copy notes
-        if hasattr(source_clip, "get_notes_extended"):
+        if self._note_ids:
             raw = source_clip.get_notes_extended(0, 128, 0.0, source_clip.length)
             note_tuples = []
             for note in raw:
@@ -704,7 +2627,7 @@ class AbletonMCP(ControlSurface):
         for item in current_items:
             uri = item.uri if hasattr(item, "uri") else ""
             if uri:
-                self._uri_cache[uri] = item
+                self._uri_cache.put(uri, item)
             items.append({
                 "name": item.name,
                 "uri": uri,
@@ -712,18 +2635,20 @@ class AbletonMCP(ControlSurface):
             })
         return {"items": items}
 
-    def _wait_for_device(self, track, device_count_before, timeout=3.0):
-        """Poll until a new device appears on the track or timeout."""
-        deadline = time.time() + timeout
-        while time.time() < deadline:
-            if len(track.devices) > device_count_before:
-                return track.devices[-1].name
-            time.sleep(0.1)
-        return None
+    def _search_browser(self, query, category="all", limit=20):
+        if category == "all":
+            category = None
+        elif category not in BROWSER_ROOT_NAMES:
+            raise ValueError("Unknown category type: %s" % category)
+        index = self._browser_index
+        return {
+            "results": index.search(query, category, max(1, int(limit))),
+            "index_ready": index.ready,
+            "indexed_items": len(index),
+        }
 
     def _load_browser_item(self, track_index, uri, clear_existing=False):
-        app = self.application()
-        browser = app.browser
+        browser = self.application().browser
 
         item = self._find_browser_item_by_uri(browser, uri)
         if item is None:
@@ -731,31 +2656,22 @@ class AbletonMCP(ControlSurface):
 
         track = self._get_track(track_index)
 
-        # Remove existing devices to avoid unreliable replacement behaviour
-        if clear_existing:
-            while len(track.devices) > 0:
-                track.delete_device(track.devices[0])
-
-        device_count_before = len(track.devices)
-
-        # Select the track, then wait for the selection to propagate before
-        # triggering the browser load.  Without this delay the browser may
-        # load onto the previously-selected track instead.
-        self.song().view.selected_track = track
-        time.sleep(0.2)
-
-        browser.load_item(item)
-
-        device_name = self._wait_for_device(track, device_count_before)
+        def result(device_name):
+            return {
+                "loaded": device_name is not None,
+                "track_index": track_index,
+                "uri": uri,
+                "device_name": device_name or "",
+            }
 
-        return {
-            "loaded": device_name is not None,
-            "track_index": track_index,
-            "uri": uri,
-            "device_name": device_name or "",
-        }
+        return self._load_onto_track(browser, item, track, result, clear_existing)
 
     def _create_midi_track_with_instrument(self, uri, index=-1, name=None):
+        browser = self.application().browser
+        item = self._find_browser_item_by_uri(browser, uri)
+        if item is None:
+            raise ValueError("Browser item not found for URI: %s" % uri)
+
         song = self.song()
         if index == -1:
             index = len(song.tracks)
@@ -765,71 +2681,179 @@ class AbletonMCP(ControlSurface):
         if name:
             track.name = name
 
-        app = self.application()
-        browser = app.browser
-        item = self._find_browser_item_by_uri(browser, uri)
-        if item is None:
-            raise ValueError("Browser item not found for URI: %s" % uri)
+        def result(device_name):
+            return {
+                "track_index": index,
+                "name": track.name,
+                "uri": uri,
+                "device_name": device_name or "",
+                "loaded": device_name is not None,
+            }
 
-        device_count_before = len(track.devices)
-        song.view.selected_track = track
-        time.sleep(0.2)
-        browser.load_item(item)
+        return self._load_onto_track(browser, item, track, result)
 
-        device_name = self._wait_for_device(track, device_count_before)
+    def _load_onto_track(
+        self, browser, item, track, make_result, clear_existing=False
+    ):
+        """Continuation that loads a browser item onto a track.
+
+        Yields back to Live between steps rather than sleeping, so the main
+        thread keeps running other queued commands while the device loads.
+        """
+        # The browser loads onto whichever track is selected, so loads take
+        # turns rather than racing each other's selection.
+        while self._loading_device:
+            yield
+        self._loading_device = True
+        try:
+            # Remove existing devices to avoid unreliable replacement behaviour
+            if clear_existing:
+                while len(track.devices) > 0:
+                    track.delete_device(track.devices[0])
+
+            device_count_before = len(track.devices)
+
+            # Select the track, then let the selection propagate before
+            # triggering the browser load.  Without this delay the browser
+            # may load onto the previously-selected track instead.
+            self.song().view.selected_track = track
+            settled = time.time() + TRACK_SELECT_SETTLE
+            while time.time() < settled:
+                yield
+
+            browser.load_item(item)
+
+            deadline = time.time() + DEVICE_LOAD_TIMEOUT
+            while len(track.devices) <= device_count_before:
+                if time.time() >= deadline:
+                    yield _Result(make_result(None))
+                yield
+            yield _Result(make_result(track.devices[-1].name))
+        finally:
+            self._loading_device = False
+
+    def _browser_roots(self, browser):
+        roots = [
+            ("instruments", browser.instruments),
+            ("audio_effects", browser.audio_effects),
+            ("midi_effects", browser.midi_effects),
+            ("sounds", browser.sounds),
+            ("drums", browser.drums),
+        ]
+        if hasattr(browser, "max_for_live"):
+            roots.append(("max_for_live", browser.max_for_live))
+        return roots
+
+    def _browser_fingerprint(self, roots):
+        """Hash of the Live version and the top two levels of the browser:
+        each root's children, and how many children each of those has.
+
+        Anything deeper, like a renamed preset in a pack folder, is left out
+        to keep the periodic check cheap on Live's main thread; lookups mark
+        the index stale when they find such a change.
+        """
+        parts = ["%d.%d.%d" % self._live_version]
+        for key, root in roots:
+            parts.append(key + ":" + "|".join(
+                "%s=%d" % (c.name, len(getattr(c, "children", ())))
+                for c in root.children
+            ))
+        return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def _start_browser_index(self, load_persisted=True):
+        """Build the browser index in the background, from disk if possible."""
+        index = self._browser_index
+        if load_persisted:
+            loader = threading.Thread(target=index.load)
+            loader.daemon = True
+            loader.start()
+        else:
+            index.skip_load()
 
-        return {
-            "track_index": index,
-            "name": track.name,
-            "uri": uri,
-            "device_name": device_name or "",
-            "loaded": device_name is not None,
-        }
+        def task():
+            roots = self._browser_roots(self.application().browser)
+            self._browser_fingerprint_value = self._browser_fingerprint(roots)
+            build = index.build(roots, self._browser_fingerprint_value)
+            self._resume(build, self._browser_index_built)
+
+        self._enqueue_main_thread(task)
+
+    def _check_browser_changed(self):
+        """Drop cached browser items and reindex if the library has changed."""
+        if self._browser_fingerprint_value is None:
+            return
+        roots = self._browser_roots(self.application().browser)
+        if (
+            not self._browser_index.stale
+            and self._browser_fingerprint(roots) == self._browser_fingerprint_value
+        ):
+            return
+        self.log_message("AbletonMCP: Browser content changed, reindexing")
+        self._uri_cache.clear()
+        self._browser_index.cancel()
+        self._browser_index = _BrowserIndex(BROWSER_INDEX_PATH)
+        self._start_browser_index(load_persisted=False)
+
+    def _browser_index_built(self, response):
+        if response["status"] == "success":
+            self.log_message(
+                "AbletonMCP: Browser index ready (%d items)" % response["result"]
+            )
+        else:
+            self.log_message(
+                "AbletonMCP: Browser index failed: %s" % response["message"]
+            )
 
     def _find_browser_item_by_uri(self, browser, uri, max_depth=25):
         # Check cache first (populated by get_browser_items_at_path)
-        if uri in self._uri_cache:
-            return self._uri_cache[uri]
-
-        sources = [
-            browser.instruments,
-            browser.audio_effects,
-            browser.midi_effects,
-            browser.sounds,
-            browser.drums,
-        ]
-        if hasattr(browser, "max_for_live"):
-            sources.append(browser.max_for_live)
-
-        # Try exact URI match first
-        for source in sources:
-            result = self._search_uri(source, uri, max_depth)
-            if result is not None:
-                self._uri_cache[uri] = result
-                return result
+        cached = self._uri_cache.get(uri)
+        if cached is not None:
+            return cached
+
+        roots = self._browser_roots(browser)
+        index = self._browser_index
+
+        # Try exact URI match first. The index may still be building, or be
+        # a saved one that predates a change to the library, so a miss falls
+        # back to walking the tree and the index learns what the walk finds.
+        result = index.find(uri, roots)
+        if result is None:
+            for key, source in roots:
+                found = self._search_uri(source, uri, max_depth, [key])
+                if found is not None:
+                    result, path = found
+                    index.remember(uri, result, path)
+                    break
 
         # Fallback: search by name (handles cases where URI format varies)
         name = uri.rsplit("/", 1)[-1]
         if ":" in name:
             # Strip URI scheme prefix (e.g. "query:Sounds#Bass:FileId_6880")
             name = None
-        if name:
-            for source in sources:
-                result = self._search_name(source, name, max_depth)
-                if result is not None:
-                    self._uri_cache[uri] = result
-                    return result
-
-        return None
-
-    def _search_uri(self, item, uri, depth):
+        if result is None and name:
+            result = index.find_by_name(name, roots)
+            if result is None:
+                for _, source in roots:
+                    result = self._search_name(source, name, max_depth)
+                    if result is not None:
+                        break
+
+        if result is not None:
+            self._uri_cache.put(uri, result)
+        return result
+
+    def _search_uri(self, item, uri, depth, path):
+        """The item with ``uri`` at or below ``item``, and its browser path,
+        or None. ``path`` is ``item``'s own path."""
         if depth <= 0:
             return None
         if hasattr(item, "uri") and item.uri == uri:
-            return item
+            return item, path
         if hasattr(item, "children"):
             for child in item.children:
-                result = self._search_uri(child, uri, depth - 1)
+                result = self._search_uri(
+                    child, uri, depth - 1, path + [child.name]
+                )
                 if result is not None:
                     return result
         return None
@@ -851,17 +2875,7 @@ class AbletonMCP(ControlSurface):
 
     def _get_arrangement_clips(self, track_index):
         track = self._get_track(track_index)
-        clips = []
-        for i, clip in enumerate(track.arrangement_clips):
-            clips.append({
-                "index": i,
-                "name": clip.name,
-                "start_time": clip.start_time,
-                "end_time": clip.end_time,
-                "length": clip.length,
-                "is_playing": clip.is_playing,
-            })
-        return {"clips": clips}
+        return {"clips": self._describe_arrangement_clips(track)}
 
     def _create_arrangement_clip(self, track_index, start_time, length):
         track = self._get_track(track_index)
@@ -889,46 +2903,47 @@ class AbletonMCP(ControlSurface):
             "destination_time": float(destination_time),
         }
 
-    def _get_arrangement_clip_notes(self, track_index, clip_index):
+    def _get_arrangement_clip_notes(
+        self,
+        track_index,
+        clip_index,
+        note_format=NOTE_FORMAT_OBJECTS,
+        pitch_min=0,
+        pitch_max=127,
+        start_time=0.0,
+        end_time=None,
+        limit=None,
+        cursor=None,
+    ):
         clip = self._get_arrangement_clip(track_index, clip_index)
-        notes = []
-        if hasattr(clip, "get_notes_extended"):
-            raw = clip.get_notes_extended(0, 128, 0.0, clip.length)
-            for note in raw:
-                notes.append({
-                    "pitch": note.pitch,
-                    "start_time": note.start_time,
-                    "duration": note.duration,
-                    "velocity": note.velocity,
-                    "mute": note.mute,
-                })
-        else:
-            raw = clip.get_notes(0.0, 0, clip.length, 128)
-            for note in raw:
-                notes.append({
-                    "pitch": note[0],
-                    "start_time": note[1],
-                    "duration": note[2],
-                    "velocity": note[3],
-                    "mute": note[4],
-                })
-        return {"notes": notes}
+        return self._query_notes(
+            clip,
+            note_format,
+            pitch_min,
+            pitch_max,
+            start_time,
+            end_time,
+            limit,
+            cursor,
+        )
 
     def _set_arrangement_clip_notes(self, track_index, clip_index, notes):
         clip = self._get_arrangement_clip(track_index, clip_index)
-        note_tuples = []
-        for n in notes:
-            note_tuples.append((
-                int(n.get("pitch", 60)),
-                float(n.get("start_time", 0.0)),
-                float(n.get("duration", 0.5)),
-                int(n.get("velocity", 100)),
-                bool(n.get("mute", False)),
-            ))
+        note_tuples = self._note_tuples(notes)
         clip.select_all_notes()
         clip.replace_selected_notes(tuple(note_tuples))
         return {"notes_set": len(note_tuples)}
 
+    def _apply_arrangement_note_diff(
+        self, track_index, clip_index, add=None, remove=None, modify=None
+    ):
+        clip = self._get_arrangement_clip(track_index, clip_index)
+        return self._apply_diff(clip, add, remove, modify)
+
+    def _transform_arrangement_clip_notes(self, track_index, clip_index, operations):
+        clip = self._get_arrangement_clip(track_index, clip_index)
+        return self._transform(clip, operations)
+
     def _set_song_time(self, time):
         self.song().current_song_time = max(0.0, float(time))
         return {"current_song_time": self.song().current_song_time}
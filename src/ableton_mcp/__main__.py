@@ -1,8 +1,8 @@
-from ableton_mcp.server import mcp
+from ableton_mcp.server import create_server
 
 
 def main():
-    mcp.run()
+    create_server().run()
 
 
 if __name__ == "__main__":
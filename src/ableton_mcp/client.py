@@ -1,14 +1,173 @@
 from __future__ import annotations
 
+import asyncio
+import itertools
 import json
+import logging
+import random
+import select
 import socket
+import threading
+import time
+import uuid
 from abc import ABC, abstractmethod
-from typing import Any
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable
+
+from ableton_mcp import notes
+from ableton_mcp.commands import (
+    is_cacheable,
+    is_read_only,
+    is_stale_after,
+    validate,
+)
+from ableton_mcp.protocol import (
+    FRAME_HEADER,
+    FRAMING_LENGTH_PREFIXED,
+    HELLO,
+    SET_FRAMING,
+    Capabilities,
+    decode_frame_header,
+    decode_payload,
+    encode_frame,
+    encode_message,
+    looks_complete,
+)
+from ableton_mcp.timing import CommandTimings
+
+logger = logging.getLogger(__name__)
+
+EventCallback = Callable[[dict[str, Any]], None]
+
+_MAX_RECV_SIZE = 1024 * 1024
+_MAX_BACKOFF = 2.0
+_LOST_CONNECTION = "Lost connection to Ableton. Is the control surface running?"
+
+# Subscriptions the control surface offers: the command that starts one and
+# the feature that advertises it. Transport events go to the transport
+# subscriber; every other event goes to the change event subscriber.
+_CHANNELS = {
+    "events": ("subscribe_events", "events"),
+    "transport": ("subscribe_transport", "transport"),
+}
+
+
+class UnsupportedCommandError(RuntimeError):
+    """The control surface doesn't have the command, usually because it is
+    older than this package."""
+
+
+def _backoff_delay(attempt: int, base: float) -> float:
+    """Exponential backoff with full jitter, so clients that lost the same
+    connection don't all reconnect at the same instant."""
+    return random.uniform(0, min(_MAX_BACKOFF, base * 2**attempt))
+
+
+def _can_retry(message: dict[str, Any], sent: bool) -> bool:
+    """Whether a command may be re-sent after its connection dropped.
+
+    A command that was never written, e.g. because connecting failed, is
+    always safe to send. Reads are always safe to repeat. A mutating command
+    that may have reached Live is only safe if it carries an idempotency
+    key, so Live applies it at most once.
+    """
+    return not sent or is_read_only(message["type"]) or "idempotency_key" in message
+
+
+def _validate(command_type: str, params: dict[str, Any]) -> None:
+    try:
+        validate(command_type, params)
+    except ValueError as e:
+        raise RuntimeError(str(e)) from None
+
+
+def _read_handshake(
+    response: dict[str, Any],
+) -> tuple[bool, frozenset[str], Capabilities | None]:
+    """Whether a handshake reply switched the connection to framed messages,
+    the features that brings, and what the control surface reported about
+    itself in its hello."""
+    result = response.get("result") or {}
+    if (
+        response.get("status") != "success"
+        or result.get("framing") != FRAMING_LENGTH_PREFIXED
+    ):
+        return False, frozenset(), None
+    features = frozenset(result.get("features", ()))
+    return True, features, Capabilities.from_result(result)
+
+
+def _check_supported(client: AbletonClient, command_type: str) -> None:
+    """Fail without a round trip on a command the control surface said in
+    its hello that it doesn't have, e.g. because it is older than the
+    server."""
+    capabilities = client.capabilities
+    if capabilities is not None and command_type not in capabilities.commands:
+        raise UnsupportedCommandError(
+            f"The AbletonMCP control surface in Live doesn't support "
+            f"{command_type}. Reinstall it from this version of ableton-mcp."
+        )
+
+
+def _add_idempotency_key(message: dict[str, Any], features: frozenset[str]) -> None:
+    if "idempotency" in features and not is_read_only(message["type"]):
+        # Kept across retries: that is what lets Live spot a repeat
+        message.setdefault("idempotency_key", uuid.uuid4().hex)
+
+
+def _complete(
+    client: AbletonClient,
+    command_type: str,
+    response: dict[str, Any],
+    times: tuple[float, float, float],
+) -> dict[str, Any]:
+    """Return the result of a reply, or raise its error, and time the command.
+
+    ``times`` are when the call started, when its last attempt started and
+    when that attempt had the command ready to write.
+    """
+    received = time.perf_counter()
+    client.version = response.get("version", client.version)
+    try:
+        if response.get("status") == "error":
+            message = response.get("message", "Unknown error from Ableton")
+            if message.startswith("Unknown command: "):
+                raise UnsupportedCommandError(message)
+            raise RuntimeError(message)
+        return notes.unpack_result(response.get("result", {}))
+    finally:
+        if client.timings is not None:
+            started, attempted, ready = times
+            done = time.perf_counter()
+            client.timings.record(
+                command_type,
+                {
+                    "prepare": ready - attempted,
+                    "round_trip": received - ready,
+                    "unpack": done - received,
+                    "total": done - started,
+                },
+            )
 
 
 class AbletonClient(ABC):
     """Abstract interface for communicating with Ableton Live."""
 
+    #: Whether ``subscribe_events`` and ``subscribe_transport`` can deliver
+    #: events from Live
+    supports_events = False
+    #: Live's change counter as of the latest reply or event, or None if the
+    #: control surface doesn't report one. It changes whenever the set may
+    #: have changed, including when Live restarts.
+    version: int | None = None
+    #: Latency of the commands sent, or None if the client doesn't time them
+    timings: CommandTimings | None = None
+    #: What the control surface reported on the current connection, or None
+    #: before connecting or if it predates the hello handshake
+    capabilities: Capabilities | None = None
+
     @abstractmethod
     def send_command(
         self, command_type: str, params: dict[str, Any] | None = None
@@ -19,70 +178,908 @@ class AbletonClient(ABC):
         """
         ...
 
+    async def send_command_async(
+        self, command_type: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Awaitable variant of ``send_command``.
+
+        The default runs the blocking call in a worker thread so it never
+        stalls the event loop; asyncio-native clients override it.
+        """
+        return await asyncio.to_thread(self.send_command, command_type, params)
+
+    async def warm_up(self) -> None:
+        """Open the connection ahead of the first command, if Live is there.
+
+        Never raises: a client that can't connect yet tries again on its
+        first command. The default does nothing.
+        """
+
+    async def subscribe_events(self, callback: EventCallback) -> bool:
+        """Call ``callback`` with every change event Live pushes.
+
+        The first event is a full snapshot of the set; see ``SessionMirror``
+        for the others. A ``{"event": "disconnected"}`` event means events
+        may have been missed until the next snapshot. Returns False if
+        events aren't available.
+        """
+        return False
+
+    async def subscribe_transport(
+        self, callback: EventCallback, interval: float = 0.1
+    ) -> bool:
+        """Call ``callback`` with the transport state as it changes.
+
+        Events look like ``{"event": "transport", "transport": {...}}``, with
+        the ``get_transport`` fields, at most every ``interval`` seconds.
+        ``{"event": "disconnected"}`` means updates stopped until the client
+        reconnects. Returns False if updates aren't available.
+        """
+        return False
+
 
 class SocketAbletonClient(AbletonClient):
-    """Connects to the AbletonMCP control surface over TCP/JSON."""
+    """Connects to the AbletonMCP control surface over TCP/JSON.
+
+    With ``framing=True`` (the default) the first command on a new connection
+    is preceded by a ``hello`` handshake that switches both ends to
+    length-prefixed messages and reports what the control surface supports
+    (``capabilities``); commands it lacks then fail without a round trip.
+    Older control surfaces reject the handshake and the connection falls back
+    to ``set_framing``, or to the legacy unframed protocol, where commands
+    from concurrent callers are sent strictly one at a time.
+
+    On a framed connection every command carries a request id and a reader
+    thread matches replies to callers by id. Commands from several threads
+    share the one socket with many in flight at once, and a fast read can be
+    answered while a slow main-thread command is still queued in Live.
+
+    If the connection drops, the client reconnects with jittered exponential
+    backoff and re-sends the command up to ``retries`` times when that is
+    safe: read-only commands always, mutating commands only when the control
+    surface supports idempotency keys.
+
+    With ``validate=True``, params are checked against ``COMMANDS`` first,
+    so a malformed command fails without a round trip to Live.
+    """
 
-    def __init__(self, host: str = "localhost", port: int = 9877) -> None:
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 9877,
+        framing: bool = True,
+        timeout: float = 60.0,
+        retries: int = 3,
+        backoff: float = 0.05,
+        validate: bool = False,
+    ) -> None:
         self._host = host
         self._port = port
+        self._framing = framing
+        self._timeout = timeout
+        self._retries = retries
+        self._backoff = backoff
+        self._validate = validate
+        self._framed = False
+        self._features: frozenset[str] = frozenset()
+        self._handshake_pending = False
         self._sock: socket.socket | None = None
+        self._lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending: dict[int, Future[dict[str, Any]]] = {}
+        self._request_ids = itertools.count(1)
+        self._reader_sock: socket.socket | None = None
+        self.timings = CommandTimings()
 
     def connect(self) -> None:
         if self._sock is not None:
             return
         self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # Commands are small and pipelined; don't let Nagle hold one back
+        # until the previous is acked
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock.settimeout(self._timeout)
         self._sock.connect((self._host, self._port))
+        self._framed = False
+        self._features = frozenset()
+        self.capabilities = None
+        self._handshake_pending = self._framing
+        self._pending = {}
 
     def disconnect(self) -> None:
-        if self._sock is not None:
-            self._sock.close()
-            self._sock = None
+        with self._lock:
+            sock, self._sock = self._sock, None
+            self._framed = False
+            self._handshake_pending = False
+        if sock is not None:
+            sock.close()
+
+    def is_alive(self) -> bool:
+        """Whether the connection is open and the control surface hasn't
+        closed it. A connection that was never opened counts as alive since
+        it connects on first use."""
+        with self._lock:
+            sock = self._sock
+            if sock is None or self._reader_sock is sock:
+                # The reader thread drops the socket as soon as it closes
+                return True
+            try:
+                readable, _, _ = select.select([sock], [], [], 0)
+            except (OSError, ValueError):
+                return False
+            # Nothing is outstanding on an idle legacy connection, so any
+            # readable state means EOF or stray bytes; either way, discard it
+            return not readable
 
     def send_command(
         self, command_type: str, params: dict[str, Any] | None = None
     ) -> dict[str, Any]:
-        if self._sock is None:
-            self.connect()
+        if self._validate:
+            _validate(command_type, params or {})
+        message = {"type": command_type, "params": params or {}}
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            sock = None
+            sent = False
+            try:
+                attempted = time.perf_counter()
+                with self._lock:
+                    if self._sock is None:
+                        self.connect()
+                    sock = self._sock
+                    if self._handshake_pending:
+                        self._handshake()
+                    _check_supported(self, command_type)
+                    _add_idempotency_key(message, self._features)
+                    outgoing = notes.pack_message(message, self._features)
+                    ready = time.perf_counter()
+                    sent = True
+                    if self._framed:
+                        request_id, future = self._submit(outgoing)
+                    else:
+                        request_id, future = None, None
+                        response = self._exchange(outgoing)
+                if future is not None:
+                    response = self._await(command_type, request_id, future)
+                break
+            except (ConnectionError, BrokenPipeError, OSError):
+                self._drop(sock)
+                if attempt >= self._retries or not _can_retry(message, sent):
+                    raise RuntimeError(_LOST_CONNECTION)
+            time.sleep(_backoff_delay(attempt, self._backoff))
+            attempt += 1
+        return _complete(self, command_type, response, (started, attempted, ready))
+
+    def _handshake(self) -> None:
+        self._handshake_pending = False
+        response = self._exchange(HELLO)
+        if response.get("status") != "success":
+            # A control surface that predates hello
+            response = self._exchange(SET_FRAMING)
+        self._framed, self._features, self.capabilities = _read_handshake(response)
+
+    def _exchange(self, message: dict[str, Any]) -> dict[str, Any]:
+        """Send one message and wait for its reply (no other traffic allowed)."""
         assert self._sock is not None
+        if self._framed:
+            self._sock.sendall(encode_frame(message))
+            return self._receive_frame()
+        self._sock.sendall(encode_message(message))
+        return self._receive_full_response()
 
-        payload = json.dumps({"type": command_type, "params": params or {}}).encode(
-            "utf-8"
-        )
-        self._sock.sendall(payload)
+    # ── Pipelining ──────────────────────────────────────────────────
+
+    def _submit(self, message: dict[str, Any]) -> tuple[int, Future[dict[str, Any]]]:
+        assert self._sock is not None
+        request_id = next(self._request_ids)
+        future: Future[dict[str, Any]] = Future()
+        with self._pending_lock:
+            self._pending[request_id] = future
+        if self._reader_sock is not self._sock:
+            self._start_reader()
+        try:
+            self._sock.sendall(encode_frame({"id": request_id, **message}))
+        except OSError:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+            raise
+        return request_id, future
 
+    def _await(
+        self, command_type: str, request_id: int, future: Future[dict[str, Any]]
+    ) -> dict[str, Any]:
         try:
-            response_data = self._receive_full_response()
-        except (ConnectionError, BrokenPipeError, OSError):
-            self._sock = None
+            return future.result(timeout=self._timeout)
+        except FutureTimeoutError:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
             raise RuntimeError(
-                "Lost connection to Ableton. Is the control surface running?"
+                f"Timed out waiting for Ableton to respond to '{command_type}'"
             )
 
-        response = json.loads(response_data.decode("utf-8"))
+    def _start_reader(self) -> None:
+        assert self._sock is not None
+        self._reader_sock = self._sock
+        self._sock.settimeout(None)
+        reader = threading.Thread(
+            target=self._read_loop,
+            args=(self._sock, self._pending),
+            name="ableton-mcp-reader",
+            daemon=True,
+        )
+        reader.start()
 
-        if response.get("status") == "error":
-            raise RuntimeError(response.get("message", "Unknown error from Ableton"))
+    def _read_loop(
+        self, sock: socket.socket, pending: dict[int, Future[dict[str, Any]]]
+    ) -> None:
+        error: Exception = ConnectionError("Connection closed by Ableton")
+        try:
+            while True:
+                length = decode_frame_header(
+                    self._receive_exactly(FRAME_HEADER.size, sock)
+                )
+                response = decode_payload(self._receive_exactly(length, sock))
+                if "event" in response:
+                    continue  # This client never subscribes to events
+                with self._pending_lock:
+                    request_id = response.pop("id", None)
+                    if request_id is None and pending:
+                        # Control surfaces without request ids reply in order.
+                        request_id = next(iter(pending))
+                    future = pending.pop(request_id, None)
+                if future is not None:
+                    future.set_result(response)
+        except (ConnectionError, OSError, ValueError, RuntimeError) as e:
+            # RuntimeError is an oversized frame header: the stream can't be
+            # followed past it, so every waiting command fails now
+            error = e if isinstance(e, ConnectionError) else ConnectionError(str(e))
+        finally:
+            self._drop(sock)
+            with self._pending_lock:
+                futures = list(pending.values())
+                pending.clear()
+            for future in futures:
+                future.set_exception(error)
+
+    def _drop(self, sock: socket.socket | None) -> None:
+        with self._lock:
+            if sock is None or self._sock is not sock:
+                return
+            self._sock = None
+            self._framed = False
+        try:
+            sock.close()
+        except OSError:
+            pass
 
-        return response.get("result", {})
+    # ── Receiving ───────────────────────────────────────────────────
 
-    def _receive_full_response(
-        self, buffer_size: int = 8192, timeout: float = 60.0
-    ) -> bytes:
+    def _receive_frame(self) -> dict[str, Any]:
         assert self._sock is not None
-        self._sock.settimeout(timeout)
-        chunks: list[bytes] = []
+        self._sock.settimeout(self._timeout)
+        length = decode_frame_header(self._receive_exactly(FRAME_HEADER.size))
+        return decode_payload(self._receive_exactly(length))
+
+    def _receive_exactly(self, size: int, sock: socket.socket | None = None) -> bytes:
+        sock = sock or self._sock
+        assert sock is not None
+        buffer = bytearray()
+        while len(buffer) < size:
+            chunk = sock.recv(min(size - len(buffer), _MAX_RECV_SIZE))
+            if not chunk:
+                raise ConnectionError("Connection closed by Ableton")
+            buffer += chunk
+        return bytes(buffer)
+
+    def _receive_full_response(self, buffer_size: int = 8192) -> dict[str, Any]:
+        assert self._sock is not None
+        self._sock.settimeout(self._timeout)
+        buffer = bytearray()
         while True:
             chunk = self._sock.recv(buffer_size)
             if not chunk:
                 break
-            chunks.append(chunk)
-            data = b"".join(chunks)
+            buffer += chunk
+            if not looks_complete(buffer):
+                continue
             try:
-                json.loads(data.decode("utf-8"))
-                return data
+                return decode_payload(bytes(buffer))
             except json.JSONDecodeError:
                 continue
-        if chunks:
-            return b"".join(chunks)
-        raise RuntimeError("No data received from Ableton")
+        if buffer:
+            return decode_payload(bytes(buffer))
+        raise ConnectionError("No data received from Ableton")
+
+
+class AsyncAbletonClient(AbletonClient):
+    """asyncio-native client for the AbletonMCP control surface.
+
+    Speaks the same protocol as ``SocketAbletonClient`` over asyncio streams
+    on the caller's event loop. On a framed connection commands are pipelined
+    and matched to replies by request id in a reader task, so concurrent tool
+    calls overlap their waits instead of queueing behind one another.
+    Dropped connections are retried, and params validated, like
+    ``SocketAbletonClient`` does.
+
+    It can also subscribe to change events and transport updates, and
+    resubscribes by itself whenever it reconnects.
+    """
+
+    supports_events = True
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 9877,
+        framing: bool = True,
+        timeout: float = 60.0,
+        retries: int = 3,
+        backoff: float = 0.05,
+        validate: bool = False,
+    ) -> None:
+        self._host = host
+        self._port = port
+        self._framing = framing
+        self._timeout = timeout
+        self._retries = retries
+        self._backoff = backoff
+        self._validate = validate
+        self._framed = False
+        self._features: frozenset[str] = frozenset()
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+        self._pending: dict[int, asyncio.Future[dict[str, Any]]] = {}
+        self._request_ids = itertools.count(1)
+        self._read_task: asyncio.Task[None] | None = None
+        # Channel -> (params, callback), kept across reconnects, and the
+        # subscribe command sent for each on the current connection
+        self._subscriptions: dict[str, tuple[dict[str, Any], EventCallback]] = {}
+        self._subscribed: dict[str, asyncio.Future[dict[str, Any]]] = {}
+        self.timings = CommandTimings()
+
+    async def connect(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._writer is not None and self._loop is loop:
+            return
+        # Streams are bound to the loop that opened them
+        await self.disconnect()
+        self._reader, self._writer = await asyncio.open_connection(
+            self._host, self._port
+        )
+        self._loop = loop
+        self._framed = False
+        self._features = frozenset()
+        self.capabilities = None
+        self._pending = {}
+        self._subscribed = {}
+        if self._framing:
+            await self._handshake()
+        if self._framed:
+            self._read_task = loop.create_task(
+                self._read_loop(self._reader, self._pending)
+            )
+            for channel in self._subscriptions:
+                self._start_subscription(channel)
+
+    async def warm_up(self) -> None:
+        try:
+            async with self._connection_lock():
+                await self.connect()
+        except (ConnectionError, OSError, TimeoutError):
+            pass
+
+    async def subscribe_events(self, callback: EventCallback) -> bool:
+        return await self._subscribe("events", {}, callback)
+
+    async def subscribe_transport(
+        self, callback: EventCallback, interval: float = 0.1
+    ) -> bool:
+        return await self._subscribe("transport", {"interval": interval}, callback)
+
+    async def _subscribe(
+        self, channel: str, params: dict[str, Any], callback: EventCallback
+    ) -> bool:
+        previous = self._subscriptions.get(channel)
+        self._subscriptions[channel] = (params, callback)
+        if previous is not None and previous[0] != params:
+            self._subscribed.pop(channel, None)  # Resubscribe with new params
+        try:
+            async with self._connection_lock():
+                await self.connect()
+                future = self._start_subscription(channel)
+            if future is None:
+                return False
+            response = await asyncio.wait_for(asyncio.shield(future), self._timeout)
+        except (ConnectionError, OSError, TimeoutError):
+            return False
+        return response.get("status") == "success"
+
+    def _start_subscription(
+        self, channel: str
+    ) -> asyncio.Future[dict[str, Any]] | None:
+        """Subscribe this connection to a channel, once, if Live offers it."""
+        command_type, feature = _CHANNELS[channel]
+        if not self._framed or feature not in self._features:
+            return None
+        if channel not in self._subscribed:
+            params = self._subscriptions[channel][0]
+            _, future = self._submit({"type": command_type, "params": params})
+            # Nobody awaits a resubscription after a reconnect
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._subscribed[channel] = future
+        return self._subscribed[channel]
+
+    async def disconnect(self) -> None:
+        writer, self._writer = self._writer, None
+        self._reader = None
+        self._framed = False
+        self._subscribed = {}
+        if self._read_task is not None:
+            self._read_task.cancel()
+            self._read_task = None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError, RuntimeError):
+                pass
+
+    def send_command(
+        self, command_type: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Blocking call for code that is not running an event loop.
+
+        Each call runs on its own short-lived loop and connection; prefer
+        ``send_command_async`` wherever a loop is available.
+        """
+
+        async def send_once() -> dict[str, Any]:
+            try:
+                return await self.send_command_async(command_type, params)
+            finally:
+                await self.disconnect()
+
+        return asyncio.run(send_once())
+
+    async def send_command_async(
+        self, command_type: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        if self._validate:
+            _validate(command_type, params or {})
+        message = {"type": command_type, "params": params or {}}
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            future = writer = None
+            sent = False
+            try:
+                attempted = time.perf_counter()
+                async with self._connection_lock():
+                    await self.connect()
+                    writer = self._writer
+                    _check_supported(self, command_type)
+                    _add_idempotency_key(message, self._features)
+                    outgoing = notes.pack_message(message, self._features)
+                    ready = time.perf_counter()
+                    sent = True
+                    if self._framed:
+                        request_id, future = self._submit(outgoing)
+                    else:
+                        response = await self._exchange(outgoing)
+                if future is not None:
+                    assert self._writer is not None
+                    await self._writer.drain()
+                    response = await self._await(command_type, request_id, future)
+                break
+            except (ConnectionError, asyncio.IncompleteReadError, OSError):
+                if writer is None or self._writer is writer:
+                    # Leave alone a connection another caller already reopened
+                    await self.disconnect()
+                if attempt >= self._retries or not _can_retry(message, sent):
+                    raise RuntimeError(_LOST_CONNECTION)
+            await asyncio.sleep(_backoff_delay(attempt, self._backoff))
+            attempt += 1
+        return _complete(self, command_type, response, (started, attempted, ready))
+
+    def _connection_lock(self) -> asyncio.Lock:
+        # asyncio locks are bound to one loop; make a fresh one per loop
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop not in (None, loop):
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _handshake(self) -> None:
+        response = await self._exchange(HELLO)
+        if response.get("status") != "success":
+            # A control surface that predates hello
+            response = await self._exchange(SET_FRAMING)
+        self._framed, self._features, self.capabilities = _read_handshake(response)
+
+    async def _exchange(self, message: dict[str, Any]) -> dict[str, Any]:
+        """Send one unframed message and wait for its reply."""
+        assert self._reader is not None and self._writer is not None
+        self._writer.write(encode_message(message))
+        await self._writer.drain()
+        buffer = bytearray()
+        while True:
+            chunk = await asyncio.wait_for(self._reader.read(8192), self._timeout)
+            if not chunk:
+                break
+            buffer += chunk
+            if not looks_complete(buffer):
+                continue
+            try:
+                return decode_payload(bytes(buffer))
+            except json.JSONDecodeError:
+                continue
+        if buffer:
+            return decode_payload(bytes(buffer))
+        raise ConnectionError("No data received from Ableton")
+
+    def _submit(
+        self, message: dict[str, Any]
+    ) -> tuple[int, asyncio.Future[dict[str, Any]]]:
+        assert self._writer is not None and self._loop is not None
+        request_id = next(self._request_ids)
+        future: asyncio.Future[dict[str, Any]] = self._loop.create_future()
+        self._pending[request_id] = future
+        self._writer.write(encode_frame({"id": request_id, **message}))
+        return request_id, future
+
+    async def _await(
+        self,
+        command_type: str,
+        request_id: int,
+        future: asyncio.Future[dict[str, Any]],
+    ) -> dict[str, Any]:
+        try:
+            return await asyncio.wait_for(future, self._timeout)
+        except TimeoutError:
+            self._pending.pop(request_id, None)
+            raise RuntimeError(
+                f"Timed out waiting for Ableton to respond to '{command_type}'"
+            )
+
+    async def _read_loop(
+        self,
+        reader: asyncio.StreamReader,
+        pending: dict[int, asyncio.Future[dict[str, Any]]],
+    ) -> None:
+        error: Exception = ConnectionError("Connection closed by Ableton")
+        try:
+            while True:
+                header = await reader.readexactly(FRAME_HEADER.size)
+                payload = await reader.readexactly(decode_frame_header(header))
+                response = decode_payload(payload)
+                if "event" in response:
+                    self.version = response.get("version", self.version)
+                    self._dispatch_event(response)
+                    continue
+                request_id = response.pop("id", None)
+                if request_id is None and pending:
+                    # Control surfaces without request ids reply in order.
+                    request_id = next(iter(pending))
+                future = pending.pop(request_id, None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except asyncio.CancelledError:
+            raise
+        except (asyncio.IncompleteReadError, ConnectionError, OSError) as e:
+            if not isinstance(e, asyncio.IncompleteReadError):
+                error = ConnectionError(str(e))
+        except (ValueError, RuntimeError) as e:
+            error = ConnectionError(str(e))
+        finally:
+            if self._reader is reader:
+                self._writer = None
+                self._reader = None
+                self._framed = False
+                self._subscribed = {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            pending.clear()
+            self._dispatch_event({"event": "disconnected"})
+
+    def _dispatch_event(self, event: dict[str, Any]) -> None:
+        kind = event.get("event")
+        if kind == "disconnected":
+            channels = list(self._subscriptions)
+        else:
+            channels = ["transport" if kind == "transport" else "events"]
+        for channel in channels:
+            subscription = self._subscriptions.get(channel)
+            if subscription is None:
+                continue
+            try:
+                subscription[1](event)
+            except Exception:
+                logger.exception("Error handling %s event", kind)
+
+
+class PooledAbletonClient(AbletonClient):
+    """Thread-safe pool of ``SocketAbletonClient`` connections.
+
+    Each command checks out a connection of its own, so commands from many
+    threads never share a socket. The control surface serves every
+    connection on its own thread, which lets read-only commands on different
+    connections run in parallel instead of queueing behind one another.
+
+    Idle connections are health-checked on checkout: one that has been idle
+    longer than ``max_idle`` seconds, or that the control surface has closed,
+    is discarded and a fresh one opened in its place.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 9877,
+        size: int = 4,
+        framing: bool = True,
+        timeout: float = 60.0,
+        max_idle: float = 30.0,
+        validate: bool = False,
+    ) -> None:
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self._host = host
+        self._port = port
+        self._size = size
+        self._framing = framing
+        self._timeout = timeout
+        self._max_idle = max_idle
+        self._validate = validate
+        self._available = threading.Condition()
+        # Most recently used last, so busy periods reuse warm connections
+        self._idle: list[tuple[SocketAbletonClient, float]] = []
+        self._open = 0
+        # Shared by every connection
+        self.timings = CommandTimings()
+
+    def send_command(
+        self, command_type: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        if self._validate:
+            _validate(command_type, params or {})
+        connection = self._checkout()
+        try:
+            return connection.send_command(command_type, params)
+        finally:
+            if connection.version is not None:
+                self.version = connection.version
+            self._checkin(connection)
+
+    def disconnect(self) -> None:
+        """Close every idle connection."""
+        with self._available:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._available.notify_all()
+        for connection, _ in idle:
+            connection.disconnect()
+
+    def _checkout(self) -> SocketAbletonClient:
+        deadline = time.monotonic() + self._timeout
+        with self._available:
+            while not self._idle and self._open >= self._size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RuntimeError(
+                        "Timed out waiting for a free connection to Ableton"
+                    )
+                self._available.wait(remaining)
+            if self._idle:
+                connection, last_used = self._idle.pop()
+            else:
+                self._open += 1
+                connection = SocketAbletonClient(
+                    self._host, self._port, framing=self._framing, timeout=self._timeout
+                )
+                connection.timings = self.timings
+                return connection
+        if time.monotonic() - last_used > self._max_idle or not connection.is_alive():
+            # Reconnects lazily on the next command
+            connection.disconnect()
+        return connection
+
+    def _checkin(self, connection: SocketAbletonClient) -> None:
+        with self._available:
+            self._idle.append((connection, time.monotonic()))
+            self._available.notify()
+
+
+class CachingAbletonClient(AbletonClient):
+    """Caches the results of read-only commands in front of another client.
+
+    Agents tend to re-read the same track or device between edits, and every
+    read is a round trip that may queue behind Live's main thread. Cached
+    results are keyed by command and params and dropped when:
+
+    - a mutating command sent through this client touches the same track,
+      clip or device (see ``MUTATION_SCOPES``), or any command that isn't
+      scoped to one is sent
+    - Live's change counter moves for any other reason, e.g. an edit made
+      in Live itself that a change event or a later reply reports
+    - they are older than ``ttl`` seconds, which bounds how stale a read can
+      be when nothing reports the change
+
+    The control surface moves the counter for every edit to the set that a
+    cached read reports, whether or not anyone is subscribed. A client subscribed
+    to change events learns of an edit in Live within one of Live's ticks;
+    any other client only from its next reply, so until then a read may be
+    up to ``ttl`` seconds stale. Device parameters are never cached, since
+    automation moves them without an edit.
+    """
+
+    def __init__(
+        self, client: AbletonClient, ttl: float = 5.0, max_size: int = 512
+    ) -> None:
+        self._client = client
+        self._ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        # Least recently used first
+        self._entries: OrderedDict[
+            tuple[str, str], tuple[dict[str, Any], dict[str, Any], float]
+        ] = OrderedDict()
+        self._version = client.version
+        # Bumped on every invalidation, so a read that raced one isn't stored
+        self._generation = 0
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def supports_events(self) -> bool:
+        return self._client.supports_events
+
+    @property
+    def version(self) -> int | None:
+        return self._client.version
+
+    @property
+    def timings(self) -> CommandTimings | None:
+        return self._client.timings
+
+    @property
+    def capabilities(self) -> Capabilities | None:
+        return self._client.capabilities
+
+    async def warm_up(self) -> None:
+        await self._client.warm_up()
+
+    async def subscribe_events(self, callback: EventCallback) -> bool:
+        return await self._client.subscribe_events(callback)
+
+    async def subscribe_transport(
+        self, callback: EventCallback, interval: float = 0.1
+    ) -> bool:
+        return await self._client.subscribe_transport(callback, interval)
+
+    def send_command(
+        self, command_type: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        params = params or {}
+        if not is_cacheable(command_type):
+            self._start_write()
+            try:
+                return self._client.send_command(command_type, params)
+            finally:
+                self._finish_write(command_type, params)
+        key = _cache_key(command_type, params)
+        cached, generation = self._lookup(key)
+        if cached is not None:
+            return cached
+        result = self._client.send_command(command_type, params)
+        self._store(key, params, result, generation)
+        return result
+
+    async def send_command_async(
+        self, command_type: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        params = params or {}
+        if not is_cacheable(command_type):
+            self._start_write()
+            try:
+                return await self._client.send_command_async(command_type, params)
+            finally:
+                self._finish_write(command_type, params)
+        key = _cache_key(command_type, params)
+        cached, generation = self._lookup(key)
+        if cached is not None:
+            return cached
+        result = await self._client.send_command_async(command_type, params)
+        self._store(key, params, result, generation)
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def _lookup(self, key: tuple[str, str]) -> tuple[dict[str, Any] | None, int]:
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[2] < self._ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], self._generation
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None, self._generation
+
+    def _store(
+        self,
+        key: tuple[str, str],
+        params: dict[str, Any],
+        result: dict[str, Any],
+        generation: int,
+    ) -> None:
+        with self._lock:
+            self._check_version()
+            if generation != self._generation or self._writes:
+                return  # The set may have changed while it was being read
+            self._entries[key] = (result, params, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _start_write(self) -> None:
+        with self._lock:
+            self._writes += 1
+            self._generation += 1
+
+    def _finish_write(self, command_type: str, params: dict[str, Any]) -> None:
+        with self._lock:
+            self._writes -= 1
+            self._generation += 1
+            version = self._client.version
+            expected = (self._version, None)
+            if self._version is not None and not self._writes:
+                # Only this command ran, so only what it touched changed
+                expected = (self._version, self._version + 1, None)
+            self._version = version
+            if version not in expected:
+                self._clear()
+                return
+            for key in [
+                key
+                for key, (_, read, _) in self._entries.items()
+                if is_stale_after(read, command_type, params)
+            ]:
+                del self._entries[key]
+                self.invalidations += 1
+
+    def _check_version(self) -> None:
+        """Drop everything if the set changed without this client's help."""
+        version = self._client.version
+        if version != self._version and not self._writes:
+            self._version = version
+            self._clear()
+
+    def _clear(self) -> None:
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._generation += 1
+
+
+def _cache_key(command_type: str, params: dict[str, Any]) -> tuple[str, str]:
+    return command_type, json.dumps(params, sort_keys=True)
@@ -0,0 +1,601 @@
+"""Facts about control surface commands shared by the clients and server.
+
+``COMMANDS`` describes every command the control surface's ``COMMANDS``
+table offers: its params and their types, whether it only reads, what a
+mutation touches, and whether it may be cached or batched. The server
+generates a tool from each command with a description, and clients use the
+same entries to validate params and to choose whether a command is cached
+or retried.
+
+The control surface can't import this package, so its table is kept in
+step by hand; ``tests/test_commands.py`` checks that the two agree.
+"""
+
+from __future__ import annotations
+
+import types
+from dataclasses import dataclass
+from typing import Any, Union, get_args, get_origin
+
+from ableton_mcp import transforms
+
+#: Default of a param that must be given
+REQUIRED: Any = object()
+#: ``Param.none_as`` for a param that is left out when None
+OMIT: Any = object()
+
+
+@dataclass(frozen=True)
+class Param:
+    name: str
+    type: Any
+    default: Any = REQUIRED
+    #: Sent in place of a None argument; by default the param is left out
+    none_as: Any = OMIT
+
+    @property
+    def required(self) -> bool:
+        return self.default is REQUIRED
+
+
+@dataclass(frozen=True)
+class Command:
+    name: str
+    params: tuple[Param, ...] = ()
+    #: Only reads Live's state, so the control surface runs it off the main
+    #: thread and a client may retry it freely after a dropped connection
+    read_only: bool = False
+    #: For a mutation that only touches one track, clip or device, the
+    #: params that name it (see ``is_stale_after``)
+    scope: tuple[str, ...] | None = None
+    #: Whether a read's result may be cached. Diagnostics, the transport and
+    #: device parameters (which automation moves) change without any edit to
+    #: the set, so they never are.
+    cache: bool = True
+    #: Whether it may be an operation of ``batch``
+    batchable: bool = True
+    #: The generated tool's docstring. Commands without one have a
+    #: hand-written tool in ``server.py`` instead, or none.
+    description: str = ""
+    #: Name of the generated tool, if not the command's
+    tool: str | None = None
+    #: Whether the tool takes an ``output`` profile (see ``output``)
+    output: bool = False
+
+    @property
+    def tool_name(self) -> str:
+        return self.tool or self.name
+
+    def params_for(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        """The params to send for tool ``arguments``, leaving out optional
+        ones that are None unless they say otherwise."""
+        params = {}
+        for param in self.params:
+            value = arguments.get(param.name, param.default)
+            if value is None:
+                if param.none_as is OMIT:
+                    continue
+                value = param.none_as
+            params[param.name] = value
+        return params
+
+
+_TRACK = Param("track_index", int)
+_CLIP = Param("clip_index", int)
+_NOTES = Param("notes", list[dict])
+_NOTE_QUERY = (
+    _TRACK,
+    _CLIP,
+    Param("start_time", float | None, None),
+    Param("end_time", float | None, None),
+    Param("pitch_min", int | None, None),
+    Param("pitch_max", int | None, None),
+    Param("limit", int | None, None),
+    Param("cursor", str | None, None),
+)
+_NOTE_DIFF = (
+    _TRACK,
+    _CLIP,
+    Param("add", list[dict] | None, None, none_as=[]),
+    Param("remove", list[dict] | None, None, none_as=[]),
+    Param("modify", list[dict] | None, None, none_as=[]),
+)
+_NOTE_TRANSFORM = (_TRACK, _CLIP, Param("operations", list[dict]))
+_CATEGORIES = (
+    "all, instruments, audio_effects, midi_effects, sounds, drums, max_for_live"
+)
+
+_COMMANDS = [
+    # Session / Info
+    Command("get_session_info", read_only=True),
+    Command("get_track_info", (_TRACK,), read_only=True, output=True),
+    Command(
+        "get_session_snapshot",
+        (Param("include", list[str] | None, None),),
+        read_only=True,
+        output=True,
+    ),
+    # Track Management
+    Command(
+        "create_midi_track",
+        (Param("index", int, -1),),
+        description="Create a new MIDI track. Use index=-1 to append at the end.",
+    ),
+    Command(
+        "create_audio_track",
+        (Param("index", int, -1),),
+        description="Create a new audio track. Use index=-1 to append at the end.",
+    ),
+    Command("delete_track", (_TRACK,), description="Delete a track by index."),
+    Command(
+        "delete_all_tracks",
+        description="""Delete all tracks except one. Useful for clearing a session
+        before building a fresh arrangement. Returns the count of deleted tracks.""",
+    ),
+    Command(
+        "set_track_name",
+        (_TRACK, Param("name", str)),
+        scope=("track_index",),
+        description="Rename a track.",
+    ),
+    Command(
+        "set_track_volume",
+        (_TRACK, Param("volume", float)),
+        scope=("track_index",),
+        description="Set track volume. Range: 0.0 (silence) to 1.0 (max).",
+    ),
+    Command(
+        "set_track_pan",
+        (_TRACK, Param("pan", float)),
+        scope=("track_index",),
+        description="""Set track pan. Range: -1.0 (full left) to 1.0 (full right),
+        0.0 is center.""",
+    ),
+    Command(
+        "set_track_mute",
+        (_TRACK, Param("mute", bool)),
+        scope=("track_index",),
+        description="Mute or unmute a track.",
+    ),
+    Command(
+        "set_track_solo",
+        (_TRACK, Param("solo", bool)),
+        scope=("track_index",),
+        description="Solo or unsolo a track.",
+    ),
+    # Clip Operations
+    Command(
+        "create_clip",
+        (_TRACK, _CLIP, Param("length", float, 4.0)),
+        scope=("track_index", "clip_index"),
+        description="Create an empty MIDI clip in a clip slot. Length is in beats.",
+    ),
+    Command(
+        "add_notes_to_clip",
+        (_TRACK, _CLIP, _NOTES, Param("append", bool, False)),
+        scope=("track_index", "clip_index"),
+        description="""Add MIDI notes to a clip. Each note is a dict with keys:
+        pitch (0-127), start_time (beats), duration (beats),
+        velocity (0-127, default 100), mute (bool, default false).
+        By default this replaces all existing notes in the clip.
+        Set append=true to keep existing notes and add the new ones on top.""",
+    ),
+    Command(
+        "apply_note_diff",
+        _NOTE_DIFF,
+        scope=("track_index", "clip_index"),
+        description="""Edit individual notes in a session clip without resending
+        the rest.
+        add: new notes, as in add_notes_to_clip.
+        remove: notes to delete, each named by note_id (from get_clip_notes,
+        Live 11+) or by pitch and start_time.
+        modify: notes to change, named the same way, with the new values in
+        "changes", e.g. {"note_id": 12, "changes": {"velocity": 90}}.
+        If any named note doesn't exist, a change names an unknown field, or
+        a note is both removed and modified, nothing is changed.""",
+    ),
+    Command(
+        "transform_clip_notes",
+        _NOTE_TRANSFORM,
+        scope=("track_index", "clip_index"),
+    ),
+    Command(
+        "set_clip_name",
+        (_TRACK, _CLIP, Param("name", str)),
+        scope=("track_index", "clip_index"),
+        description="Rename a clip.",
+    ),
+    Command(
+        "fire_clip",
+        (_TRACK, _CLIP),
+        scope=("track_index",),
+        description="Start playing a clip.",
+    ),
+    Command(
+        "stop_clip",
+        (_TRACK, _CLIP),
+        scope=("track_index",),
+        description="Stop a playing clip.",
+    ),
+    Command(
+        "get_clip_notes",
+        _NOTE_QUERY,
+        read_only=True,
+        output=True,
+        description="""Read MIDI notes from a session clip.
+        Returns a list of notes with pitch, start_time, duration, velocity,
+        and mute (and note_id on Live 11+).
+        To read only part of a long clip, pass a time window in beats
+        (start_time, end_time) and/or a pitch range (pitch_min, pitch_max).
+        Pass limit to read a page at a time: the result then includes
+        next_cursor while more notes remain; pass it as cursor for the next
+        page.
+        output="table" returns the notes as rows under one header, about
+        half the size of the default.""",
+    ),
+    Command(
+        "get_clip_info",
+        (_TRACK, _CLIP),
+        read_only=True,
+        description="""Get detailed info about a session clip: name, length,
+        loop_start, loop_end, is_playing, is_recording.""",
+    ),
+    Command(
+        "duplicate_clip_to_scene",
+        (_TRACK, Param("source_clip_index", int), Param("dest_clip_index", int)),
+        scope=("track_index",),
+        description="""Duplicate a session clip from one scene to another on the same
+        track. The destination clip slot must be empty.""",
+    ),
+    Command(
+        "delete_clip",
+        (_TRACK, _CLIP),
+        scope=("track_index", "clip_index"),
+        description="Delete a clip from a session clip slot.",
+    ),
+    # Scene Management
+    Command(
+        "create_scene",
+        (Param("index", int, -1),),
+        description="""Create a new empty scene. Use index=-1 to append at the end.
+        Adds a new clip slot row across all tracks.""",
+    ),
+    Command(
+        "delete_scene",
+        (Param("scene_index", int),),
+        description="Delete a scene by index. Cannot delete the last scene.",
+    ),
+    Command(
+        "set_scene_name",
+        (Param("scene_index", int), Param("name", str)),
+        description="Rename a scene (the label in the Master track column).",
+    ),
+    Command(
+        "fire_scene",
+        (Param("scene_index", int),),
+        description="Fire all clips in a scene simultaneously.",
+    ),
+    # Transport
+    Command("start_playback", description="Start session playback."),
+    Command("stop_playback", description="Stop session playback."),
+    Command("get_transport", read_only=True, cache=False),
+    Command(
+        "set_tempo",
+        (Param("tempo", float),),
+        description="Set the session tempo in BPM.",
+    ),
+    Command(
+        "set_time_signature",
+        (Param("numerator", int), Param("denominator", int)),
+        description="Set the song's time signature (e.g. 4/4, 5/4, 7/8).",
+    ),
+    Command(
+        "undo",
+        description="Trigger Ableton's undo. Safety net for destructive operations.",
+    ),
+    # Browser / Devices
+    Command(
+        "get_browser_tree",
+        (Param("category_type", str, "all"),),
+        read_only=True,
+        description=f"""Browse Ableton's instrument and effect categories.
+        category_type can be: {_CATEGORIES}.""",
+    ),
+    Command(
+        "get_browser_items_at_path",
+        (Param("path", str),),
+        read_only=True,
+        output=True,
+        description="""List items at a browser path. Paths can start with a top-level
+        category (e.g. 'Sounds/Bass', 'Instruments/Analog', 'Audio Effects/Reverb') or
+        use a bare subcategory name (e.g. 'Bass').
+        Use get_browser_tree first to discover available categories.
+        output="table" returns the items as rows under one header.""",
+    ),
+    Command(
+        "search_browser",
+        (Param("query", str), Param("category", str, "all"), Param("limit", int, 20)),
+        read_only=True,
+        output=True,
+        description=f"""Search Ableton's browser by name and return the best-matching
+        items with their URIs, ready for load_instrument_or_effect. Much faster than
+        walking get_browser_tree and get_browser_items_at_path level by level.
+        Matches words and word prefixes in item names and folder paths and
+        tolerates small typos (e.g. "grand piano", "808 kit", "reverb hall").
+        category can be: {_CATEGORIES}.
+        output="table" returns the matches as rows under one header.""",
+    ),
+    Command(
+        "load_browser_item",
+        (_TRACK, Param("uri", str), Param("clear_existing", bool, False)),
+        scope=("track_index",),
+        tool="load_instrument_or_effect",
+        description="""Load an instrument or effect onto a track by its browser URI.
+        Use get_browser_tree and get_browser_items_at_path to find URIs.
+        Returns the loaded device_name so you can verify the correct device was loaded.
+        Set clear_existing=true to remove all existing devices from the track before
+        loading — recommended when replacing an instrument on a non-empty track.
+        IMPORTANT: load instruments sequentially, not in parallel. Concurrent loads
+        will fail or land on the wrong track.""",
+    ),
+    Command(
+        "create_midi_track_with_instrument",
+        (Param("uri", str), Param("index", int, -1), Param("name", str | None, None)),
+    ),
+    # Device Parameters
+    Command(
+        "get_device_parameters",
+        (_TRACK, Param("device_index", int)),
+        read_only=True,
+        cache=False,
+        output=True,
+        description="""List all parameters of a device on a track.
+        Returns device_name and a list of parameters with name, value, min, max.
+        output="table" returns the parameters as rows under one header.""",
+    ),
+    Command(
+        "set_device_parameter",
+        (
+            _TRACK,
+            Param("device_index", int),
+            Param("param_index", int),
+            Param("value", float),
+        ),
+        scope=("track_index", "device_index"),
+        description="""Set a device parameter value. Value is clamped to the parameter's
+        min/max range. Use get_device_parameters to discover available parameters.""",
+    ),
+    # Arrangement View
+    Command(
+        "get_arrangement_clips",
+        (_TRACK,),
+        read_only=True,
+        output=True,
+        description="""Get all clips on the arrangement timeline for a track.
+        Returns each clip's index, name, start_time, end_time, and length
+        in beats. Requires Ableton Live 11+.
+        output="table" returns the clips as rows under one header.""",
+    ),
+    Command(
+        "create_arrangement_clip",
+        (_TRACK, Param("start_time", float), Param("length", float)),
+        scope=("track_index",),
+        description="""Create an empty MIDI clip on the arrangement timeline.
+        start_time and length are in beats.""",
+    ),
+    Command(
+        "delete_arrangement_clip",
+        (_TRACK, _CLIP),
+        scope=("track_index",),
+        description="""Delete a clip from the arrangement timeline.
+        Use get_arrangement_clips to find the clip_index.""",
+    ),
+    Command(
+        "duplicate_arrangement_clip",
+        (_TRACK, _CLIP, Param("destination_time", float)),
+        scope=("track_index",),
+        description="""Duplicate an arrangement clip to a new position on the timeline.
+        destination_time is in beats.""",
+    ),
+    Command(
+        "get_arrangement_clip_notes",
+        _NOTE_QUERY,
+        read_only=True,
+        output=True,
+        description="""Read MIDI notes from an arrangement clip.
+        Returns a list of notes with pitch, start_time, duration, velocity,
+        and mute (and note_id on Live 11+). Times are relative to the clip.
+        Takes the same optional window (start_time, end_time, pitch_min,
+        pitch_max) and paging (limit, cursor) and output as get_clip_notes.""",
+    ),
+    Command(
+        "set_arrangement_clip_notes",
+        (_TRACK, _CLIP, _NOTES),
+        scope=("track_index", "clip_index"),
+        description="""Set MIDI notes on an arrangement clip. Replaces all existing
+        notes. Each note is a dict with keys: pitch (0-127), start_time (beats),
+        duration (beats), velocity (0-127, default 100), mute (bool, default false).""",
+    ),
+    Command(
+        "apply_arrangement_note_diff",
+        _NOTE_DIFF,
+        scope=("track_index", "clip_index"),
+        description="""Edit individual notes in an arrangement clip without resending
+        the rest. Takes add, remove and modify lists as in apply_note_diff.""",
+    ),
+    Command(
+        "transform_arrangement_clip_notes",
+        _NOTE_TRANSFORM,
+        scope=("track_index", "clip_index"),
+    ),
+    Command(
+        "set_song_time",
+        (Param("time", float),),
+        description="Set the playback cursor position in beats.",
+    ),
+    Command(
+        "get_arrangement_loop",
+        read_only=True,
+        description="Get the arrangement loop brace position and length in beats.",
+    ),
+    Command(
+        "set_arrangement_loop",
+        (Param("start", float), Param("length", float)),
+        description="Set the arrangement loop brace. start and length are in beats.",
+    ),
+    Command(
+        "back_to_arranger",
+        description="""Switch playback from session view back to the arrangement.
+        Stops all session clips and resumes arrangement playback.""",
+    ),
+    Command(
+        "duplicate_session_to_arrangement",
+        (_TRACK, _CLIP, Param("destination_time", float)),
+        description="""Copy a session view clip to the arrangement timeline.
+        destination_time is the position in beats where the clip will be placed.""",
+    ),
+    Command(
+        "session_to_arrangement",
+        (Param("scene_indices", list[int]),),
+        description="""Lay out session view scenes sequentially on the arrangement
+        timeline. Takes a list of scene indices and places each scene's clips end-to-end
+        starting from beat 0. Use this to build a full song structure from
+        session view clips.""",
+    ),
+    # Batching
+    Command(
+        "batch",
+        (Param("operations", list[dict]), Param("stop_on_error", bool, True)),
+        batchable=False,
+        description="""Run many commands in one round trip and one Ableton main-thread
+        tick. Much faster than calling tools one by one when building a session.
+        Each operation is a dict with "type" (the command name, which matches
+        the tool name except load_instrument_or_effect, whose command is
+        load_browser_item) and "params" (the tool's arguments), e.g.
+        {"type": "set_track_name", "params": {"track_index": 0, "name": "Bass"}}.
+        Operations run in order. Returns a result or error per operation.
+        With stop_on_error=true (the default) the batch stops at the first
+        failure and the remaining operations are skipped; set it to false to
+        run every operation regardless.""",
+    ),
+    # Diagnostics
+    Command("get_cache_stats", read_only=True, cache=False),
+    Command(
+        "get_performance_stats",
+        (Param("reset", bool, False),),
+        read_only=True,
+        cache=False,
+    ),
+]
+
+COMMANDS: dict[str, Command] = {command.name: command for command in _COMMANDS}
+
+# Commands that only read Live's state
+READ_ONLY_COMMANDS = frozenset(
+    command.name for command in _COMMANDS if command.read_only
+)
+
+# Mutating commands that only touch one track, clip or device, mapped to the
+# params that name it. A cached read is stale after one of these only if its
+# own params don't name a different track, clip or device. Any other mutating
+# command may shift indexes or touch the whole set, so it invalidates every
+# cached read. Commands that add, remove or fire clips are scoped to the
+# whole track, since they shift other clips or change what plays.
+MUTATION_SCOPES: dict[str, tuple[str, ...]] = {
+    command.name: command.scope for command in _COMMANDS if command.scope is not None
+}
+
+
+# Commands whose operations are note transforms (see ``transforms``)
+_TRANSFORMS = frozenset({"transform_clip_notes", "transform_arrangement_clip_notes"})
+
+
+def is_read_only(command_type: str) -> bool:
+    return command_type in READ_ONLY_COMMANDS
+
+
+def is_cacheable(command_type: str) -> bool:
+    command = COMMANDS.get(command_type)
+    return command is not None and command.read_only and command.cache
+
+
+def is_stale_after(
+    read: dict[str, Any], command_type: str, params: dict[str, Any]
+) -> bool:
+    """Whether a read with params ``read`` may have changed after a command."""
+    scope = MUTATION_SCOPES.get(command_type)
+    if scope is None:
+        return True
+    return all(name not in read or read[name] == params.get(name) for name in scope)
+
+
+def validate(command_type: str, params: dict[str, Any]) -> None:
+    """Raise ValueError if ``params`` don't fit the command.
+
+    Commands missing from ``COMMANDS`` aren't checked, so a control surface
+    newer than this package can still be sent them.
+    """
+    command = COMMANDS.get(command_type)
+    if command is None:
+        return
+    expected = {param.name: param for param in command.params}
+    for name in params:
+        if name not in expected:
+            raise ValueError(f"Unknown parameter '{name}' for '{command_type}'")
+    for param in command.params:
+        if param.name not in params:
+            if param.required:
+                raise ValueError(
+                    f"Missing parameter '{param.name}' for '{command_type}'"
+                )
+            continue
+        if not _matches(params[param.name], param.type):
+            raise ValueError(
+                f"Parameter '{param.name}' for '{command_type}' must be"
+                f" {_type_name(param.type)}"
+            )
+    if command_type == "batch":
+        for i, operation in enumerate(params["operations"]):
+            _validate_operation(i, operation)
+    elif command_type in _TRANSFORMS:
+        transforms.validate_operations(params["operations"])
+
+
+def _validate_operation(index: int, operation: dict[str, Any]) -> None:
+    command_type = operation.get("type")
+    if not isinstance(command_type, str):
+        raise ValueError(f"Operation {index} has no command type")
+    command = COMMANDS.get(command_type)
+    if command is not None and not command.batchable:
+        raise ValueError(f"Operation {index}: '{command_type}' can't be batched")
+    params = operation.get("params") or {}
+    if not isinstance(params, dict):
+        raise ValueError(f"Operation {index}: params must be an object")
+    try:
+        validate(command_type, params)
+    except ValueError as e:
+        raise ValueError(f"Operation {index}: {e}") from None
+
+
+def _matches(value: Any, annotation: Any) -> bool:
+    origin = get_origin(annotation)
+    if origin in (Union, types.UnionType):
+        return any(_matches(value, arg) for arg in get_args(annotation))
+    if origin is list:
+        (item_type,) = get_args(annotation)
+        return isinstance(value, list) and all(
+            _matches(item, item_type) for item in value
+        )
+    if annotation is type(None):
+        return value is None
+    if isinstance(value, bool):
+        return annotation is bool
+    if annotation is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, annotation)
+
+
+def _type_name(annotation: Any) -> str:
+    if isinstance(annotation, type) and get_origin(annotation) is None:
+        return annotation.__name__
+    return str(annotation)
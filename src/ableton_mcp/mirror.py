@@ -0,0 +1,140 @@
+"""Local copy of the Live set, kept current by control surface events.
+
+Once subscribed, the control surface sends a ``snapshot`` event holding a
+full ``get_session_snapshot`` result, then an event whenever part of the set
+changes:
+
+- ``{"event": "song", "song": {...}}``: the ``get_session_info`` fields
+- ``{"event": "track", "section": "tracks", "index": 2, "track": {...}}``:
+  one track, return track (section "return_tracks") or the master track
+  (section "master", no index), described as in the snapshot
+- ``{"event": "scene", "index": 0, "scene": {...}}``: one scene
+
+Adding, removing or moving tracks or scenes resends the whole snapshot, so
+indexes in the mirror always match the set. Events for a command are sent
+before its reply, so the mirror reflects every command that has returned.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+# Parts of each track dict that get_session_snapshot's include can drop
+_TRACK_SECTIONS = ("clip_slots", "arrangement_clips", "devices")
+_SECTIONS = ("tracks", "return_tracks", "master", "scenes") + _TRACK_SECTIONS
+
+
+class SessionMirror:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._snapshot: dict[str, Any] | None = None
+        #: Set once events have been subscribed to; the client resubscribes
+        #: by itself after reconnecting
+        self.subscribed = False
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None
+
+    def apply(self, event: dict[str, Any]) -> None:
+        kind = event.get("event")
+        with self._lock:
+            if kind == "snapshot":
+                self._snapshot = event["snapshot"]
+                return
+            if kind == "disconnected":
+                # Changes may be missed until the next snapshot
+                self._snapshot = None
+                return
+            snapshot = self._snapshot
+            if snapshot is None:
+                return
+            # Replace rather than mutate, so results already handed out by
+            # the accessors below never change under their readers
+            snapshot = dict(snapshot)
+            if kind == "song":
+                snapshot["song"] = event["song"]
+            elif kind == "track" and event.get("section") == "master":
+                snapshot["master"] = event["track"]
+            elif kind == "track":
+                section = event["section"]
+                snapshot[section] = _replaced(
+                    snapshot.get(section, []), event["index"], event["track"]
+                )
+            elif kind == "scene":
+                snapshot["scenes"] = _replaced(
+                    snapshot.get("scenes", []), event["index"], event["scene"]
+                )
+            else:
+                return
+            self._snapshot = snapshot
+
+    def session_info(self) -> dict[str, Any] | None:
+        """The ``get_session_info`` result, or None if not mirrored yet."""
+        with self._lock:
+            return None if self._snapshot is None else self._snapshot["song"]
+
+    def snapshot(self, include: list[str] | None = None) -> dict[str, Any] | None:
+        """The ``get_session_snapshot`` result for ``include``, or None if not
+        mirrored yet or ``include`` names an unknown section."""
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot is None or include is None:
+            return snapshot
+        if not set(include).issubset(_SECTIONS):
+            return None
+        result = {"song": snapshot["song"]}
+        for section in ("tracks", "return_tracks", "scenes"):
+            if section in include:
+                result[section] = [
+                    _without(item, include) for item in snapshot.get(section, [])
+                ]
+        if "master" in include and "master" in snapshot:
+            result["master"] = _without(snapshot["master"], include)
+        return result
+
+    def track_info(self, track_index: int) -> dict[str, Any] | None:
+        """The ``get_track_info`` result, or None if the track isn't known."""
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        tracks = snapshot.get("tracks", [])
+        if not 0 <= track_index < len(tracks):
+            return None
+        track = tracks[track_index]
+        clips = {slot["index"]: slot for slot in track.get("clip_slots", [])}
+        clip_slots = []
+        for i in range(snapshot["song"]["scene_count"]):
+            slot = {"index": i, "has_clip": i in clips}
+            if i in clips:
+                slot["clip_name"] = clips[i]["name"]
+                slot["clip_length"] = clips[i]["length"]
+                slot["is_playing"] = clips[i]["is_playing"]
+            clip_slots.append(slot)
+        return {
+            "name": track["name"],
+            "mute": track["mute"],
+            "solo": track["solo"],
+            "arm": track.get("arm", False),
+            "volume": track["volume"],
+            "pan": track["pan"],
+            "clip_slots": clip_slots,
+            "devices": track.get("devices", []),
+        }
+
+
+def _replaced(items: list, index: int, item: Any) -> list:
+    items = list(items)
+    if 0 <= index < len(items):
+        items[index] = item
+    return items
+
+
+def _without(item: dict[str, Any], include: list[str]) -> dict[str, Any]:
+    return {
+        key: value
+        for key, value in item.items()
+        if key not in _TRACK_SECTIONS or key in include
+    }
@@ -0,0 +1,129 @@
+"""Columnar note encoding shared with the AbletonMCP control surface.
+
+As JSON objects every note repeats its five key names, so a dense clip costs
+around 80 bytes per note and a dict per note on both ends. The columnar form
+packs each field into one little-endian array and base64 encodes it:
+
+    {"format": "columnar", "count": 2, "pitch": "PEA=", "start_time": ..., ...}
+
+Pitch and mute are packed as unsigned bytes, start_time and duration as
+float64 and velocity as float32, roughly 30 bytes per note on the wire. Notes
+read from Live 11+ add a ``note_id`` column of unsigned 32-bit ints.
+
+The clients use it transparently: when the control surface advertises the
+``columnar_notes`` feature, note lists in outgoing commands are packed and
+note reads are asked for in columnar form, then unpacked back into the usual
+list of dicts, so callers never see the difference.
+"""
+
+from __future__ import annotations
+
+import base64
+import sys
+from array import array
+from typing import Any
+
+FEATURE = "columnar_notes"
+FORMAT_COLUMNAR = "columnar"
+
+_FIELDS = ("pitch", "start_time", "duration", "velocity", "mute")
+_TYPECODES = ("B", "d", "d", "f", "B")
+_DEFAULTS = (60, 0.0, 0.5, 100, False)
+
+# Commands that take a note list, keyed to its param, and those that return one
+_WRITES = {
+    "add_notes_to_clip": "notes",
+    "set_arrangement_clip_notes": "notes",
+    "apply_note_diff": "add",
+    "apply_arrangement_note_diff": "add",
+}
+_READS = frozenset({"get_clip_notes", "get_arrangement_clip_notes"})
+
+
+def encode_notes(notes: list[dict[str, Any]]) -> dict[str, Any]:
+    """Pack a list of note dicts into columnar form.
+
+    Missing fields take the same defaults the control surface applies.
+    Raises OverflowError or TypeError for values a column can't hold.
+    """
+    columns: dict[str, Any] = {"format": FORMAT_COLUMNAR, "count": len(notes)}
+    for field, typecode, default in zip(_FIELDS, _TYPECODES, _DEFAULTS):
+        packed = array(typecode, (note.get(field, default) for note in notes))
+        columns[field] = _to_base64(packed)
+    return columns
+
+
+def decode_notes(columns: dict[str, Any]) -> list[dict[str, Any]]:
+    """Unpack columnar notes into a list of note dicts."""
+    count = columns["count"]
+    unpacked = []
+    for field, typecode in zip(_FIELDS, _TYPECODES):
+        column = _from_base64(typecode, columns[field])
+        if len(column) != count:
+            raise ValueError(
+                f"Column '{field}' holds {len(column)} notes, expected {count}"
+            )
+        unpacked.append(column)
+    pitches, starts, durations, velocities, mutes = unpacked
+    notes = [
+        {
+            "pitch": pitches[i],
+            "start_time": starts[i],
+            "duration": durations[i],
+            "velocity": velocities[i],
+            "mute": bool(mutes[i]),
+        }
+        for i in range(count)
+    ]
+    if "note_id" in columns:
+        for note, note_id in zip(notes, _from_base64("I", columns["note_id"])):
+            note["note_id"] = note_id
+    return notes
+
+
+def is_columnar(value: Any) -> bool:
+    return isinstance(value, dict) and value.get("format") == FORMAT_COLUMNAR
+
+
+def pack_message(message: dict[str, Any], features: frozenset[str]) -> dict[str, Any]:
+    """Return ``message`` with its notes in columnar form where supported.
+
+    The original message is left untouched so it can be re-sent as is over
+    a connection that turns out not to support the format.
+    """
+    if FEATURE not in features:
+        return message
+    command_type = message["type"]
+    params = message["params"]
+    if command_type in _READS:
+        return {**message, "params": {**params, "note_format": FORMAT_COLUMNAR}}
+    param = _WRITES.get(command_type)
+    if param is not None and isinstance(params.get(param), list):
+        try:
+            notes = encode_notes(params[param])
+        except (OverflowError, TypeError, ValueError):
+            # Let the control surface reject the bad note as it always has
+            return message
+        return {**message, "params": {**params, param: notes}}
+    return message
+
+
+def unpack_result(result: Any) -> Any:
+    """Expand columnar notes in a command result back into note dicts."""
+    if isinstance(result, dict) and is_columnar(result.get("notes")):
+        return {**result, "notes": decode_notes(result["notes"])}
+    return result
+
+
+def _to_base64(packed: array) -> str:
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return base64.b64encode(packed.tobytes()).decode("ascii")
+
+
+def _from_base64(typecode: str, data: str) -> array:
+    packed = array(typecode)
+    packed.frombytes(base64.b64decode(data))
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed
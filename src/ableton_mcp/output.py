@@ -0,0 +1,66 @@
+"""How tool results are written out for the MCP host.
+
+Every tool returns JSON text, which the host transfers and the model reads
+token by token. Three profiles trade readability for size:
+
+- ``pretty``: indented, the default
+- ``compact``: no whitespace at all
+- ``table``: compact, and lists of objects (notes, clip slots, parameters,
+  browser items...) become a header and rows, so keys aren't repeated::
+
+    {"notes": {"columns": ["pitch", "start_time"], "rows": [[60, 0.0], ...]}}
+
+The default comes from the ``ABLETON_MCP_OUTPUT`` environment variable, and
+tools that return long lists also take an ``output`` argument.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Literal
+
+OutputProfile = Literal["pretty", "compact", "table"]
+
+PROFILES: tuple[OutputProfile, ...] = ("pretty", "compact", "table")
+OUTPUT_ENV = "ABLETON_MCP_OUTPUT"
+
+_COMPACT = (",", ":")
+
+
+def default_profile() -> OutputProfile:
+    """The profile named by ``ABLETON_MCP_OUTPUT``, or ``pretty``."""
+    profile = os.environ.get(OUTPUT_ENV, "pretty").strip().lower() or "pretty"
+    if profile not in PROFILES:
+        raise ValueError(
+            f"{OUTPUT_ENV} must be one of {', '.join(PROFILES)}, not {profile!r}"
+        )
+    return profile  # type: ignore[return-value]
+
+
+def encode(value: Any, profile: OutputProfile = "pretty") -> str:
+    if profile == "pretty":
+        return json.dumps(value, indent=2)
+    if profile == "table":
+        value = tabulate(value)
+    return json.dumps(value, separators=_COMPACT)
+
+
+def tabulate(value: Any) -> Any:
+    """``value`` with every list of two or more objects turned into
+    ``{"columns": [...], "rows": [[...], ...]}``.
+
+    Columns are every key of any row, in first-seen order, and a row without
+    one of them has null there. Other values are kept as they are.
+    """
+    if isinstance(value, dict):
+        return {key: tabulate(item) for key, item in value.items()}
+    if not isinstance(value, list):
+        return value
+    if len(value) < 2 or not all(isinstance(item, dict) for item in value):
+        return [tabulate(item) for item in value]
+    columns = list(dict.fromkeys(key for item in value for key in item))
+    return {
+        "columns": columns,
+        "rows": [[tabulate(item.get(key)) for key in columns] for item in value],
+    }
@@ -0,0 +1,94 @@
+"""Wire format shared with the AbletonMCP control surface.
+
+Messages are UTF-8 encoded JSON objects. Legacy connections write them back to
+back with no delimiter, so a reader can only find the end of a message by
+trying to parse what it has buffered so far. Framed connections prefix every
+message with its length as a 4-byte big-endian unsigned integer, which lets
+each side read exactly one message and parse it exactly once.
+
+A connection always starts in legacy mode. The client opens it with a
+``hello`` handshake, which asks for framing and gets back what the control
+surface supports (see ``Capabilities``). Control surfaces that predate hello
+answer with an "Unknown command" error, and the client falls back to the
+older ``set_framing`` handshake; those that predate framing reject that too,
+and the connection simply stays in legacy mode.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from dataclasses import dataclass
+from typing import Any
+
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 256 * 1024 * 1024
+FRAMING_LENGTH_PREFIXED = "length"
+
+HELLO = {"type": "hello", "params": {"framing": FRAMING_LENGTH_PREFIXED}}
+SET_FRAMING = {"type": "set_framing", "params": {"framing": FRAMING_LENGTH_PREFIXED}}
+
+_WHITESPACE = frozenset(b" \t\r\n")
+_CLOSE_BRACE = ord("}")
+
+
+def encode_message(message: dict[str, Any]) -> bytes:
+    """Encode a message for a legacy (unframed) connection."""
+    return json.dumps(message).encode("utf-8")
+
+
+def encode_frame(message: dict[str, Any]) -> bytes:
+    """Encode a message as a length-prefixed frame."""
+    payload = json.dumps(message).encode("utf-8")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def decode_frame_header(header: bytes) -> int:
+    """Return the payload length announced by a frame header."""
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise RuntimeError(
+            f"Frame of {length} bytes exceeds the {MAX_FRAME_SIZE} byte limit"
+        )
+    return length
+
+
+def decode_payload(payload: bytes) -> dict[str, Any]:
+    return json.loads(payload.decode("utf-8"))
+
+
+def looks_complete(buffer: bytes | bytearray) -> bool:
+    """Cheap pre-check before attempting to parse a legacy message.
+
+    A complete JSON object always ends with ``}``, so a buffer that doesn't
+    can be skipped without paying for a full parse attempt. Only the trailing
+    bytes are inspected, so the check is O(1) regardless of buffer size.
+    """
+    i = len(buffer) - 1
+    while i >= 0 and buffer[i] in _WHITESPACE:
+        i -= 1
+    return i >= 0 and buffer[i] == _CLOSE_BRACE
+
+
+@dataclass(frozen=True)
+class Capabilities:
+    """What the control surface reported in its ``hello``, for one
+    connection."""
+
+    protocol: int
+    #: e.g. "12.1.0", or "0.0.0" if Live didn't say
+    live_version: str
+    commands: frozenset[str]
+    features: frozenset[str]
+
+    @classmethod
+    def from_result(cls, result: dict[str, Any]) -> Capabilities | None:
+        """Read a handshake result; None if it came from ``set_framing``."""
+        if "protocol" not in result:
+            return None
+        return cls(
+            protocol=result["protocol"],
+            live_version=result.get("live_version", "0.0.0"),
+            commands=frozenset(result.get("commands", ())),
+            features=frozenset(result.get("features", ())),
+        )
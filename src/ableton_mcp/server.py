@@ -1,295 +1,313 @@
+import asyncio
+import inspect
 import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable
 
 from injector import Injector, Module, provider, singleton
 from mcp.server.fastmcp import FastMCP
 
-from ableton_mcp.client import AbletonClient, SocketAbletonClient
+from ableton_mcp import transforms
+from ableton_mcp.client import (
+    AbletonClient,
+    AsyncAbletonClient,
+    CachingAbletonClient,
+    UnsupportedCommandError,
+)
+from ableton_mcp.commands import COMMANDS, Command
+from ableton_mcp.mirror import SessionMirror
+from ableton_mcp.output import OutputProfile, default_profile, encode
+from ableton_mcp.transport import TransportFollower, poll_for, transport_matches
+
+# Seconds between transport updates the control surface pushes while
+# something is following the transport
+TRANSPORT_INTERVAL = 0.1
 
 
 class AbletonModule(Module):
     @singleton
     @provider
     def provide_ableton_client(self) -> AbletonClient:
-        return SocketAbletonClient()
+        return CachingAbletonClient(AsyncAbletonClient(validate=True))
+
+
+def _tool_signature(command: Command) -> inspect.Signature:
+    parameters = [
+        inspect.Parameter(
+            param.name,
+            inspect.Parameter.KEYWORD_ONLY,
+            default=inspect.Parameter.empty if param.required else param.default,
+            annotation=param.type,
+        )
+        for param in command.params
+    ]
+    if command.output:
+        parameters.append(
+            inspect.Parameter(
+                "output",
+                inspect.Parameter.KEYWORD_ONLY,
+                default=None,
+                annotation=OutputProfile | None,
+            )
+        )
+    return inspect.Signature(parameters, return_annotation=str)
 
 
-def create_server(injector: Injector | None = None) -> FastMCP:
+def create_server(
+    injector: Injector | None = None, output: OutputProfile | None = None
+) -> FastMCP:
+    """Build the server. ``output`` is the default output profile for tool
+    results, and defaults to ``ABLETON_MCP_OUTPUT`` (see ``output``)."""
     if injector is None:
         injector = Injector([AbletonModule])
-
-    mcp = FastMCP("ableton-mcp")
+    default_output = output or default_profile()
 
     def _client() -> AbletonClient:
         return injector.get(AbletonClient)
 
-    def _call(command_type: str, params: dict | None = None) -> str:
+    @asynccontextmanager
+    async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+        # Connect while the host is still listing tools, so the first tool
+        # call doesn't wait for it; without Live running this does nothing
+        warm_up = asyncio.create_task(_client().warm_up())
+        try:
+            yield
+        finally:
+            warm_up.cancel()
+
+    mcp = FastMCP("ableton-mcp", lifespan=lifespan)
+
+    mirror = SessionMirror()
+
+    def _dump(result: object, output: OutputProfile | None = None) -> str:
+        return encode(result, output or default_output)
+
+    async def _call(
+        command_type: str,
+        params: dict | None = None,
+        output: OutputProfile | None = None,
+    ) -> str:
         try:
-            result = _client().send_command(command_type, params)
-            return json.dumps(result, indent=2)
+            result = await _client().send_command_async(command_type, params)
+            return _dump(result, output)
         except RuntimeError as e:
             return json.dumps({"error": str(e)})
 
+    async def _mirror() -> SessionMirror | None:
+        """The local copy of the set, if the client can keep one current.
+
+        Reads it can answer skip the round trip to Live entirely.
+        """
+        client = _client()
+        if not client.supports_events:
+            return None
+        if not mirror.subscribed:
+            mirror.subscribed = await client.subscribe_events(mirror.apply)
+        return mirror if mirror.ready else None
+
+    transport = TransportFollower()
+
+    async def _transport() -> TransportFollower | None:
+        """The pushed transport state, if the client can follow it."""
+        client = _client()
+        if not client.supports_events:
+            return None
+        if not transport.subscribed:
+            transport.subscribed = await client.subscribe_transport(
+                transport.apply, TRANSPORT_INTERVAL
+            )
+        # After a dropped connection, reads reconnect and resubscribe
+        return transport if transport.state is not None else None
+
+    async def _read_transport() -> dict:
+        if (follower := await _transport()) is not None:
+            return follower.state
+        return await _client().send_command_async("get_transport")
+
+    def _command_tool(command: Command) -> Callable[..., Any]:
+        """A tool that sends ``command`` with its arguments as params."""
+
+        async def tool(**arguments: Any) -> str:
+            output = arguments.pop("output", None)
+            return await _call(command.name, command.params_for(arguments), output)
+
+        tool.__name__ = command.tool_name
+        tool.__doc__ = command.description
+        # FastMCP builds the tool's input schema from the signature
+        tool.__signature__ = _tool_signature(command)  # type: ignore[attr-defined]
+        return tool
+
+    # ── Generated Tools ─────────────────────────────────────────────
+
+    # Commands whose tool only forwards its arguments are described in
+    # COMMANDS; the tools below add behaviour of their own.
+    for command in COMMANDS.values():
+        if command.description:
+            mcp.tool()(_command_tool(command))
+
     # ── Session / Info ──────────────────────────────────────────────
 
     @mcp.tool()
-    def get_session_info() -> str:
+    async def get_session_info() -> str:
         """Get current Ableton Live session info: tempo, time signature,
         track counts, and master track details."""
-        return _call("get_session_info")
+        if (m := await _mirror()) and (info := m.session_info()) is not None:
+            return _dump(info)
+        return await _call("get_session_info")
 
     @mcp.tool()
-    def get_track_info(track_index: int) -> str:
+    async def get_track_info(
+        track_index: int, output: OutputProfile | None = None
+    ) -> str:
         """Get detailed info about a track: name, type, mute/solo/arm state,
-        volume, pan, clip slots, and devices."""
-        return _call("get_track_info", {"track_index": track_index})
-
-    # ── Track Management ────────────────────────────────────────────
-
-    @mcp.tool()
-    def create_midi_track(index: int = -1) -> str:
-        """Create a new MIDI track. Use index=-1 to append at the end."""
-        return _call("create_midi_track", {"index": index})
-
-    @mcp.tool()
-    def create_audio_track(index: int = -1) -> str:
-        """Create a new audio track. Use index=-1 to append at the end."""
-        return _call("create_audio_track", {"index": index})
-
-    @mcp.tool()
-    def delete_track(track_index: int) -> str:
-        """Delete a track by index."""
-        return _call("delete_track", {"track_index": track_index})
-
-    @mcp.tool()
-    def delete_all_tracks() -> str:
-        """Delete all tracks except one. Useful for clearing a session before
-        building a fresh arrangement. Returns the count of deleted tracks."""
-        return _call("delete_all_tracks")
-
-    @mcp.tool()
-    def set_track_name(track_index: int, name: str) -> str:
-        """Rename a track."""
-        return _call("set_track_name", {"track_index": track_index, "name": name})
-
-    @mcp.tool()
-    def set_track_volume(track_index: int, volume: float) -> str:
-        """Set track volume. Range: 0.0 (silence) to 1.0 (max)."""
-        return _call("set_track_volume", {"track_index": track_index, "volume": volume})
+        volume, pan, clip slots, and devices.
+        output="table" lists clip slots and devices as rows under one
+        header, which is much shorter."""
+        if (m := await _mirror()) and (info := m.track_info(track_index)) is not None:
+            return _dump(info, output)
+        return await _call("get_track_info", {"track_index": track_index}, output)
 
     @mcp.tool()
-    def set_track_pan(track_index: int, pan: float) -> str:
-        """Set track pan. Range: -1.0 (full left) to 1.0 (full right),
-        0.0 is center."""
-        return _call("set_track_pan", {"track_index": track_index, "pan": pan})
-
-    @mcp.tool()
-    def set_track_mute(track_index: int, mute: bool) -> str:
-        """Mute or unmute a track."""
-        return _call("set_track_mute", {"track_index": track_index, "mute": mute})
-
-    @mcp.tool()
-    def set_track_solo(track_index: int, solo: bool) -> str:
-        """Solo or unsolo a track."""
-        return _call("set_track_solo", {"track_index": track_index, "solo": solo})
-
-    # ── Clip Operations ─────────────────────────────────────────────
-
-    @mcp.tool()
-    def create_clip(track_index: int, clip_index: int, length: float = 4.0) -> str:
-        """Create an empty MIDI clip in a clip slot. Length is in beats."""
-        return _call(
-            "create_clip",
-            {
-                "track_index": track_index,
-                "clip_index": clip_index,
-                "length": length,
-            },
-        )
-
-    @mcp.tool()
-    def add_notes_to_clip(
-        track_index: int,
-        clip_index: int,
-        notes: list[dict],
-        append: bool = False,
+    async def get_session_snapshot(
+        include: list[str] | None = None, output: OutputProfile | None = None
     ) -> str:
-        """Add MIDI notes to a clip. Each note is a dict with keys:
-        pitch (0-127), start_time (beats), duration (beats),
-        velocity (0-127, default 100), mute (bool, default false).
-        By default this replaces all existing notes in the clip.
-        Set append=true to keep existing notes and add the new ones on top."""
-        return _call(
-            "add_notes_to_clip",
-            {
-                "track_index": track_index,
-                "clip_index": clip_index,
-                "notes": notes,
-                "append": append,
-            },
-        )
-
-    @mcp.tool()
-    def set_clip_name(track_index: int, clip_index: int, name: str) -> str:
-        """Rename a clip."""
-        return _call(
-            "set_clip_name",
-            {
-                "track_index": track_index,
-                "clip_index": clip_index,
-                "name": name,
-            },
-        )
-
-    @mcp.tool()
-    def fire_clip(track_index: int, clip_index: int) -> str:
-        """Start playing a clip."""
-        return _call(
-            "fire_clip",
-            {"track_index": track_index, "clip_index": clip_index},
-        )
-
-    @mcp.tool()
-    def stop_clip(track_index: int, clip_index: int) -> str:
-        """Stop a playing clip."""
-        return _call(
-            "stop_clip",
-            {"track_index": track_index, "clip_index": clip_index},
-        )
+        """Get the whole set in one call: session info plus every track,
+        return track, the master track and scenes, with each track's clips,
+        arrangement clips and devices. Much cheaper than get_session_info
+        followed by get_track_info for each track.
+        include narrows what is returned, to any of: tracks, return_tracks,
+        master, scenes, clip_slots, arrangement_clips, devices (default all).
+        E.g. ["tracks", "devices"] lists tracks and their devices only.
+        Clip slots are listed only when they hold a clip.
+        output="table" lists tracks, clips and devices as rows under one
+        header, which is much shorter for big sets."""
+        if (m := await _mirror()) and (snapshot := m.snapshot(include)) is not None:
+            return _dump(snapshot, output)
+        params = {} if include is None else {"include": include}
+        return await _call("get_session_snapshot", params, output)
+
+    # ── Note Transforms ─────────────────────────────────────────────
+
+    async def _transform(
+        command_type: str, read: str, write: str, params: dict, operations: list
+    ) -> str:
+        client = _client()
+        try:
+            try:
+                result = await client.send_command_async(
+                    command_type, {**params, "operations": operations}
+                )
+            except UnsupportedCommandError:
+                # A control surface older than the command: the same
+                # transforms, here, at the cost of moving every note twice
+                notes = (await client.send_command_async(read, params))["notes"]
+                kept = transforms.apply(notes, operations)
+                await client.send_command_async(write, {**params, "notes": kept})
+                result = {"notes": len(kept), "removed": len(notes) - len(kept)}
+        except (RuntimeError, ValueError) as e:
+            return json.dumps({"error": str(e)})
+        return _dump(result)
 
     @mcp.tool()
-    def get_clip_notes(track_index: int, clip_index: int) -> str:
-        """Read all MIDI notes from a session clip.
-        Returns a list of notes with pitch, start_time, duration, velocity,
-        and mute."""
-        return _call(
+    async def transform_clip_notes(
+        track_index: int, clip_index: int, operations: list[dict]
+    ) -> str:
+        """Edit every note in a session clip inside Live, without reading
+        the notes out and writing them back. operations run in order:
+        {"op": "transpose", "semitones": 12} (notes leaving 0-127 are removed);
+        {"op": "quantize", "grid": 0.25, "strength": 1.0} (grid in beats,
+        strength 0-1 moves starts part way);
+        {"op": "velocity", "curve": 1.0, "scale": 1.0, "offset": 0, "min": 1,
+        "max": 127} (127*(v/127)**curve*scale+offset, clamped; curve < 1
+        lifts quiet notes);
+        {"op": "stretch", "factor": 2.0, "origin": 0.0} (scales start times
+        and durations);
+        {"op": "pitch_filter", "pitch_min": 36, "pitch_max": 48} (removes
+        notes outside the range);
+        {"op": "legato", "gap": 0.0} (each note ends gap beats before the
+        next note starts).
+        Only "op" and the params without defaults are required.
+        Returns how many notes remain and how many were removed."""
+        return await _transform(
+            "transform_clip_notes",
             "get_clip_notes",
+            "add_notes_to_clip",
             {"track_index": track_index, "clip_index": clip_index},
+            operations,
         )
 
     @mcp.tool()
-    def get_clip_info(track_index: int, clip_index: int) -> str:
-        """Get detailed info about a session clip: name, length,
-        loop_start, loop_end, is_playing, is_recording."""
-        return _call(
-            "get_clip_info",
-            {"track_index": track_index, "clip_index": clip_index},
-        )
-
-    @mcp.tool()
-    def duplicate_clip_to_scene(
-        track_index: int, source_clip_index: int, dest_clip_index: int
+    async def transform_arrangement_clip_notes(
+        track_index: int, clip_index: int, operations: list[dict]
     ) -> str:
-        """Duplicate a session clip from one scene to another on the same track.
-        The destination clip slot must be empty."""
-        return _call(
-            "duplicate_clip_to_scene",
-            {
-                "track_index": track_index,
-                "source_clip_index": source_clip_index,
-                "dest_clip_index": dest_clip_index,
-            },
-        )
-
-    @mcp.tool()
-    def delete_clip(track_index: int, clip_index: int) -> str:
-        """Delete a clip from a session clip slot."""
-        return _call(
-            "delete_clip",
+        """Edit every note in an arrangement clip inside Live. Takes the
+        same operations as transform_clip_notes."""
+        return await _transform(
+            "transform_arrangement_clip_notes",
+            "get_arrangement_clip_notes",
+            "set_arrangement_clip_notes",
             {"track_index": track_index, "clip_index": clip_index},
+            operations,
         )
 
-    # ── Scene Management ─────────────────────────────────────────────
-
-    @mcp.tool()
-    def create_scene(index: int = -1) -> str:
-        """Create a new empty scene. Use index=-1 to append at the end.
-        Adds a new clip slot row across all tracks."""
-        return _call("create_scene", {"index": index})
-
-    @mcp.tool()
-    def delete_scene(scene_index: int) -> str:
-        """Delete a scene by index. Cannot delete the last scene."""
-        return _call("delete_scene", {"scene_index": scene_index})
-
-    @mcp.tool()
-    def set_scene_name(scene_index: int, name: str) -> str:
-        """Rename a scene (the label in the Master track column)."""
-        return _call("set_scene_name", {"scene_index": scene_index, "name": name})
-
-    @mcp.tool()
-    def fire_scene(scene_index: int) -> str:
-        """Fire all clips in a scene simultaneously."""
-        return _call("fire_scene", {"scene_index": scene_index})
-
     # ── Transport ───────────────────────────────────────────────────
 
-    @mcp.tool()
-    def start_playback() -> str:
-        """Start session playback."""
-        return _call("start_playback")
-
-    @mcp.tool()
-    def stop_playback() -> str:
-        """Stop session playback."""
-        return _call("stop_playback")
+    @mcp.resource("ableton://transport", mime_type="application/json")
+    async def transport_resource() -> str:
+        """Playhead position, play state, tempo and the session clips that
+        are playing or queued to launch."""
+        return await get_transport()
 
     @mcp.tool()
-    def set_tempo(tempo: float) -> str:
-        """Set the session tempo in BPM."""
-        return _call("set_tempo", {"tempo": tempo})
+    async def get_transport() -> str:
+        """Get the playhead position (current_song_time, in beats), whether
+        Live is playing, the tempo, and the session clips that are playing or
+        triggered (queued to launch)."""
+        try:
+            return _dump(await _read_transport())
+        except RuntimeError as e:
+            return json.dumps({"error": str(e)})
 
     @mcp.tool()
-    def set_time_signature(numerator: int, denominator: int) -> str:
-        """Set the song's time signature (e.g. 4/4, 5/4, 7/8)."""
-        return _call(
-            "set_time_signature",
-            {"numerator": numerator, "denominator": denominator},
-        )
+    async def wait_for_transport(
+        is_playing: bool | None = None,
+        song_time: float | None = None,
+        track_index: int | None = None,
+        clip_index: int | None = None,
+        timeout: float = 10.0,
+    ) -> str:
+        """Wait until the transport reaches a state, instead of polling.
+        Conditions: is_playing; song_time (playhead at or past this beat);
+        track_index (any clip on the track playing) optionally narrowed by
+        clip_index, e.g. to wait for a fired clip to actually start. Returns
+        matched and the transport state once every given condition holds,
+        or matched false after timeout seconds."""
+
+        def predicate(state: dict) -> bool:
+            return transport_matches(
+                state, is_playing, song_time, track_index, clip_index
+            )
 
-    @mcp.tool()
-    def undo() -> str:
-        """Trigger Ableton's undo. Safety net for destructive operations."""
-        return _call("undo")
+        try:
+            if (follower := await _transport()) is not None:
+                state = await follower.wait_for(predicate, timeout)
+                matched = state is not None
+                if state is None:
+                    state = await _read_transport()
+            else:
+                state, matched = await poll_for(
+                    lambda: _client().send_command_async("get_transport"),
+                    predicate,
+                    timeout,
+                )
+        except RuntimeError as e:
+            return json.dumps({"error": str(e)})
+        return _dump({"matched": matched, "transport": state})
 
     # ── Browser / Devices ───────────────────────────────────────────
 
     @mcp.tool()
-    def get_browser_tree(category_type: str = "all") -> str:
-        """Browse Ableton's instrument and effect categories.
-        category_type can be: all, instruments, audio_effects, midi_effects,
-        sounds, drums, max_for_live."""
-        return _call("get_browser_tree", {"category_type": category_type})
-
-    @mcp.tool()
-    def get_browser_items_at_path(path: str) -> str:
-        """List items at a browser path. Paths can start with a top-level category
-        (e.g. 'Sounds/Bass', 'Instruments/Analog', 'Audio Effects/Reverb') or
-        use a bare subcategory name (e.g. 'Bass').
-        Use get_browser_tree first to discover available categories."""
-        return _call("get_browser_items_at_path", {"path": path})
-
-    @mcp.tool()
-    def load_instrument_or_effect(
-        track_index: int, uri: str, clear_existing: bool = False
-    ) -> str:
-        """Load an instrument or effect onto a track by its browser URI.
-        Use get_browser_tree and get_browser_items_at_path to find URIs.
-        Returns the loaded device_name so you can verify the correct device was loaded.
-        Set clear_existing=true to remove all existing devices from the track before
-        loading — recommended when replacing an instrument on a non-empty track.
-        IMPORTANT: load instruments sequentially, not in parallel. Concurrent loads
-        will fail or land on the wrong track."""
-        return _call(
-            "load_browser_item",
-            {
-                "track_index": track_index,
-                "uri": uri,
-                "clear_existing": clear_existing,
-            },
-        )
-
-    @mcp.tool()
-    def create_midi_track_with_instrument(
+    async def create_midi_track_with_instrument(
         uri: str, index: int = -1, name: str = ""
     ) -> str:
         """Create a new MIDI track and load an instrument in a single operation.
@@ -299,168 +317,74 @@ def create_server(injector: Injector | None = None) -> FastMCP:
         params: dict = {"uri": uri, "index": index}
         if name:
             params["name"] = name
-        return _call("create_midi_track_with_instrument", params)
+        return await _call("create_midi_track_with_instrument", params)
 
     @mcp.tool()
-    def load_drum_kit(track_index: int, rack_uri: str, kit_path: str) -> str:
+    async def load_drum_kit(track_index: int, rack_uri: str, kit_path: str) -> str:
         """Load a drum rack and then load a specific kit into it.
         First loads the rack by URI, then navigates to kit_path to load
         the kit preset."""
-        _call(
+        await _call(
             "load_browser_item",
             {"track_index": track_index, "uri": rack_uri},
         )
-        return _call(
+        return await _call(
             "load_browser_item",
             {"track_index": track_index, "uri": kit_path},
         )
 
-    # ── Device Parameters ────────────────────────────────────────────
-
-    @mcp.tool()
-    def get_device_parameters(track_index: int, device_index: int) -> str:
-        """List all parameters of a device on a track.
-        Returns device_name and a list of parameters with name, value, min, max."""
-        return _call(
-            "get_device_parameters",
-            {"track_index": track_index, "device_index": device_index},
-        )
-
-    @mcp.tool()
-    def set_device_parameter(
-        track_index: int, device_index: int, param_index: int, value: float
-    ) -> str:
-        """Set a device parameter value. Value is clamped to the parameter's
-        min/max range. Use get_device_parameters to discover available parameters."""
-        return _call(
-            "set_device_parameter",
-            {
-                "track_index": track_index,
-                "device_index": device_index,
-                "param_index": param_index,
-                "value": value,
-            },
-        )
-
-    # ── Arrangement View ─────────────────────────────────────────────
-
-    @mcp.tool()
-    def get_arrangement_clips(track_index: int) -> str:
-        """Get all clips on the arrangement timeline for a track.
-        Returns each clip's index, name, start_time, end_time, and length
-        in beats. Requires Ableton Live 11+."""
-        return _call("get_arrangement_clips", {"track_index": track_index})
-
-    @mcp.tool()
-    def create_arrangement_clip(
-        track_index: int, start_time: float, length: float
-    ) -> str:
-        """Create an empty MIDI clip on the arrangement timeline.
-        start_time and length are in beats."""
-        return _call(
-            "create_arrangement_clip",
-            {
-                "track_index": track_index,
-                "start_time": start_time,
-                "length": length,
-            },
-        )
-
-    @mcp.tool()
-    def delete_arrangement_clip(track_index: int, clip_index: int) -> str:
-        """Delete a clip from the arrangement timeline.
-        Use get_arrangement_clips to find the clip_index."""
-        return _call(
-            "delete_arrangement_clip",
-            {"track_index": track_index, "clip_index": clip_index},
-        )
-
-    @mcp.tool()
-    def duplicate_arrangement_clip(
-        track_index: int, clip_index: int, destination_time: float
-    ) -> str:
-        """Duplicate an arrangement clip to a new position on the timeline.
-        destination_time is in beats."""
-        return _call(
-            "duplicate_arrangement_clip",
-            {
-                "track_index": track_index,
-                "clip_index": clip_index,
-                "destination_time": destination_time,
-            },
-        )
-
-    @mcp.tool()
-    def get_arrangement_clip_notes(track_index: int, clip_index: int) -> str:
-        """Read all MIDI notes from an arrangement clip.
-        Returns a list of notes with pitch, start_time, duration, velocity,
-        and mute."""
-        return _call(
-            "get_arrangement_clip_notes",
-            {"track_index": track_index, "clip_index": clip_index},
-        )
+    # ── Diagnostics ──────────────────────────────────────────────────
 
     @mcp.tool()
-    def set_arrangement_clip_notes(
-        track_index: int, clip_index: int, notes: list[dict]
-    ) -> str:
-        """Set MIDI notes on an arrangement clip. Replaces all existing notes.
-        Each note is a dict with keys: pitch (0-127), start_time (beats),
-        duration (beats), velocity (0-127, default 100), mute (bool, default false)."""
-        return _call(
-            "set_arrangement_clip_notes",
-            {
-                "track_index": track_index,
-                "clip_index": clip_index,
-                "notes": notes,
-            },
-        )
-
-    @mcp.tool()
-    def set_song_time(time: float) -> str:
-        """Set the playback cursor position in beats."""
-        return _call("set_song_time", {"time": time})
-
-    @mcp.tool()
-    def get_arrangement_loop() -> str:
-        """Get the arrangement loop brace position and length in beats."""
-        return _call("get_arrangement_loop")
-
-    @mcp.tool()
-    def set_arrangement_loop(start: float, length: float) -> str:
-        """Set the arrangement loop brace. start and length are in beats."""
-        return _call("set_arrangement_loop", {"start": start, "length": length})
-
-    @mcp.tool()
-    def back_to_arranger() -> str:
-        """Switch playback from session view back to the arrangement.
-        Stops all session clips and resumes arrangement playback."""
-        return _call("back_to_arranger")
+    async def get_cache_stats() -> str:
+        """Get cache statistics: size, hits, misses, evictions and
+        invalidations of the control surface's browser URI cache and of the
+        server's read cache, and the state of the browser index."""
+        client = _client()
+        try:
+            result = await client.send_command_async("get_cache_stats")
+        except RuntimeError as e:
+            return json.dumps({"error": str(e)})
+        if isinstance(client, CachingAbletonClient):
+            result = {**result, "read_cache": client.stats()}
+        return _dump(result)
 
     @mcp.tool()
-    def duplicate_session_to_arrangement(
-        track_index: int, clip_index: int, destination_time: float
-    ) -> str:
-        """Copy a session view clip to the arrangement timeline.
-        destination_time is the position in beats where the clip will be placed."""
-        return _call(
-            "duplicate_session_to_arrangement",
-            {
-                "track_index": track_index,
-                "clip_index": clip_index,
-                "destination_time": destination_time,
-            },
-        )
+    async def get_performance_stats(reset: bool = False) -> str:
+        """Get latency percentiles per command, broken down by phase.
 
-    @mcp.tool()
-    def session_to_arrangement(scene_indices: list[int]) -> str:
-        """Lay out session view scenes sequentially on the arrangement timeline.
-        Takes a list of scene indices and places each scene's clips end-to-end
-        starting from beat 0. Use this to build a full song structure from
-        session view clips."""
-        return _call("session_to_arrangement", {"scene_indices": scene_indices})
+        ``control_surface`` has the phases inside Live (receive, parse,
+        waiting on the main thread queue, the handler, sending the reply)
+        and the main thread queue depth. ``client`` has the phases seen from
+        this server (prepare, round trip, unpack). Use ``reset`` to start
+        the counts over, e.g. before timing one workflow.
+        """
+        client = _client()
+        try:
+            result = await client.send_command_async(
+                "get_performance_stats", {"reset": reset}
+            )
+        except RuntimeError as e:
+            return json.dumps({"error": str(e)})
+        timings = client.timings
+        stats = {"control_surface": result}
+        if timings is not None:
+            stats["client"] = timings.summary()
+            if reset:
+                timings.reset()
+        return _dump(stats)
 
     return mcp
 
 
-mcp = create_server()
+def __getattr__(name: str) -> Any:
+    # The default server, for hosts that load ``ableton_mcp.server:mcp``.
+    # It is built on first use, so importing this module neither registers
+    # every tool nor reads ABLETON_MCP_OUTPUT. That saves no startup time:
+    # FastMCP is imported either way, and the entry point builds a server
+    # straight away.
+    if name == "mcp":
+        global mcp
+        mcp = create_server()
+        return mcp
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,91 @@
+"""Latency histograms per command and phase, as seen from the server.
+
+The control surface keeps its own (``get_performance_stats``); together they
+show where a slow command spends its time. Client phases are:
+
+- ``prepare``: connecting if needed and packing the command
+- ``round_trip``: from writing the command to its reply arriving, which
+  covers the network and everything the control surface does
+- ``unpack``: turning the reply back into a result
+- ``total``: the whole call, including any retries
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Any
+
+#: Upper bounds of the histogram buckets: 10us to about 70s, four per
+#: doubling, so a percentile is within about 19% of the true value
+BUCKETS_MS = [0.01 * 2 ** (i / 4) for i in range(92)]
+
+
+class LatencyHistogram:
+    """Counts latencies in fixed buckets, so memory stays constant however
+    many are recorded."""
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms: float) -> None:
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile."""
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                if i < len(BUCKETS_MS):
+                    return min(BUCKETS_MS[i], self.max)
+                break
+        return self.max
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50), 3),
+            "p90_ms": round(self.percentile(90), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(self.max, 3),
+        }
+
+
+class CommandTimings:
+    """Thread-safe histograms keyed by command type and phase."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: dict[str, dict[str, LatencyHistogram]] = {}
+
+    def record(self, command_type: str, phases: dict[str, float]) -> None:
+        """Add one command's phase durations, in seconds."""
+        with self._lock:
+            by_phase = self._histograms.setdefault(command_type, {})
+            for phase, seconds in phases.items():
+                histogram = by_phase.get(phase)
+                if histogram is None:
+                    histogram = by_phase[phase] = LatencyHistogram()
+                histogram.add(seconds * 1000)
+
+    def summary(self) -> dict[str, dict[str, dict[str, Any]]]:
+        with self._lock:
+            return {
+                command_type: {
+                    phase: histogram.summary() for phase, histogram in by_phase.items()
+                }
+                for command_type, by_phase in self._histograms.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms = {}
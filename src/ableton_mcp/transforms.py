@@ -0,0 +1,226 @@
+"""Note transforms shared with the AbletonMCP control surface.
+
+``transform_clip_notes`` runs a list of operations over a clip's notes inside
+Live, in order, so a transpose or quantize costs one small command instead of
+reading every note out and writing every note back:
+
+- ``{"op": "transpose", "semitones": 12}``: notes pushed outside 0-127 are
+  removed
+- ``{"op": "quantize", "grid": 0.25, "strength": 1.0}``: moves each start
+  ``strength`` of the way to the nearest multiple of ``grid`` beats
+- ``{"op": "velocity", "curve": 1.0, "scale": 1.0, "offset": 0, "min": 1,
+  "max": 127}``: ``127 * (v / 127) ** curve * scale + offset``, clamped; a
+  curve below 1 lifts quiet notes, above 1 softens them
+- ``{"op": "stretch", "factor": 2.0, "origin": 0.0}``: scales starts (about
+  ``origin``) and durations
+- ``{"op": "pitch_filter", "pitch_min": 36, "pitch_max": 48}``: removes
+  notes outside the range
+- ``{"op": "legato", "gap": 0.0}``: lengthens or shortens each note to end
+  ``gap`` beats before the next note starts
+
+``apply`` does the same to a list of note dicts on the server, for control
+surfaces that predate the command. It uses NumPy for long lists when it is
+installed (``pip install ableton-mcp[numpy]``); both give the same notes.
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import math
+from typing import Any
+
+#: Params of each operation and their defaults; None means required
+OPERATIONS: dict[str, dict[str, float | None]] = {
+    "transpose": {"semitones": None},
+    "quantize": {"grid": None, "strength": 1.0},
+    "velocity": {"curve": 1.0, "scale": 1.0, "offset": 0.0, "min": 1, "max": 127},
+    "stretch": {"factor": None, "origin": 0.0},
+    "pitch_filter": {"pitch_min": 0, "pitch_max": 127},
+    "legato": {"gap": 0.0},
+}
+
+#: Below this many notes the per-call cost of NumPy outweighs what it saves
+NUMPY_MIN_NOTES = 256
+
+
+def validate_operations(operations: list[dict[str, Any]]) -> None:
+    """Raise ValueError for an operation Live would reject."""
+    for i, operation in enumerate(operations):
+        try:
+            _resolve(operation)
+        except ValueError as e:
+            raise ValueError(f"Operation {i}: {e}") from None
+
+
+def apply(
+    notes: list[dict[str, Any]], operations: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """The notes after ``operations``, in their original order, less any
+    removed. Fields the transforms don't touch, like ``note_id``, are kept."""
+    resolved = [_resolve(operation) for operation in operations]
+    np = _numpy() if len(notes) >= NUMPY_MIN_NOTES else None
+    if np is not None:
+        return _apply_numpy(np, notes, resolved)
+    return _apply_python(notes, resolved)
+
+
+def _resolve(operation: dict[str, Any]) -> tuple[str, dict[str, float]]:
+    """An operation's name and all of its params, checked."""
+    name = operation.get("op")
+    if name not in OPERATIONS:
+        raise ValueError(f"Unknown note transform: {name}")
+    defaults = OPERATIONS[name]
+    for key in operation:
+        if key != "op" and key not in defaults:
+            raise ValueError(f"Unknown parameter '{key}' for {name}")
+    params = {}
+    for key, default in defaults.items():
+        value = operation.get(key, default)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{name} needs a number for {key}")
+        params[key] = value
+    if name == "quantize" and not (params["grid"] > 0 and 0 <= params["strength"] <= 1):
+        raise ValueError("quantize needs a grid above 0 and strength from 0 to 1")
+    if name == "velocity" and not (
+        params["curve"] > 0 and 0 <= params["min"] <= params["max"] <= 127
+    ):
+        raise ValueError("velocity needs a curve above 0 and 0 <= min <= max <= 127")
+    if name == "stretch" and params["factor"] <= 0:
+        raise ValueError("stretch needs a factor above 0")
+    if name == "legato" and params["gap"] < 0:
+        raise ValueError("legato needs a gap of at least 0")
+    return name, params
+
+
+def _apply_python(
+    notes: list[dict[str, Any]], operations: list[tuple[str, dict[str, float]]]
+) -> list[dict[str, Any]]:
+    # [pitch, start_time, duration, velocity, index], as in the control surface
+    rows = [
+        [
+            int(note.get("pitch", 60)),
+            float(note.get("start_time", 0.0)),
+            float(note.get("duration", 0.5)),
+            float(note.get("velocity", 100)),
+            i,
+        ]
+        for i, note in enumerate(notes)
+    ]
+    for name, params in operations:
+        if name == "transpose":
+            for row in rows:
+                row[0] += int(params["semitones"])
+            rows = [row for row in rows if 0 <= row[0] <= 127]
+        elif name == "quantize":
+            grid, strength = params["grid"], params["strength"]
+            for row in rows:
+                target = math.floor(row[1] / grid + 0.5) * grid
+                row[1] += (target - row[1]) * strength
+        elif name == "velocity":
+            for row in rows:
+                value = (
+                    127.0 * (row[3] / 127.0) ** params["curve"] * params["scale"]
+                    + params["offset"]
+                )
+                row[3] = min(params["max"], max(params["min"], value))
+        elif name == "stretch":
+            factor, origin = params["factor"], params["origin"]
+            for row in rows:
+                row[1] = max(0.0, origin + (row[1] - origin) * factor)
+                row[2] *= factor
+        elif name == "pitch_filter":
+            low, high = params["pitch_min"], params["pitch_max"]
+            rows = [row for row in rows if low <= row[0] <= high]
+        elif name == "legato":
+            starts = sorted({row[1] for row in rows})
+            for row in rows:
+                i = bisect.bisect_right(starts, row[1])
+                if i < len(starts):
+                    length = starts[i] - row[1]
+                    row[2] = (
+                        length - params["gap"] if length > params["gap"] else length
+                    )
+    return [
+        {
+            **notes[i],
+            "pitch": pitch,
+            "start_time": start_time,
+            "duration": duration,
+            "velocity": velocity,
+        }
+        for pitch, start_time, duration, velocity, i in rows
+    ]
+
+
+def _apply_numpy(
+    np: Any,
+    notes: list[dict[str, Any]],
+    operations: list[tuple[str, dict[str, float]]],
+) -> list[dict[str, Any]]:
+    pitch = np.array([note.get("pitch", 60) for note in notes], dtype=np.int64)
+    start = np.array([note.get("start_time", 0.0) for note in notes], dtype=float)
+    duration = np.array([note.get("duration", 0.5) for note in notes], dtype=float)
+    velocity = np.array([note.get("velocity", 100) for note in notes], dtype=float)
+    index = np.arange(len(notes))
+
+    def keep(mask: Any) -> None:
+        nonlocal pitch, start, duration, velocity, index
+        pitch, start, duration = pitch[mask], start[mask], duration[mask]
+        velocity, index = velocity[mask], index[mask]
+
+    for name, params in operations:
+        if name == "transpose":
+            pitch = pitch + int(params["semitones"])
+            keep((pitch >= 0) & (pitch <= 127))
+        elif name == "quantize":
+            grid = params["grid"]
+            target = np.floor(start / grid + 0.5) * grid
+            start = start + (target - start) * params["strength"]
+        elif name == "velocity":
+            value = (
+                127.0 * (velocity / 127.0) ** params["curve"] * params["scale"]
+                + params["offset"]
+            )
+            velocity = np.clip(value, params["min"], params["max"])
+        elif name == "stretch":
+            factor, origin = params["factor"], params["origin"]
+            start = np.maximum(0.0, origin + (start - origin) * factor)
+            duration = duration * factor
+        elif name == "pitch_filter":
+            keep((pitch >= params["pitch_min"]) & (pitch <= params["pitch_max"]))
+        elif name == "legato" and len(start):
+            starts = np.unique(start)
+            following = np.searchsorted(starts, start, side="right")
+            has_next = following < len(starts)
+            length = starts[np.minimum(following, len(starts) - 1)] - start
+            gap = params["gap"]
+            legato = np.where(length > gap, length - gap, length)
+            duration = np.where(has_next, legato, duration)
+    return [
+        {
+            **notes[i],
+            "pitch": p,
+            "start_time": s,
+            "duration": d,
+            "velocity": v,
+        }
+        for i, p, s, d, v in zip(
+            index.tolist(),
+            pitch.tolist(),
+            start.tolist(),
+            duration.tolist(),
+            velocity.tolist(),
+        )
+    ]
+
+
+@functools.cache
+def _numpy() -> Any:
+    """NumPy, imported on first use since most sessions never need it, or
+    None if it isn't installed."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
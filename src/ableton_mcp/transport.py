@@ -0,0 +1,115 @@
+"""Latest transport state pushed by the control surface, and waiting on it.
+
+The control surface pushes ``{"event": "transport", "transport": {...}}``
+whenever the playhead, play state, tempo or the playing and queued session
+clips change, at most once per subscription interval. The state has the
+``get_transport`` fields::
+
+    {"current_song_time": 16.0, "is_playing": true, "tempo": 120.0,
+     "clips": [{"track_index": 0, "clip_index": 2, "playing_status": "playing"}]}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+TransportState = dict[str, Any]
+
+
+class TransportFollower:
+    """Holds the latest transport state and wakes whoever waits on it.
+
+    ``apply`` must be called on the event loop that waits, which is where
+    ``AsyncAbletonClient`` delivers its events.
+    """
+
+    def __init__(self) -> None:
+        self._state: TransportState | None = None
+        self._updated = asyncio.Event()
+        #: Set once updates have been subscribed to; the client resubscribes
+        #: by itself after reconnecting
+        self.subscribed = False
+
+    @property
+    def state(self) -> TransportState | None:
+        return self._state
+
+    def apply(self, event: dict[str, Any]) -> None:
+        kind = event.get("event")
+        if kind == "transport":
+            self._state = event["transport"]
+        elif kind == "disconnected":
+            self._state = None
+        else:
+            return
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
+
+    async def wait_for(
+        self, predicate: Callable[[TransportState], bool], timeout: float
+    ) -> TransportState | None:
+        """Wait until the state satisfies ``predicate`` and return it, or
+        return None once ``timeout`` seconds pass without that happening."""
+        deadline = time.monotonic() + timeout
+        while True:
+            state = self._state
+            if state is not None and predicate(state):
+                return state
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(self._updated.wait(), remaining)
+            except TimeoutError:
+                return None
+
+
+async def poll_for(
+    read: Callable[[], Awaitable[TransportState]],
+    predicate: Callable[[TransportState], bool],
+    timeout: float,
+    interval: float = 0.1,
+) -> tuple[TransportState, bool]:
+    """Fallback for control surfaces that can't push the transport: read it
+    every ``interval`` seconds until ``predicate`` holds or time runs out.
+
+    Returns the last state read and whether it matched.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        state = await read()
+        if predicate(state):
+            return state, True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return state, False
+        await asyncio.sleep(min(interval, remaining))
+
+
+def transport_matches(
+    state: TransportState,
+    is_playing: bool | None = None,
+    song_time: float | None = None,
+    track_index: int | None = None,
+    clip_index: int | None = None,
+) -> bool:
+    """Whether ``state`` meets every condition that was given.
+
+    ``song_time`` matches once the playhead is at or past it. A track alone
+    matches while any of its clips plays; with ``clip_index`` too, only
+    while that clip plays.
+    """
+    if is_playing is not None and state["is_playing"] != is_playing:
+        return False
+    if song_time is not None and state["current_song_time"] < song_time:
+        return False
+    if track_index is not None:
+        return any(
+            clip["track_index"] == track_index
+            and clip["playing_status"] == "playing"
+            and clip_index in (None, clip["clip_index"])
+            for clip in state["clips"]
+        )
+    return True
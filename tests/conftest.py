@@ -4,10 +4,25 @@ from typing import Any
 
 import pytest
 from injector import Injector, Module, provider, singleton
+from live_model import SetSize, SimulatedLive, start_control_surface
 
 from ableton_mcp.client import AbletonClient
 from ableton_mcp.server import create_server
 
+#: Big enough to have something of everything, small enough to start fast
+SMALL_SET = SetSize(
+    tracks=2,
+    scenes=2,
+    clips_per_track=1,
+    devices_per_track=1,
+    parameters_per_device=2,
+    notes_per_clip=8,
+    browser_folders=2,
+    browser_items_per_folder=2,
+)
+#: Seconds between the simulated Live's main-thread ticks
+TICK = 0.005
+
 
 class FakeAbletonClient(AbletonClient):
     """In-memory fake that returns canned responses keyed by command type."""
@@ -47,3 +62,24 @@ def fake_client():
 def mcp_server(fake_client):
     injector = Injector([FakeAbletonModule(fake_client)])
     return create_server(injector)
+
+
+@pytest.fixture
+def start_live():
+    """Start the real control surface in a simulated Live (see
+    benchmarks/live_model), stopped again after the test."""
+    started: list[SimulatedLive] = []
+
+    def start(size: SetSize = SMALL_SET, **kwargs: Any) -> SimulatedLive:
+        live = start_control_surface(size, kwargs.pop("tick", TICK), **kwargs)
+        started.append(live)
+        return live
+
+    yield start
+    for live in started:
+        live.stop()
+
+
+@pytest.fixture
+def live(start_live):
+    return start_live()
@@ -116,6 +116,23 @@ async def test_get_arrangement_clip_notes(fake_client, mcp_server):
     assert result["notes"][0]["pitch"] == 60
 
 
+@pytest.mark.anyio
+async def test_get_arrangement_clip_notes_next_page(fake_client, mcp_server):
+    fake_client.set_response("get_arrangement_clip_notes", {"notes": []})
+
+    await mcp_server.call_tool(
+        "get_arrangement_clip_notes",
+        {"track_index": 0, "clip_index": 0, "limit": 500, "cursor": "12.5:60"},
+    )
+
+    assert fake_client.commands_sent == [
+        (
+            "get_arrangement_clip_notes",
+            {"track_index": 0, "clip_index": 0, "limit": 500, "cursor": "12.5:60"},
+        )
+    ]
+
+
 @pytest.mark.anyio
 async def test_set_arrangement_clip_notes(fake_client, mcp_server):
     notes = [
@@ -133,6 +150,32 @@ async def test_set_arrangement_clip_notes(fake_client, mcp_server):
     assert result["notes_set"] == 2
 
 
+@pytest.mark.anyio
+async def test_apply_arrangement_note_diff(fake_client, mcp_server):
+    modify = [{"note_id": 12, "changes": {"start_time": 4.0}}]
+    fake_client.set_response(
+        "apply_arrangement_note_diff", {"removed": 0, "modified": 1, "added": 0}
+    )
+
+    content, _ = await mcp_server.call_tool(
+        "apply_arrangement_note_diff",
+        {"track_index": 0, "clip_index": 0, "modify": modify},
+    )
+    result = json.loads(content[0].text)
+
+    assert result["modified"] == 1
+    assert fake_client.commands_sent[0] == (
+        "apply_arrangement_note_diff",
+        {
+            "track_index": 0,
+            "clip_index": 0,
+            "add": [],
+            "remove": [],
+            "modify": modify,
+        },
+    )
+
+
 @pytest.mark.anyio
 async def test_set_song_time(fake_client, mcp_server):
     fake_client.set_response("set_song_time", {"current_song_time": 16.0})
@@ -221,3 +264,25 @@ async def test_session_to_arrangement(fake_client, mcp_server):
     assert fake_client.commands_sent == [
         ("session_to_arrangement", {"scene_indices": [0, 1, 2]})
     ]
+
+
+@pytest.mark.anyio
+async def test_transform_arrangement_clip_notes(fake_client, mcp_server):
+    operations = [{"op": "legato"}]
+    fake_client.set_response(
+        "transform_arrangement_clip_notes", {"notes": 4, "removed": 0}
+    )
+
+    content, _ = await mcp_server.call_tool(
+        "transform_arrangement_clip_notes",
+        {"track_index": 2, "clip_index": 0, "operations": operations},
+    )
+    result = json.loads(content[0].text)
+
+    assert result == {"notes": 4, "removed": 0}
+    assert fake_client.commands_sent == [
+        (
+            "transform_arrangement_clip_notes",
+            {"track_index": 2, "clip_index": 0, "operations": operations},
+        )
+    ]
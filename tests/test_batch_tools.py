@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+
+@pytest.mark.anyio
+async def test_batch(fake_client, mcp_server):
+    fake_client.set_response(
+        "batch",
+        {
+            "results": [
+                {
+                    "index": 0,
+                    "type": "create_midi_track",
+                    "status": "success",
+                    "result": {"index": 0, "name": "MIDI 1"},
+                },
+                {
+                    "index": 1,
+                    "type": "set_track_name",
+                    "status": "success",
+                    "result": {"name": "Bass"},
+                },
+            ],
+            "succeeded": 2,
+            "failed": 0,
+            "skipped": 0,
+        },
+    )
+    operations = [
+        {"type": "create_midi_track", "params": {"index": -1}},
+        {"type": "set_track_name", "params": {"track_index": 0, "name": "Bass"}},
+    ]
+
+    content, _ = await mcp_server.call_tool("batch", {"operations": operations})
+    result = json.loads(content[0].text)
+
+    assert result["succeeded"] == 2
+    assert result["results"][1]["result"]["name"] == "Bass"
+    assert fake_client.commands_sent == [
+        ("batch", {"operations": operations, "stop_on_error": True})
+    ]
+
+
+@pytest.mark.anyio
+async def test_batch_continue_on_error(fake_client, mcp_server):
+    fake_client.set_response(
+        "batch", {"results": [], "succeeded": 0, "failed": 0, "skipped": 0}
+    )
+    operations = [{"type": "undo", "params": {}}]
+
+    await mcp_server.call_tool(
+        "batch", {"operations": operations, "stop_on_error": False}
+    )
+
+    assert fake_client.commands_sent == [
+        ("batch", {"operations": operations, "stop_on_error": False})
+    ]
@@ -138,3 +138,36 @@ async def test_load_drum_kit(fake_client, mcp_server):
         "load_browser_item",
         {"track_index": 0, "uri": "ableton:Kit808"},
     )
+
+
+@pytest.mark.anyio
+async def test_search_browser(fake_client, mcp_server):
+    fake_client.set_response(
+        "search_browser",
+        {
+            "results": [
+                {
+                    "name": "Grand Piano.adg",
+                    "uri": "query:Instruments#Grand%20Piano",
+                    "path": "Instruments/Instrument Rack/Grand Piano.adg",
+                    "is_folder": False,
+                    "score": 7,
+                }
+            ],
+            "index_ready": True,
+            "indexed_items": 5000,
+        },
+    )
+
+    content, _ = await mcp_server.call_tool(
+        "search_browser", {"query": "grand piano", "category": "instruments"}
+    )
+    result = json.loads(content[0].text)
+
+    assert result["results"][0]["name"] == "Grand Piano.adg"
+    assert fake_client.commands_sent == [
+        (
+            "search_browser",
+            {"query": "grand piano", "category": "instruments", "limit": 20},
+        )
+    ]
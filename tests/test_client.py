@@ -1,9 +1,23 @@
+import asyncio
 import json
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from ableton_mcp.client import SocketAbletonClient
+from ableton_mcp.client import (
+    AsyncAbletonClient,
+    CachingAbletonClient,
+    PooledAbletonClient,
+    SocketAbletonClient,
+    UnsupportedCommandError,
+)
+from ableton_mcp.protocol import Capabilities, encode_frame
+from tests.conftest import FakeAbletonClient
 
 
 class TestSocketAbletonClient:
@@ -53,6 +67,31 @@ class TestSocketAbletonClient:
         with pytest.raises(RuntimeError, match="Track index out of range"):
             client.send_command("get_track_info", {"track_index": 99})
 
+    def test_times_each_command(self):
+        client = SocketAbletonClient()
+        mock_sock = MagicMock()
+        mock_sock.recv.return_value = json.dumps(
+            {"status": "error", "message": "Track index out of range"}
+        ).encode("utf-8")
+        client._sock = mock_sock
+
+        with pytest.raises(RuntimeError):
+            client.send_command("get_track_info", {"track_index": 99})
+
+        phases = client.timings.summary()["get_track_info"]
+        assert set(phases) == {"prepare", "round_trip", "unpack", "total"}
+        assert phases["total"]["count"] == 1
+
+    def test_validates_params_before_sending(self):
+        client = SocketAbletonClient(validate=True)
+        mock_sock = MagicMock()
+        client._sock = mock_sock
+
+        with pytest.raises(RuntimeError, match="Missing parameter 'track_index'"):
+            client.send_command("get_track_info")
+
+        mock_sock.sendall.assert_not_called()
+
     def test_disconnect_closes_socket(self):
         client = SocketAbletonClient()
         mock_sock = MagicMock()
@@ -87,3 +126,847 @@ class TestSocketAbletonClient:
         client.connect()
 
         assert mock_socket_cls.call_count == 1
+
+    @patch("ableton_mcp.client.socket.socket")
+    def test_negotiates_length_prefixed_framing(self, mock_socket_cls):
+        mock_sock = MagicMock()
+        mock_socket_cls.return_value = mock_sock
+        reply = encode_frame({"id": 1, "status": "success", "result": {"tempo": 120.0}})
+        mock_sock.recv.side_effect = [
+            json.dumps({"status": "success", "result": {"framing": "length"}}).encode(
+                "utf-8"
+            ),
+            reply[:4],
+            reply[4:],
+            b"",
+        ]
+
+        client = SocketAbletonClient()
+        result = client.send_command("get_session_info")
+
+        handshake, command = [c[0][0] for c in mock_sock.sendall.call_args_list]
+        assert json.loads(handshake.decode("utf-8")) == {
+            "type": "hello",
+            "params": {"framing": "length"},
+        }
+        assert command == encode_frame(
+            {"id": 1, "type": "get_session_info", "params": {}}
+        )
+        assert result == {"tempo": 120.0}
+
+    @patch("ableton_mcp.client.socket.socket")
+    def test_falls_back_to_legacy_framing(self, mock_socket_cls):
+        mock_sock = MagicMock()
+        mock_socket_cls.return_value = mock_sock
+        mock_sock.recv.side_effect = [
+            json.dumps({"status": "error", "message": "Unknown command: hello"}).encode(
+                "utf-8"
+            ),
+            json.dumps(
+                {"status": "error", "message": "Unknown command: set_framing"}
+            ).encode("utf-8"),
+            json.dumps({"status": "success", "result": {"tempo": 120.0}}).encode(
+                "utf-8"
+            ),
+        ]
+
+        client = SocketAbletonClient()
+        result = client.send_command("get_session_info")
+
+        command = mock_sock.sendall.call_args_list[-1][0][0]
+        assert json.loads(command.decode("utf-8")) == {
+            "type": "get_session_info",
+            "params": {},
+        }
+        assert result == {"tempo": 120.0}
+        assert client.capabilities is None
+
+    @patch("ableton_mcp.client.socket.socket")
+    def test_falls_back_to_set_framing(self, mock_socket_cls):
+        mock_sock = MagicMock()
+        mock_socket_cls.return_value = mock_sock
+        reply = encode_frame({"id": 1, "status": "success", "result": {"tempo": 120.0}})
+        mock_sock.recv.side_effect = [
+            json.dumps({"status": "error", "message": "Unknown command: hello"}).encode(
+                "utf-8"
+            ),
+            json.dumps({"status": "success", "result": {"framing": "length"}}).encode(
+                "utf-8"
+            ),
+            reply[:4],
+            reply[4:],
+            b"",
+        ]
+
+        client = SocketAbletonClient()
+        result = client.send_command("get_session_info")
+
+        messages = [c[0][0] for c in mock_sock.sendall.call_args_list]
+        assert [json.loads(m.decode("utf-8"))["type"] for m in messages[:2]] == [
+            "hello",
+            "set_framing",
+        ]
+        assert messages[2] == encode_frame(
+            {"id": 1, "type": "get_session_info", "params": {}}
+        )
+        assert result == {"tempo": 120.0}
+        assert client.capabilities is None
+
+    def test_unknown_command_raises_unsupported(self):
+        client = SocketAbletonClient(framing=False)
+        mock_sock = MagicMock()
+        mock_sock.recv.side_effect = [
+            json.dumps(
+                {"status": "error", "message": "Unknown command: transform_clip_notes"}
+            ).encode("utf-8")
+        ]
+        client._sock = mock_sock
+
+        with pytest.raises(UnsupportedCommandError, match="transform_clip_notes"):
+            client.send_command("transform_clip_notes", {"operations": []})
+
+    def test_legacy_response_split_across_chunks(self):
+        client = SocketAbletonClient()
+        mock_sock = MagicMock()
+        payload = json.dumps({"status": "success", "result": {"name": "Bass"}})
+        mock_sock.recv.side_effect = [
+            payload[:10].encode("utf-8"),
+            payload[10:].encode("utf-8"),
+        ]
+        client._sock = mock_sock
+
+        assert client.send_command("get_track_info", {"track_index": 0}) == {
+            "name": "Bass"
+        }
+
+    def test_framed_connection_closed_mid_frame(self):
+        client = SocketAbletonClient(retries=0)
+        mock_sock = MagicMock()
+        frame = encode_frame({"status": "success"})
+        mock_sock.recv.side_effect = [frame[:4], frame[4:6], b""]
+        client._sock = mock_sock
+        client._framed = True
+
+        with pytest.raises(RuntimeError, match="Lost connection"):
+            client.send_command("get_session_info")
+        assert client._sock is None
+
+    def test_pipelined_replies_matched_by_request_id(self):
+        client_end, server_end = socket.socketpair()
+        client = SocketAbletonClient()
+        client._sock = client_end
+        client._framed = True
+
+        def serve():
+            # Hold both requests, then answer them in reverse order.
+            requests = [_read_frame(server_end), _read_frame(server_end)]
+            for request in reversed(requests):
+                server_end.sendall(
+                    encode_frame(
+                        {
+                            "id": request["id"],
+                            "status": "success",
+                            "result": {"echo": request["params"]["n"]},
+                        }
+                    )
+                )
+
+        server = threading.Thread(target=serve)
+        server.start()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(
+                pool.map(
+                    lambda n: client.send_command("get_track_info", {"n": n}),
+                    [1, 2],
+                )
+            )
+        server.join()
+        server_end.close()
+
+        assert results == [{"echo": 1}, {"echo": 2}]
+
+    def test_oversized_frame_fails_waiting_commands(self, monkeypatch):
+        crashes = []
+        monkeypatch.setattr(threading, "excepthook", crashes.append)
+        client_end, server_end = socket.socketpair()
+        client = SocketAbletonClient(timeout=2, retries=0)
+        client._sock = client_end
+        client._framed = True
+
+        def serve():
+            _read_frame(server_end)
+            server_end.sendall(b"\xff\xff\xff\xff")
+
+        server = threading.Thread(target=serve)
+        server.start()
+        with pytest.raises(RuntimeError, match="Lost connection"):
+            client.send_command("get_session_info")
+        server.join()
+        server_end.close()
+        for thread in threading.enumerate():
+            if thread.name == "ableton-mcp-reader":
+                thread.join(2)
+
+        assert client._sock is None
+        # The reader ends cleanly rather than dying on the bad header
+        assert crashes == []
+
+    def test_handshake_waits_no_longer_than_the_timeout(self):
+        listener = socket.create_server(("localhost", 0))
+        port = listener.getsockname()[1]
+        client = SocketAbletonClient(port=port, timeout=0.2, retries=0)
+        try:
+            started = time.perf_counter()
+            # Accepted by the OS, but nothing ever answers hello
+            with pytest.raises(RuntimeError, match="Lost connection"):
+                client.send_command("get_session_info")
+            elapsed = time.perf_counter() - started
+        finally:
+            client.disconnect()
+            listener.close()
+
+        assert elapsed < 2.0
+
+    def test_retries_read_only_command_after_drop(self):
+        with _FramedServer(drop=1) as server:
+            client = SocketAbletonClient(port=server.port)
+            result = client.send_command("get_track_info", {"track_index": 0})
+            client.disconnect()
+
+        assert result == {"echo": "get_track_info"}
+        assert server.connections == 2
+
+    def test_retries_mutating_command_with_same_idempotency_key(self):
+        with _FramedServer(drop=1) as server:
+            client = SocketAbletonClient(port=server.port)
+            client.send_command("create_midi_track", {"index": -1})
+            client.disconnect()
+
+        keys = [request["idempotency_key"] for request in server.requests]
+        assert len(keys) == 2
+        assert keys[0] == keys[1]
+
+    def test_read_only_commands_carry_no_idempotency_key(self):
+        with _FramedServer() as server:
+            client = SocketAbletonClient(port=server.port)
+            client.send_command("get_session_info")
+            client.disconnect()
+
+        assert "idempotency_key" not in server.requests[0]
+
+    def test_does_not_retry_mutating_command_without_idempotency(self):
+        with _FramedServer(drop=1, features=[]) as server:
+            client = SocketAbletonClient(port=server.port)
+            with pytest.raises(RuntimeError, match="Lost connection"):
+                client.send_command("create_midi_track", {"index": -1})
+            client.disconnect()
+
+        assert len(server.requests) == 1
+
+    def test_retries_mutating_command_that_failed_before_sending(self):
+        with _FramedServer(features=[], drop_handshakes=1) as server:
+            client = SocketAbletonClient(port=server.port)
+            client.send_command("create_midi_track", {"index": -1})
+            client.disconnect()
+
+        assert server.connections == 2
+        assert [request["type"] for request in server.requests] == ["create_midi_track"]
+
+    def test_packs_notes_when_control_surface_supports_columns(self):
+        with _FramedServer(features=["columnar_notes"]) as server:
+            client = SocketAbletonClient(port=server.port)
+            client.send_command(
+                "add_notes_to_clip",
+                {"track_index": 0, "clip_index": 0, "notes": [{"pitch": 60}]},
+            )
+            client.disconnect()
+
+        notes = server.requests[0]["params"]["notes"]
+        assert notes["format"] == "columnar"
+        assert notes["count"] == 1
+
+    def test_gives_up_after_retries(self):
+        with _FramedServer(drop=10) as server:
+            client = SocketAbletonClient(port=server.port, retries=2, backoff=0)
+            with pytest.raises(RuntimeError, match="Lost connection"):
+                client.send_command("get_session_info")
+
+        assert len(server.requests) == 3
+
+
+class TestAsyncAbletonClient:
+    @pytest.mark.anyio
+    async def test_concurrent_commands_overlap(self):
+        async def handle(reader, writer):
+            await _read_json(reader)
+            writer.write(
+                json.dumps(
+                    {"status": "success", "result": {"framing": "length"}}
+                ).encode("utf-8")
+            )
+            requests = [await _read_async_frame(reader) for _ in range(2)]
+            # Answer the second request first; ids route the replies.
+            for request in reversed(requests):
+                writer.write(
+                    encode_frame(
+                        {
+                            "id": request["id"],
+                            "status": "success",
+                            "result": {"echo": request["params"]["n"]},
+                        }
+                    )
+                )
+            await writer.drain()
+
+        async with _serve(handle) as port:
+            client = AsyncAbletonClient(port=port)
+            results = await asyncio.gather(
+                client.send_command_async("get_track_info", {"n": 1}),
+                client.send_command_async("get_track_info", {"n": 2}),
+            )
+            await client.disconnect()
+
+        assert results == [{"echo": 1}, {"echo": 2}]
+
+    @pytest.mark.anyio
+    async def test_falls_back_to_legacy(self):
+        received = []
+
+        async def handle(reader, writer):
+            for reply in [
+                {"status": "error", "message": "Unknown command: hello"},
+                {"status": "error", "message": "Unknown command: set_framing"},
+                {"status": "success", "result": {"tempo": 120.0}},
+            ]:
+                received.append(await _read_json(reader))
+                writer.write(json.dumps(reply).encode("utf-8"))
+                await writer.drain()
+
+        async with _serve(handle) as port:
+            client = AsyncAbletonClient(port=port)
+            result = await client.send_command_async("get_session_info")
+            await client.disconnect()
+
+        assert result == {"tempo": 120.0}
+        assert received[2] == {"type": "get_session_info", "params": {}}
+
+    @pytest.mark.anyio
+    async def test_hello_reports_capabilities(self):
+        received = []
+
+        async def handle(reader, writer):
+            received.append(await _read_json(reader))
+            writer.write(
+                json.dumps(
+                    {
+                        "status": "success",
+                        "result": {
+                            "framing": "length",
+                            "request_ids": True,
+                            "protocol": 1,
+                            "live_version": "12.1.0",
+                            "commands": ["get_session_info"],
+                            "features": ["idempotency", "note_ids"],
+                        },
+                    }
+                ).encode("utf-8")
+            )
+            request = await _read_async_frame(reader)
+            received.append(request)
+            writer.write(
+                encode_frame({"id": request["id"], "status": "success", "result": {}})
+            )
+            await writer.drain()
+
+        async with _serve(handle) as port:
+            client = CachingAbletonClient(AsyncAbletonClient(port=port))
+            await client.send_command_async("get_session_info")
+            with pytest.raises(RuntimeError, match="doesn't support get_clip_notes"):
+                await client.send_command_async(
+                    "get_clip_notes", {"track_index": 0, "clip_index": 0}
+                )
+            capabilities = client.capabilities
+            await client._client.disconnect()
+
+        assert received[0] == {"type": "hello", "params": {"framing": "length"}}
+        assert [request["type"] for request in received[1:]] == ["get_session_info"]
+        assert capabilities == Capabilities(
+            protocol=1,
+            live_version="12.1.0",
+            commands=frozenset({"get_session_info"}),
+            features=frozenset({"idempotency", "note_ids"}),
+        )
+
+    @pytest.mark.anyio
+    async def test_error_response_raises(self):
+        async def handle(reader, writer):
+            await _read_json(reader)
+            writer.write(
+                json.dumps({"status": "error", "message": "Track not found"}).encode(
+                    "utf-8"
+                )
+            )
+            await writer.drain()
+
+        async with _serve(handle) as port:
+            client = AsyncAbletonClient(port=port, framing=False)
+            with pytest.raises(RuntimeError, match="Track not found"):
+                await client.send_command_async("get_track_info")
+            await client.disconnect()
+
+    @pytest.mark.anyio
+    async def test_retries_mutating_command_with_same_idempotency_key(self):
+        with _FramedServer(drop=1) as server:
+            client = AsyncAbletonClient(port=server.port)
+            await client.send_command_async("create_midi_track", {"index": -1})
+            await client.disconnect()
+
+        keys = [request["idempotency_key"] for request in server.requests]
+        assert len(keys) == 2
+        assert keys[0] == keys[1]
+
+    @pytest.mark.anyio
+    async def test_retries_mutating_command_that_failed_before_sending(self):
+        with _FramedServer(features=[], drop_handshakes=1) as server:
+            client = AsyncAbletonClient(port=server.port)
+            await client.send_command_async("create_midi_track", {"index": -1})
+            await client.disconnect()
+
+        assert server.connections == 2
+        assert [request["type"] for request in server.requests] == ["create_midi_track"]
+
+    @pytest.mark.anyio
+    async def test_subscribe_events_routes_events_to_callback(self):
+        events = []
+        done = asyncio.Event()
+
+        async def handle(reader, writer):
+            await _read_json(reader)
+            writer.write(
+                json.dumps(
+                    {
+                        "status": "success",
+                        "result": {
+                            "framing": "length",
+                            "request_ids": True,
+                            "features": ["events"],
+                        },
+                    }
+                ).encode("utf-8")
+            )
+            request = await _read_async_frame(reader)
+            writer.write(encode_frame({"event": "snapshot", "snapshot": {}}))
+            writer.write(
+                encode_frame({"id": request["id"], "status": "success", "result": {}})
+            )
+            writer.write(encode_frame({"event": "song", "song": {"tempo": 90.0}}))
+            await writer.drain()
+            await done.wait()
+
+        async with _serve(handle) as port:
+            client = AsyncAbletonClient(port=port)
+            subscribed = await client.subscribe_events(events.append)
+            while len(events) < 2:
+                await asyncio.sleep(0.01)
+            done.set()
+            await client.disconnect()
+
+        assert subscribed is True
+        assert [event["event"] for event in events] == [
+            "snapshot",
+            "song",
+            "disconnected",
+        ]
+
+    @pytest.mark.anyio
+    async def test_transport_events_go_to_transport_subscriber(self):
+        changes, transport = [], []
+        done = asyncio.Event()
+        requests = []
+
+        async def handle(reader, writer):
+            await _read_json(reader)
+            writer.write(
+                json.dumps(
+                    {
+                        "status": "success",
+                        "result": {
+                            "framing": "length",
+                            "request_ids": True,
+                            "features": ["events", "transport"],
+                        },
+                    }
+                ).encode("utf-8")
+            )
+            for _ in range(2):
+                request = await _read_async_frame(reader)
+                requests.append(request)
+                writer.write(
+                    encode_frame(
+                        {"id": request["id"], "status": "success", "result": {}}
+                    )
+                )
+            writer.write(encode_frame({"event": "transport", "transport": {}}))
+            writer.write(encode_frame({"event": "song", "song": {}}))
+            await writer.drain()
+            await done.wait()
+
+        async with _serve(handle) as port:
+            client = AsyncAbletonClient(port=port)
+            await client.subscribe_events(changes.append)
+            await client.subscribe_transport(transport.append, interval=0.5)
+            while not changes:
+                await asyncio.sleep(0.01)
+            done.set()
+            await client.disconnect()
+
+        assert requests[1]["type"] == "subscribe_transport"
+        assert requests[1]["params"] == {"interval": 0.5}
+        assert [event["event"] for event in transport] == [
+            "transport",
+            "disconnected",
+        ]
+        assert [event["event"] for event in changes] == ["song", "disconnected"]
+
+    @pytest.mark.anyio
+    async def test_subscribe_events_unsupported(self):
+        async def handle(reader, writer):
+            await _read_json(reader)
+            writer.write(
+                json.dumps(
+                    {"status": "success", "result": {"framing": "length"}}
+                ).encode("utf-8")
+            )
+            await writer.drain()
+
+        async with _serve(handle) as port:
+            client = AsyncAbletonClient(port=port)
+            subscribed = await client.subscribe_events(lambda event: None)
+            await client.disconnect()
+
+        assert subscribed is False
+
+    @pytest.mark.anyio
+    async def test_connection_refused(self):
+        async with _serve(lambda reader, writer: None) as port:
+            pass
+        client = AsyncAbletonClient(port=port)
+        with pytest.raises(RuntimeError, match="Lost connection"):
+            await client.send_command_async("get_session_info")
+
+    @pytest.mark.anyio
+    async def test_warm_up_connects_once(self):
+        with _FramedServer() as server:
+            client = AsyncAbletonClient(port=server.port)
+            await client.warm_up()
+            connected = server.connections
+            result = await client.send_command_async("get_session_info")
+            await client.disconnect()
+
+        assert connected == 1
+        assert server.connections == 1
+        assert result == {"echo": "get_session_info"}
+
+    @pytest.mark.anyio
+    async def test_warm_up_without_live(self):
+        async with _serve(lambda reader, writer: None) as port:
+            pass
+        client = AsyncAbletonClient(port=port)
+        await client.warm_up()
+        with pytest.raises(RuntimeError, match="Lost connection"):
+            await client.send_command_async("get_session_info")
+
+
+class TestPooledAbletonClient:
+    def test_concurrent_commands_use_separate_connections(self):
+        both_in_flight = threading.Barrier(2, timeout=5)
+
+        def reply(request):
+            both_in_flight.wait()
+            return {"echo": request["params"]["n"]}
+
+        with _LegacyServer(reply) as server:
+            client = PooledAbletonClient(port=server.port, size=2)
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                results = list(
+                    pool.map(
+                        lambda n: client.send_command("get_track_info", {"n": n}),
+                        [1, 2],
+                    )
+                )
+            client.disconnect()
+
+        assert results == [{"echo": 1}, {"echo": 2}]
+        assert server.connections == 2
+
+    def test_reuses_idle_connection(self):
+        with _LegacyServer(lambda request: {}) as server:
+            client = PooledAbletonClient(port=server.port)
+            client.send_command("get_session_info")
+            client.send_command("get_session_info")
+            client.disconnect()
+
+        assert server.connections == 1
+
+    def test_connections_share_timings(self):
+        with _LegacyServer(lambda request: {}) as server:
+            client = PooledAbletonClient(port=server.port, size=2)
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                list(
+                    pool.map(lambda _: client.send_command("get_session_info"), [1, 2])
+                )
+            client.disconnect()
+
+        assert client.timings.summary()["get_session_info"]["total"]["count"] == 2
+
+    def test_replaces_connection_closed_by_ableton(self):
+        with _LegacyServer(lambda request: {}, close_after_reply=True) as server:
+            client = PooledAbletonClient(port=server.port)
+            client.send_command("get_session_info")
+            result = client.send_command("get_session_info")
+            client.disconnect()
+
+        assert result == {}
+        assert server.connections == 2
+
+    def test_replaces_connection_idle_too_long(self):
+        with _LegacyServer(lambda request: {}) as server:
+            client = PooledAbletonClient(port=server.port, max_idle=0)
+            client.send_command("get_session_info")
+            client.send_command("get_session_info")
+            client.disconnect()
+
+        assert server.connections == 2
+
+    def test_times_out_when_pool_exhausted(self):
+        client = PooledAbletonClient(size=1, timeout=0.05)
+        client._checkout()
+
+        with pytest.raises(RuntimeError, match="free connection"):
+            client.send_command("get_session_info")
+
+
+class TestCachingAbletonClient:
+    def _client(self, **kwargs):
+        inner = FakeAbletonClient()
+        inner.version = 1
+        for command in ("get_track_info", "get_session_info", "set_track_name"):
+            inner.set_response(command, {"command": command})
+        inner.set_response("create_midi_track", {})
+        return inner, CachingAbletonClient(inner, **kwargs)
+
+    def test_repeated_read_is_served_from_cache(self):
+        inner, client = self._client()
+
+        first = client.send_command("get_track_info", {"track_index": 0})
+        second = client.send_command("get_track_info", {"track_index": 0})
+
+        assert first == second
+        assert len(inner.commands_sent) == 1
+        assert client.stats()["hits"] == 1
+
+    def test_mutation_only_invalidates_what_it_touches(self):
+        inner, client = self._client()
+        client.send_command("get_track_info", {"track_index": 0})
+        client.send_command("get_track_info", {"track_index": 1})
+        client.send_command("get_session_info")
+
+        inner.version = 2  # Bumped by the command itself
+        client.send_command("set_track_name", {"track_index": 1, "name": "Bass"})
+        inner.commands_sent.clear()
+        client.send_command("get_track_info", {"track_index": 0})
+        client.send_command("get_track_info", {"track_index": 1})
+        client.send_command("get_session_info")
+
+        assert inner.commands_sent == [
+            ("get_track_info", {"track_index": 1}),
+            ("get_session_info", {}),
+        ]
+
+    def test_unscoped_mutation_invalidates_everything(self):
+        inner, client = self._client()
+        client.send_command("get_track_info", {"track_index": 0})
+
+        inner.version = 2
+        client.send_command("create_midi_track", {"index": 0})
+        client.send_command("get_track_info", {"track_index": 0})
+
+        assert inner.commands_sent[-1] == ("get_track_info", {"track_index": 0})
+        assert client.stats()["hits"] == 0
+
+    def test_change_made_elsewhere_invalidates_everything(self):
+        inner, client = self._client()
+        client.send_command("get_track_info", {"track_index": 0})
+
+        inner.version = 5
+        client.send_command("get_track_info", {"track_index": 0})
+
+        assert len(inner.commands_sent) == 2
+
+    def test_entries_expire(self):
+        inner, client = self._client(ttl=0)
+        client.send_command("get_track_info", {"track_index": 0})
+        client.send_command("get_track_info", {"track_index": 0})
+
+        assert len(inner.commands_sent) == 2
+
+    def test_diagnostics_are_never_cached(self):
+        inner, client = self._client()
+        inner.set_response("get_cache_stats", {})
+        client.send_command("get_cache_stats")
+        client.send_command("get_cache_stats")
+
+        assert len(inner.commands_sent) == 2
+
+    @pytest.mark.anyio
+    async def test_async_reads_are_cached(self):
+        inner, client = self._client()
+
+        await client.send_command_async("get_track_info", {"track_index": 0})
+        await client.send_command_async("get_track_info", {"track_index": 0})
+
+        assert len(inner.commands_sent) == 1
+
+
+class _LegacyServer:
+    """Threaded TCP server speaking the unframed protocol, one reply per
+    request, that counts the connections it accepts."""
+
+    def __init__(self, reply, close_after_reply: bool = False) -> None:
+        self.connections = 0
+        outer = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                outer.connections += 1
+                buffer = b""
+                while chunk := self.request.recv(8192):
+                    buffer += chunk
+                    try:
+                        request = json.loads(buffer.decode("utf-8"))
+                    except json.JSONDecodeError:
+                        continue
+                    buffer = b""
+                    handshake = request["type"] in ("hello", "set_framing")
+                    if handshake:
+                        response = {"status": "error", "message": "Unknown command"}
+                    else:
+                        response = {"status": "success", "result": reply(request)}
+                    self.request.sendall(json.dumps(response).encode("utf-8"))
+                    if close_after_reply and not handshake:
+                        return
+
+        self._server = socketserver.ThreadingTCPServer(("localhost", 0), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+
+    def __enter__(self) -> "_LegacyServer":
+        threading.Thread(
+            target=self._server.serve_forever, args=(0.01,), daemon=True
+        ).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _FramedServer:
+    """Threaded TCP server that negotiates framing and echoes each command's
+    type. The first ``drop`` commands are dropped by closing the connection
+    without a reply, after the first ``drop_handshakes`` connections are
+    closed before answering the handshake."""
+
+    def __init__(
+        self,
+        drop: int = 0,
+        features: list[str] | None = None,
+        drop_handshakes: int = 0,
+    ) -> None:
+        self.connections = 0
+        self.requests: list[dict] = []
+        self._drop = drop
+        self._drop_handshakes = drop_handshakes
+        outer = self
+        result = {
+            "framing": "length",
+            "request_ids": True,
+            "features": ["idempotency"] if features is None else features,
+        }
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                outer.connections += 1
+                self.request.recv(8192)
+                if outer._drop_handshakes:
+                    outer._drop_handshakes -= 1
+                    return
+                self.request.sendall(
+                    json.dumps({"status": "success", "result": result}).encode("utf-8")
+                )
+                while True:
+                    try:
+                        request = _read_frame(self.request)
+                    except (ValueError, OSError):
+                        return
+                    outer.requests.append(request)
+                    if outer._drop:
+                        outer._drop -= 1
+                        return
+                    response = {
+                        "status": "success",
+                        "result": {"echo": request["type"]},
+                    }
+                    self.request.sendall(
+                        encode_frame({"id": request["id"], **response})
+                    )
+
+        self._server = socketserver.ThreadingTCPServer(("localhost", 0), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+
+    def __enter__(self) -> "_FramedServer":
+        threading.Thread(
+            target=self._server.serve_forever, args=(0.01,), daemon=True
+        ).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _serve:
+    """Run an asyncio TCP server on a free local port for one test."""
+
+    def __init__(self, handle) -> None:
+        self._handle = handle
+
+    async def __aenter__(self) -> int:
+        self._server = await asyncio.start_server(self._handle, "localhost", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._server.close()
+
+
+async def _read_json(reader: asyncio.StreamReader) -> dict:
+    buffer = b""
+    while True:
+        buffer += await reader.read(8192)
+        try:
+            return json.loads(buffer.decode("utf-8"))
+        except json.JSONDecodeError:
+            continue
+
+
+async def _read_async_frame(reader: asyncio.StreamReader) -> dict:
+    header = await reader.readexactly(4)
+    payload = await reader.readexactly(int.from_bytes(header, "big"))
+    return json.loads(payload.decode("utf-8"))
+
+
+def _read_frame(sock: socket.socket) -> dict:
+    header = sock.recv(4, socket.MSG_WAITALL)
+    length = int.from_bytes(header, "big")
+    return json.loads(sock.recv(length, socket.MSG_WAITALL).decode("utf-8"))
@@ -40,6 +40,79 @@ async def test_get_clip_notes(fake_client, mcp_server):
     ]
 
 
+@pytest.mark.anyio
+async def test_get_clip_notes_as_table(fake_client, mcp_server):
+    fake_client.set_response(
+        "get_clip_notes",
+        {
+            "notes": [
+                {"pitch": 60, "start_time": 0.0, "duration": 1.0},
+                {"pitch": 64, "start_time": 1.0, "duration": 0.5},
+            ]
+        },
+    )
+
+    content, _ = await mcp_server.call_tool(
+        "get_clip_notes", {"track_index": 0, "clip_index": 0, "output": "table"}
+    )
+
+    assert content[0].text == (
+        '{"notes":{"columns":["pitch","start_time","duration"],'
+        '"rows":[[60,0.0,1.0],[64,1.0,0.5]]}}'
+    )
+    # Output is formatting only; it isn't sent to Live
+    assert fake_client.commands_sent == [
+        ("get_clip_notes", {"track_index": 0, "clip_index": 0})
+    ]
+
+
+@pytest.mark.anyio
+async def test_get_clip_notes_window_and_page(fake_client, mcp_server):
+    fake_client.set_response(
+        "get_clip_notes",
+        {
+            "notes": [
+                {
+                    "pitch": 36,
+                    "start_time": 16.0,
+                    "duration": 0.25,
+                    "velocity": 100,
+                    "mute": False,
+                }
+            ],
+            "next_cursor": "16.0:36",
+        },
+    )
+
+    content, _ = await mcp_server.call_tool(
+        "get_clip_notes",
+        {
+            "track_index": 0,
+            "clip_index": 0,
+            "start_time": 16.0,
+            "end_time": 32.0,
+            "pitch_min": 36,
+            "limit": 1,
+        },
+    )
+    result = json.loads(content[0].text)
+
+    assert result["next_cursor"] == "16.0:36"
+    assert fake_client.commands_sent == [
+        (
+            "get_clip_notes",
+            {
+                "track_index": 0,
+                "clip_index": 0,
+                "start_time": 16.0,
+                "end_time": 32.0,
+                "pitch_min": 36,
+                "limit": 1,
+            },
+        )
+    ]
+
+
 @pytest.mark.anyio
 async def test_get_clip_info(fake_client, mcp_server):
     fake_client.set_response(
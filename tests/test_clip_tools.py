@@ -1,6 +1,21 @@
 import json
 
 import pytest
+from injector import Injector
+
+from ableton_mcp.client import UnsupportedCommandError
+from ableton_mcp.server import create_server
+from tests.conftest import FakeAbletonClient, FakeAbletonModule
+
+
+class OldControlSurface(FakeAbletonClient):
+    """A control surface without note transforms."""
+
+    def send_command(self, command_type, params=None):
+        if command_type.startswith("transform_"):
+            self.commands_sent.append((command_type, params or {}))
+            raise UnsupportedCommandError(f"Unknown command: {command_type}")
+        return super().send_command(command_type, params)
 
 
 @pytest.mark.anyio
@@ -68,6 +83,64 @@ async def test_add_notes_to_clip_append(fake_client, mcp_server):
     )
 
 
+@pytest.mark.anyio
+async def test_apply_note_diff(fake_client, mcp_server):
+    add = [{"pitch": 67, "start_time": 2.0, "duration": 1.0}]
+    remove = [{"note_id": 3}]
+    modify = [{"pitch": 60, "start_time": 0.0, "changes": {"velocity": 90}}]
+    fake_client.set_response(
+        "apply_note_diff",
+        {"removed": 1, "modified": 1, "added": 1, "note_ids": [7]},
+    )
+
+    content, _ = await mcp_server.call_tool(
+        "apply_note_diff",
+        {
+            "track_index": 0,
+            "clip_index": 0,
+            "add": add,
+            "remove": remove,
+            "modify": modify,
+        },
+    )
+    result = json.loads(content[0].text)
+
+    assert result["note_ids"] == [7]
+    assert fake_client.commands_sent[0] == (
+        "apply_note_diff",
+        {
+            "track_index": 0,
+            "clip_index": 0,
+            "add": add,
+            "remove": remove,
+            "modify": modify,
+        },
+    )
+
+
+@pytest.mark.anyio
+async def test_apply_note_diff_defaults_to_empty_edits(fake_client, mcp_server):
+    fake_client.set_response(
+        "apply_note_diff", {"removed": 1, "modified": 0, "added": 0}
+    )
+
+    await mcp_server.call_tool(
+        "apply_note_diff",
+        {"track_index": 0, "clip_index": 0, "remove": [{"note_id": 3}]},
+    )
+
+    assert fake_client.commands_sent[0] == (
+        "apply_note_diff",
+        {
+            "track_index": 0,
+            "clip_index": 0,
+            "add": [],
+            "remove": [{"note_id": 3}],
+            "modify": [],
+        },
+    )
+
+
 @pytest.mark.anyio
 async def test_set_clip_name(fake_client, mcp_server):
     fake_client.set_response("set_clip_name", {"name": "Melody A"})
@@ -106,3 +179,81 @@ async def test_stop_clip(fake_client, mcp_server):
     assert fake_client.commands_sent == [
         ("stop_clip", {"track_index": 1, "clip_index": 2})
     ]
+
+
+@pytest.mark.anyio
+async def test_transform_clip_notes(fake_client, mcp_server):
+    operations = [
+        {"op": "transpose", "semitones": -12},
+        {"op": "quantize", "grid": 0.25, "strength": 0.5},
+    ]
+    fake_client.set_response("transform_clip_notes", {"notes": 8, "removed": 0})
+
+    content, _ = await mcp_server.call_tool(
+        "transform_clip_notes",
+        {"track_index": 0, "clip_index": 1, "operations": operations},
+    )
+    result = json.loads(content[0].text)
+
+    assert result == {"notes": 8, "removed": 0}
+    assert fake_client.commands_sent == [
+        (
+            "transform_clip_notes",
+            {"track_index": 0, "clip_index": 1, "operations": operations},
+        )
+    ]
+
+
+@pytest.mark.anyio
+async def test_transform_clip_notes_on_older_control_surface():
+    client = OldControlSurface()
+    client.set_response(
+        "get_clip_notes",
+        {
+            "notes": [
+                {"pitch": 60, "start_time": 0.1, "duration": 0.5, "velocity": 90},
+                {"pitch": 127, "start_time": 1.0, "duration": 0.5, "velocity": 90},
+            ]
+        },
+    )
+    client.set_response("add_notes_to_clip", {"notes_added": 1})
+    mcp_server = create_server(Injector([FakeAbletonModule(client)]))
+    clip = {"track_index": 0, "clip_index": 1}
+
+    content, _ = await mcp_server.call_tool(
+        "transform_clip_notes",
+        {
+            **clip,
+            "operations": [
+                {"op": "transpose", "semitones": 1},
+                {"op": "quantize", "grid": 0.5},
+            ],
+        },
+    )
+    result = json.loads(content[0].text)
+
+    assert result == {"notes": 1, "removed": 1}
+    assert [command for command, _ in client.commands_sent] == [
+        "transform_clip_notes",
+        "get_clip_notes",
+        "add_notes_to_clip",
+    ]
+    assert client.commands_sent[2][1] == {
+        **clip,
+        "notes": [{"pitch": 61, "start_time": 0.0, "duration": 0.5, "velocity": 90.0}],
+    }
+
+
+@pytest.mark.anyio
+async def test_transform_clip_notes_rejects_bad_operation_offline():
+    client = OldControlSurface()
+    client.set_response("get_clip_notes", {"notes": []})
+    mcp_server = create_server(Injector([FakeAbletonModule(client)]))
+
+    content, _ = await mcp_server.call_tool(
+        "transform_clip_notes",
+        {"track_index": 0, "clip_index": 0, "operations": [{"op": "reverse"}]},
+    )
+    result = json.loads(content[0].text)
+
+    assert result == {"error": "Unknown note transform: reverse"}
@@ -0,0 +1,169 @@
+import ast
+from pathlib import Path
+
+import pytest
+
+from ableton_mcp.commands import (
+    COMMANDS,
+    MUTATION_SCOPES,
+    READ_ONLY_COMMANDS,
+    is_cacheable,
+    validate,
+)
+
+CONTROL_SURFACE = (
+    Path(__file__).parent.parent / "control_surface" / "AbletonMCP" / "__init__.py"
+)
+
+
+def _control_surface() -> ast.Module:
+    # The control surface only imports inside Live, so it is parsed instead
+    return ast.parse(CONTROL_SURFACE.read_text())
+
+
+def _control_surface_registry() -> dict[str, tuple[str, bool]]:
+    """COMMANDS from the control surface: handler name and needs_main_thread."""
+    for node in ast.walk(_control_surface()):
+        if (
+            isinstance(node, ast.Assign)
+            and isinstance(node.targets[0], ast.Name)
+            and node.targets[0].id == "COMMANDS"
+        ):
+            return ast.literal_eval(node.value)
+    raise AssertionError("COMMANDS not found in the control surface")
+
+
+def _control_surface_commands() -> dict[str, bool]:
+    """COMMANDS from the control surface, mapped to needs_main_thread."""
+    return {name: main for name, (_, main) in _control_surface_registry().items()}
+
+
+def _handler_params() -> dict[str, set[str]]:
+    return {
+        node.name: {arg.arg for arg in node.args.args}
+        for node in ast.walk(_control_surface())
+        if isinstance(node, ast.FunctionDef)
+    }
+
+
+def _handler_required_params() -> dict[str, set[str]]:
+    required = {}
+    for node in ast.walk(_control_surface()):
+        if isinstance(node, ast.FunctionDef):
+            args = node.args.args[1:]  # Skip self
+            required[node.name] = {
+                arg.arg for arg in args[: len(args) - len(node.args.defaults)]
+            }
+    return required
+
+
+def test_read_only_commands_match_control_surface():
+    commands = _control_surface_commands()
+    read_only = {name for name, main_thread in commands.items() if not main_thread}
+    assert READ_ONLY_COMMANDS == read_only
+
+
+def test_mutation_scopes_name_handler_params():
+    registry = _control_surface_registry()
+    params = _handler_params()
+    for command, scope in MUTATION_SCOPES.items():
+        handler, main_thread = registry[command]
+        assert main_thread, command
+        assert set(scope) <= params[handler], command
+
+
+def test_schema_matches_control_surface():
+    registry = _control_surface_registry()
+    params = _handler_params()
+    required = _handler_required_params()
+
+    assert set(COMMANDS) == set(registry)
+    for name, command in COMMANDS.items():
+        handler, main_thread = registry[name]
+        assert command.read_only is not main_thread, name
+        assert {param.name for param in command.params} <= params[handler], name
+        assert {param.name for param in command.params if param.required} == required[
+            handler
+        ], name
+
+
+def test_reads_that_change_without_an_edit_are_not_cacheable():
+    assert is_cacheable("get_track_info")
+    assert not is_cacheable("get_transport")
+    assert not is_cacheable("get_device_parameters")
+    assert not is_cacheable("get_cache_stats")
+    assert not is_cacheable("set_track_name")
+
+
+def test_params_for_leaves_out_unset_optional_params():
+    command = COMMANDS["get_clip_notes"]
+
+    assert command.params_for(
+        {"track_index": 0, "clip_index": 1, "limit": 10, "cursor": None}
+    ) == {"track_index": 0, "clip_index": 1, "limit": 10}
+
+
+def test_params_for_fills_in_defaults():
+    assert COMMANDS["apply_note_diff"].params_for(
+        {"track_index": 0, "clip_index": 1, "remove": [{"note_id": 3}]}
+    ) == {
+        "track_index": 0,
+        "clip_index": 1,
+        "add": [],
+        "remove": [{"note_id": 3}],
+        "modify": [],
+    }
+    assert COMMANDS["create_midi_track"].params_for({}) == {"index": -1}
+
+
+@pytest.mark.parametrize(
+    "command_type, params, message",
+    [
+        ("set_track_name", {"track_index": 0}, "Missing parameter 'name'"),
+        ("get_track_info", {"track_index": 0, "n": 1}, "Unknown parameter 'n'"),
+        ("get_track_info", {"track_index": "0"}, "'track_index' .* must be int"),
+        ("set_track_mute", {"track_index": 0, "mute": 1}, "must be bool"),
+        ("get_track_info", {"track_index": True}, "must be int"),
+        (
+            "add_notes_to_clip",
+            {"track_index": 0, "clip_index": 0, "notes": [{"pitch": 60}, 61]},
+            "must be list\\[dict\\]",
+        ),
+        ("batch", {"operations": [{"type": "batch"}]}, "Operation 0: .* batched"),
+        (
+            "batch",
+            {"operations": [{"type": "undo"}, {"type": "delete_track"}]},
+            "Operation 1: Missing parameter 'track_index'",
+        ),
+        (
+            "transform_clip_notes",
+            {"track_index": 0, "clip_index": 0, "operations": [{"op": "reverse"}]},
+            "Operation 0: Unknown note transform: reverse",
+        ),
+    ],
+)
+def test_validate_rejects(command_type, params, message):
+    with pytest.raises(ValueError, match=message):
+        validate(command_type, params)
+
+
+@pytest.mark.parametrize(
+    "command_type, params",
+    [
+        ("set_track_volume", {"track_index": 0, "volume": 1}),
+        ("get_clip_notes", {"track_index": 0, "clip_index": 0, "limit": None}),
+        ("create_midi_track", {}),
+        ("batch", {"operations": [{"type": "some_newer_command", "params": {}}]}),
+        ("some_newer_command", {"anything": 1}),
+        (
+            "transform_arrangement_clip_notes",
+            {
+                "track_index": 0,
+                "clip_index": 0,
+                "operations": [{"op": "legato"}, {"op": "stretch", "factor": 2}],
+            },
+        ),
+    ],
+)
+def test_validate_accepts(command_type, params):
+    validate(command_type, params)
@@ -0,0 +1,695 @@
+"""The control surface itself, run in a simulated Live (see live_model)."""
+
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+
+import pytest
+from live_model import BrowserItem, Device, Note
+
+from ableton_mcp import transforms
+from ableton_mcp.client import (
+    AsyncAbletonClient,
+    CachingAbletonClient,
+    SocketAbletonClient,
+)
+from ableton_mcp.mirror import SessionMirror
+from ableton_mcp.protocol import HELLO, encode_frame, encode_message
+
+
+def _eventually(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition never held"
+        time.sleep(0.005)
+
+
+def _read_frame(sock: socket.socket) -> dict:
+    header = sock.recv(4, socket.MSG_WAITALL)
+    length = int.from_bytes(header, "big")
+    return json.loads(sock.recv(length, socket.MSG_WAITALL).decode("utf-8"))
+
+
+def _framed_socket(port: int) -> socket.socket:
+    sock = socket.create_connection(("localhost", port), timeout=5.0)
+    sock.sendall(encode_message(HELLO))
+    buffer = b""
+    while not buffer.endswith(b"}"):
+        buffer += sock.recv(8192)
+    assert json.loads(buffer)["result"]["framing"] == "length"
+    return sock
+
+
+@pytest.fixture
+def client(live):
+    client = SocketAbletonClient(port=live.port)
+    yield client
+    client.disconnect()
+
+
+def _count_ticks(live) -> list[int]:
+    """Count Live's main-thread ticks into the returned list's only item."""
+    ticks = [0]
+    update_display = live.surface.update_display
+
+    def counting() -> None:
+        ticks[0] += 1
+        update_display()
+
+    live.surface.update_display = counting
+    return ticks
+
+
+# ── Messages ────────────────────────────────────────────────────────
+
+
+def test_oversized_frame_closes_connection(live):
+    with _framed_socket(live.port) as sock:
+        sock.sendall((2**32 - 1).to_bytes(4, "big"))
+
+        assert sock.recv(1) == b""
+
+
+def test_oversized_unframed_message_closes_connection(live):
+    live.module.MAX_MESSAGE_SIZE = 1024
+    with socket.create_connection(("localhost", live.port), timeout=5.0) as sock:
+        sock.sendall(b'{"type": "' + b"x" * 2048)
+
+        assert sock.recv(1) == b""
+
+
+# ── Main-thread scheduling ──────────────────────────────────────────
+
+
+def test_queued_commands_share_one_tick(live):
+    ticks = _count_ticks(live)
+    ran_in = []
+    done = threading.Event()
+    for _ in range(20):
+        live.surface._enqueue_main_thread(lambda: ran_in.append(ticks[0]))
+    live.surface._enqueue_main_thread(done.set)
+
+    assert done.wait(2.0)
+    assert len(set(ran_in)) == 1
+
+
+def test_work_over_the_tick_budget_waits_for_the_next_tick(live):
+    ticks = _count_ticks(live)
+    live.surface._tick_budget = 0.001
+    ran_in = []
+
+    def slow_task() -> None:
+        ran_in.append(ticks[0])
+        time.sleep(0.005)
+
+    for _ in range(3):
+        live.surface._enqueue_main_thread(slow_task)
+    _eventually(lambda: len(ran_in) == 3)
+
+    assert ran_in == sorted(set(ran_in))
+
+
+@pytest.mark.anyio
+async def test_pipelined_writes_are_not_one_per_tick(start_live):
+    live = start_live(tick=0.1)
+    client = AsyncAbletonClient(port=live.port)
+    try:
+        await client.warm_up()
+        started = time.monotonic()
+        await asyncio.gather(
+            *(
+                client.send_command_async(
+                    "set_track_name", {"track_index": 0, "name": f"T{i}"}
+                )
+                for i in range(10)
+            )
+        )
+        elapsed = time.monotonic() - started
+    finally:
+        await client.disconnect()
+
+    # One tick per command would take a second
+    assert elapsed < 0.5
+    assert live.song.tracks[0].name == "T9"
+
+
+# ── Continuations ───────────────────────────────────────────────────
+
+
+@pytest.mark.anyio
+async def test_device_load_does_not_block_other_commands(live):
+    live.module.TRACK_SELECT_SETTLE = 0.2
+    live.wait_for_browser_index()
+    client = AsyncAbletonClient(port=live.port)
+    finished = []
+
+    async def send(command_type: str, params: dict) -> dict:
+        result = await client.send_command_async(command_type, params)
+        finished.append(command_type)
+        return result
+
+    try:
+        await client.warm_up()
+        load = asyncio.create_task(
+            send(
+                "load_browser_item",
+                {"track_index": 1, "uri": "query:Instruments#Folder0:Preset1"},
+            )
+        )
+        await asyncio.sleep(0.05)
+        await send("set_tempo", {"tempo": 99.0})
+        loaded = await load
+    finally:
+        await client.disconnect()
+
+    assert finished == ["set_tempo", "load_browser_item"]
+    assert loaded["device_name"] == "Instruments Preset 0-1"
+    assert live.song.tracks[1].devices[-1].name == "Instruments Preset 0-1"
+
+
+# ── Browser index ───────────────────────────────────────────────────
+
+
+def test_item_is_complete_before_search_can_find_it(live):
+    index = live.module._BrowserIndex(live.module.BROWSER_INDEX_PATH)
+    index_tokens = index._index_tokens
+    published = []
+
+    def check_then_publish(uri, path):
+        # Under the lock, with what search will look up already there
+        assert index._lock.locked()
+        published.append((index._paths[uri], uri in index._folders))
+        index_tokens(uri, path)
+
+    index._index_tokens = check_then_publish
+    index._add("query:Drums#Kits", None, ["drums", "Kits"], True)
+
+    assert published == [(["drums", "Kits"], True)]
+    assert index.search("kits")[0]["path"] == "Drums/Kits"
+
+
+def _add_preset(live, folder: int, name: str) -> str:
+    uri = f"query:Instruments#Folder{folder}:{name}"
+    parent = live.browser.instruments.children[folder]
+    live.call(lambda: parent.children.append(BrowserItem(name, uri)))
+    return uri
+
+
+def test_load_finds_item_added_after_indexing(live, client):
+    live.module.TRACK_SELECT_SETTLE = 0.0
+    live.wait_for_browser_index()
+    uri = _add_preset(live, 0, "Fresh Keys")
+
+    loaded = client.send_command("load_browser_item", {"track_index": 0, "uri": uri})
+
+    assert loaded["device_name"] == "Fresh Keys"
+    # The walk that found it added it to the index
+    results = client.send_command("search_browser", {"query": "fresh keys"})
+    assert [r["uri"] for r in results["results"]] == [uri]
+
+
+def test_saved_index_is_refreshed_after_adopting_it(start_live, tmp_path):
+    path = tmp_path / "browser_index.json"
+    live = start_live(browser_index_path=str(path))
+    live.wait_for_browser_index()
+    _eventually(path.exists)
+    live.stop()
+    saved = json.loads(path.read_text())
+    missing = "query:Drums#Folder1:Preset1"
+    entry = saved["entries"].pop(missing)
+    saved["entries"]["query:Drums#Gone"] = [["drums", "Gone"], False]
+    path.write_text(json.dumps(saved))
+
+    live = start_live(browser_index_path=str(path))
+    index = live.surface._browser_index
+    live.wait_for_browser_index()
+
+    _eventually(lambda: "query:Drums#Gone" not in index._paths)
+    assert index._paths[missing] == entry[0]
+    assert index.search("gone") == []
+
+
+def test_fingerprint_sees_items_below_the_top_level(live):
+    roots = live.surface._browser_roots(live.browser)
+    before = live.surface._browser_fingerprint(roots)
+
+    _add_preset(live, 1, "Fresh Pad")
+
+    assert live.surface._browser_fingerprint(roots) != before
+
+
+def test_lookup_that_finds_a_deeper_change_reindexes(live, client):
+    live.module.TRACK_SELECT_SETTLE = 0.0
+    live.wait_for_browser_index()
+    roots = live.surface._browser_roots(live.browser)
+    before = live.surface._browser_fingerprint(roots)
+    preset = live.browser.instruments.children[1].children[0]
+    old_uri, new_uri = preset.uri, "query:Instruments#Folder1:Warm Keys"
+
+    def rename() -> None:
+        preset.name, preset.uri = "Warm Keys", new_uri
+
+    live.call(rename)
+    # Too deep for the fingerprint, but the load finds it by walking
+    assert live.surface._browser_fingerprint(roots) == before
+    client.send_command("load_browser_item", {"track_index": 0, "uri": new_uri})
+    assert live.surface._browser_index.stale
+
+    live.call(live.surface._check_browser_changed)
+    live.wait_for_browser_index()
+
+    index = live.surface._browser_index
+    assert not index.stale
+    assert new_uri in index._paths and old_uri not in index._paths
+
+
+# ── Batches ─────────────────────────────────────────────────────────
+
+
+def _rename_batch(names: dict[int, str]) -> list[dict]:
+    return [
+        {"type": "set_track_name", "params": {"track_index": i, "name": name}}
+        for i, name in names.items()
+    ]
+
+
+def test_batch_stops_on_error(live, client):
+    result = client.send_command(
+        "batch", {"operations": _rename_batch({0: "A", 9: "X", 1: "B"})}
+    )
+
+    assert [r["status"] for r in result["results"]] == ["success", "error"]
+    assert result["results"][1]["message"] == "Track index 9 out of range (0-1)"
+    assert (result["succeeded"], result["failed"], result["skipped"]) == (1, 1, 1)
+    assert [track.name for track in live.song.tracks] == ["A", "Track 2"]
+
+
+def test_batch_continues_on_error(live, client):
+    result = client.send_command(
+        "batch",
+        {
+            "operations": _rename_batch({0: "A", 9: "X", 1: "B"}),
+            "stop_on_error": False,
+        },
+    )
+
+    assert [r["status"] for r in result["results"]] == ["success", "error", "success"]
+    assert (result["succeeded"], result["failed"], result["skipped"]) == (2, 1, 0)
+    assert [track.name for track in live.song.tracks] == ["A", "B"]
+
+
+def test_batch_waits_on_continuations(live, client):
+    live.module.TRACK_SELECT_SETTLE = 0.0
+    live.wait_for_browser_index()
+
+    result = client.send_command(
+        "batch",
+        {
+            "operations": [
+                {
+                    "type": "load_browser_item",
+                    "params": {
+                        "track_index": 0,
+                        "uri": "query:AudioEffects#Folder1:Preset0",
+                    },
+                },
+                {"type": "get_track_info", "params": {"track_index": 0}},
+            ]
+        },
+    )
+
+    device = result["results"][1]["result"]["devices"][-1]
+    assert device["name"] == "Audio Effects Preset 1-0"
+
+
+# ── Idempotent replay ───────────────────────────────────────────────
+
+
+def test_repeated_idempotency_key_is_answered_not_rerun(live):
+    command = {"type": "create_scene", "params": {}, "idempotency_key": "k1"}
+    with _framed_socket(live.port) as sock:
+        sock.sendall(encode_frame({"id": 1, **command}))
+        first = _read_frame(sock)
+        sock.sendall(encode_frame({"id": 2, **command}))
+        second = _read_frame(sock)
+
+    assert len(live.song.scenes) == 3
+    assert first["result"] == second["result"] == {"index": 2, "name": ""}
+    assert (first["id"], second["id"]) == (1, 2)
+
+
+def test_repeat_sent_while_original_runs_gets_its_reply(live):
+    live.module.TRACK_SELECT_SETTLE = 0.1
+    live.wait_for_browser_index()
+    command = {
+        "type": "load_browser_item",
+        "params": {"track_index": 0, "uri": "query:Drums#Folder0:Preset0"},
+        "idempotency_key": "k2",
+    }
+    with _framed_socket(live.port) as sock:
+        sock.sendall(encode_frame({"id": 1, **command}))
+        sock.sendall(encode_frame({"id": 2, **command}))
+        replies = [_read_frame(sock), _read_frame(sock)]
+
+    assert sorted(reply["id"] for reply in replies) == [1, 2]
+    assert replies[0]["result"] == replies[1]["result"]
+    assert len(live.song.tracks[0].devices) == 2
+
+
+# ── Notes ───────────────────────────────────────────────────────────
+
+
+def _set_notes(live, notes: list[Note]) -> None:
+    clip = live.song.tracks[0].clip_slots[0].clip
+    live.call(lambda: setattr(clip, "_notes", notes))
+
+
+def _pitches_and_starts(live) -> list[tuple[int, float]]:
+    clip = live.song.tracks[0].clip_slots[0].clip
+    return sorted((note.pitch, note.start_time) for note in clip._notes)
+
+
+def test_note_diff_by_id(live, client):
+    _set_notes(live, [Note(60, 0.0, 0.5, note_id=101), Note(62, 1.0, 0.5)])
+    clip = live.song.tracks[0].clip_slots[0].clip
+
+    result = client.send_command(
+        "apply_note_diff",
+        {
+            "track_index": 0,
+            "clip_index": 0,
+            "modify": [{"note_id": 101, "changes": {"velocity": 50}}],
+            "add": [{"pitch": 64, "start_time": 2.0}],
+        },
+    )
+
+    assert result["modified"] == result["added"] == 1
+    assert [n.velocity for n in clip._notes if n.note_id == 101] == [50]
+    assert len(result["note_ids"]) == 1
+    assert _pitches_and_starts(live) == [(60, 0.0), (62, 1.0), (64, 2.0)]
+
+
+@pytest.mark.parametrize("live_version", [(12, 1, 0), (10, 1, 30)])
+def test_note_diff_by_key(start_live, live_version):
+    live = start_live(live_version=live_version)
+    _set_notes(live, [Note(60, 0.0, 0.5), Note(62, 1.0, 0.5), Note(64, 2.0, 0.5)])
+    client = SocketAbletonClient(port=live.port)
+    try:
+        client.send_command(
+            "apply_note_diff",
+            {
+                "track_index": 0,
+                "clip_index": 0,
+                "remove": [{"pitch": 60, "start_time": 0.0}],
+                "modify": [{"pitch": 62, "start_time": 1.0, "changes": {"pitch": 61}}],
+            },
+        )
+    finally:
+        client.disconnect()
+
+    assert _pitches_and_starts(live) == [(61, 1.0), (64, 2.0)]
+
+
+def test_note_diff_missing_note_changes_nothing(live, client):
+    _set_notes(live, [Note(60, 0.0, 0.5)])
+
+    with pytest.raises(RuntimeError, match="No note with pitch 61 at 0.0"):
+        client.send_command(
+            "apply_note_diff",
+            {
+                "track_index": 0,
+                "clip_index": 0,
+                "remove": [
+                    {"pitch": 60, "start_time": 0.0},
+                    {"pitch": 61, "start_time": 0.0},
+                ],
+            },
+        )
+
+    assert _pitches_and_starts(live) == [(60, 0.0)]
+
+
+@pytest.mark.parametrize("live_version", [(12, 1, 0), (10, 1, 30)])
+@pytest.mark.parametrize(
+    "modified, changes, message",
+    [
+        (1, {"velocty": 1}, "Unknown note fields: velocty"),
+        (0, {"velocity": 1}, "both removed and modified"),
+    ],
+)
+def test_bad_note_diff_changes_nothing(
+    start_live, live_version, modified, changes, message
+):
+    live = start_live(live_version=live_version)
+    notes = [Note(60 + i, float(i), 0.5, note_id=201 + i) for i in range(4)]
+    _set_notes(live, notes)
+    by_id = live_version >= (11,)
+
+    def ref(i: int) -> dict:
+        if by_id:
+            return {"note_id": 201 + i}
+        return {"pitch": 60 + i, "start_time": float(i)}
+
+    client = SocketAbletonClient(port=live.port)
+    try:
+        with pytest.raises(RuntimeError, match=message):
+            client.send_command(
+                "apply_note_diff",
+                {
+                    "track_index": 0,
+                    "clip_index": 0,
+                    "remove": [ref(0)],
+                    "modify": [{**ref(modified), "changes": changes}],
+                    "add": [{"pitch": 72, "start_time": 0.0, "duration": 0.5}],
+                },
+            )
+    finally:
+        client.disconnect()
+
+    assert _pitches_and_starts(live) == [(60 + i, float(i)) for i in range(4)]
+
+
+def test_notes_read_a_page_at_a_time(live, client):
+    _set_notes(live, [Note(60 + i % 3, (i // 3) * 0.5, 0.25) for i in range(7)])
+    everything = client.send_command(
+        "get_clip_notes", {"track_index": 0, "clip_index": 0}
+    )["notes"]
+
+    pages = []
+    params = {"track_index": 0, "clip_index": 0, "limit": 3}
+    while True:
+        page = client.send_command("get_clip_notes", params)
+        pages.append(page["notes"])
+        if "next_cursor" not in page:
+            break
+        params["cursor"] = page["next_cursor"]
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    read = [note for page in pages for note in page]
+    assert read == sorted(everything, key=lambda n: (n["start_time"], n["pitch"]))
+
+
+def test_transform_in_live_keeps_note_ids(live, client):
+    _set_notes(live, [Note(60, 0.1, 0.5, note_id=7), Note(120, 1.0, 0.5)])
+    clip = live.song.tracks[0].clip_slots[0].clip
+
+    result = client.send_command(
+        "transform_clip_notes",
+        {
+            "track_index": 0,
+            "clip_index": 0,
+            "operations": [
+                {"op": "transpose", "semitones": 12},
+                {"op": "quantize", "grid": 0.25},
+            ],
+        },
+    )
+
+    assert result == {"notes": 1, "removed": 1}
+    assert [(n.note_id, n.pitch, n.start_time) for n in clip._notes] == [(7, 72, 0.0)]
+
+
+@pytest.mark.parametrize("live_version", [(12, 1, 0), (10, 1, 30)])
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_transform_in_live_matches_server_fallback(
+    start_live, monkeypatch, live_version, engine
+):
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(transforms, "_numpy", lambda: None)
+    rng = random.Random(5)
+    notes = [
+        Note(
+            rng.randrange(128),
+            rng.randrange(64) / 16 + rng.random() / 32,
+            rng.choice([0.125, 0.25, 0.5]),
+            rng.randrange(1, 128),
+        )
+        for _ in range(transforms.NUMPY_MIN_NOTES * 2)
+    ]
+    operations = [
+        {"op": "transpose", "semitones": 7},
+        {"op": "quantize", "grid": 0.25, "strength": 0.75},
+        {"op": "velocity", "curve": 0.8, "scale": 1.1, "offset": -3},
+        {"op": "stretch", "factor": 1.5, "origin": 1.0},
+        {"op": "pitch_filter", "pitch_min": 24, "pitch_max": 100},
+        {"op": "legato", "gap": 0.01},
+    ]
+    clip = {"track_index": 0, "clip_index": 0}
+
+    def clip_notes() -> list[tuple]:
+        notes = live.song.tracks[0].clip_slots[0].clip._notes
+        return sorted(
+            (n.pitch, n.start_time, n.duration, n.velocity, n.mute) for n in notes
+        )
+
+    live = start_live(live_version=live_version)
+    client = SocketAbletonClient(port=live.port)
+    try:
+        # What the server does for a control surface without the command
+        _set_notes(live, [note.copy() for note in notes])
+        read = client.send_command("get_clip_notes", clip)["notes"]
+        client.send_command(
+            "add_notes_to_clip", {**clip, "notes": transforms.apply(read, operations)}
+        )
+        fallback = clip_notes()
+
+        _set_notes(live, [note.copy() for note in notes])
+        client.send_command("transform_clip_notes", {**clip, "operations": operations})
+        in_live = clip_notes()
+    finally:
+        client.disconnect()
+
+    assert len(in_live) == len(fallback)
+    for a, b in zip(in_live, fallback):
+        assert a == pytest.approx(b)
+
+
+# ── Change events and the transport ─────────────────────────────────
+
+
+@pytest.mark.anyio
+async def test_mirror_follows_commands_and_edits_in_live(live):
+    mirror = SessionMirror()
+    client = AsyncAbletonClient(port=live.port)
+    try:
+        assert await client.subscribe_events(mirror.apply)
+        assert mirror.track_info(0)["name"] == "Track 1"
+
+        await client.send_command_async(
+            "set_track_name", {"track_index": 0, "name": "Bass"}
+        )
+        # Events for a command arrive before its reply
+        assert mirror.track_info(0)["name"] == "Bass"
+
+        live.call(lambda: setattr(live.song, "tempo", 98.0))
+        await asyncio.to_thread(
+            _eventually, lambda: mirror.session_info()["tempo"] == 98.0
+        )
+
+        await client.send_command_async("create_midi_track", {})
+        assert len(mirror.snapshot()["tracks"]) == 3
+    finally:
+        await client.disconnect()
+
+
+@pytest.mark.anyio
+async def test_mirror_follows_clip_and_device_edits_in_live(live):
+    mirror = SessionMirror()
+    client = AsyncAbletonClient(port=live.port)
+    track = live.song.tracks[0]
+    returns, master = live.song.return_tracks[0], live.song.master_track
+
+    def edit() -> None:
+        track.clip_slots[0].clip.length = 8.0
+        track.clip_slots[0].clip.is_playing = True
+        track.devices[0].name = "Drive"
+        track.devices[0].is_active = False
+        track.create_midi_clip(0.0, 4.0).name = "Intro"
+        for other in (returns, master):
+            other.devices.append(Device("Echo", 1))
+            other.notify("devices")
+
+    def check() -> bool:
+        info = mirror.track_info(0)
+        snapshot = mirror.snapshot()
+        return (
+            info["clip_slots"][0]["clip_length"] == 8.0
+            and info["clip_slots"][0]["is_playing"]
+            and [d["name"] for d in info["devices"]] == ["Drive"]
+            and not info["devices"][0]["is_active"]
+            and [c["name"] for c in snapshot["tracks"][0]["arrangement_clips"]]
+            == ["Intro"]
+            and [d["name"] for d in snapshot["return_tracks"][0]["devices"]] == ["Echo"]
+            and [d["name"] for d in snapshot["master"]["devices"]] == ["Echo"]
+        )
+
+    try:
+        assert await client.subscribe_events(mirror.apply)
+        live.call(edit)
+        await asyncio.to_thread(_eventually, check)
+
+        # Devices added since subscribing are watched as well
+        live.call(lambda: setattr(returns.devices[0], "name", "Delay"))
+        await asyncio.to_thread(
+            _eventually,
+            lambda: mirror.snapshot()["return_tracks"][0]["devices"][0]["name"]
+            == "Delay",
+        )
+    finally:
+        await client.disconnect()
+
+
+def test_edits_in_live_move_the_counter_without_subscribers(live, client):
+    cached = CachingAbletonClient(client)
+    clip = {"track_index": 0, "clip_index": 0}
+    assert cached.send_command("get_clip_info", clip)["length"] == 4.0
+    before = client.version
+
+    def edit() -> None:
+        live.song.tracks[0].clip_slots[0].clip.length = 8.0
+
+    live.call(edit)
+    live.call(lambda: None)  # The tick after the edit counts it
+    # The next reply reports the new count, and the cached read is dropped
+    cached.send_command("get_transport")
+    assert client.version > before
+    assert cached.send_command("get_clip_info", clip)["length"] == 8.0
+
+    for change in (
+        lambda: setattr(live.song.tracks[0].devices[0], "name", "Drive"),
+        lambda: live.song.tracks[0].clip_slots[0].clip.notify("notes"),
+        lambda: setattr(live.song, "loop_start", 4.0),
+    ):
+        before = client.version
+        live.call(change)
+        live.call(lambda: None)
+        cached.send_command("get_transport")
+        assert client.version > before
+
+
+@pytest.mark.anyio
+async def test_transport_updates_are_pushed(live):
+    updates = []
+    client = AsyncAbletonClient(port=live.port)
+    try:
+        assert await client.subscribe_transport(updates.append, 0.0)
+        assert updates[0]["transport"]["is_playing"] is False
+
+        await client.send_command_async("start_playback", {})
+        await client.send_command_async(
+            "fire_clip", {"track_index": 1, "clip_index": 0}
+        )
+        await asyncio.to_thread(
+            _eventually,
+            lambda: updates[-1]["transport"]["clips"]
+            == [{"track_index": 1, "clip_index": 0, "playing_status": "triggered"}],
+        )
+    finally:
+        await client.disconnect()
+
+    assert any(update["transport"]["is_playing"] for update in updates)
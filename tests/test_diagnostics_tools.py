@@ -0,0 +1,79 @@
+import json
+
+import pytest
+from injector import Injector
+
+from ableton_mcp.client import CachingAbletonClient
+from ableton_mcp.server import create_server
+from ableton_mcp.timing import CommandTimings
+from tests.conftest import FakeAbletonModule
+
+
+@pytest.mark.anyio
+async def test_get_cache_stats(fake_client, mcp_server):
+    fake_client.set_response(
+        "get_cache_stats",
+        {
+            "uri_cache": {
+                "size": 2,
+                "max_size": 512,
+                "hits": 5,
+                "misses": 2,
+                "evictions": 0,
+                "invalidations": 0,
+            },
+            "browser_index": {"ready": True, "items": 1200, "resolved": 40},
+        },
+    )
+
+    content, _ = await mcp_server.call_tool("get_cache_stats", {})
+    result = json.loads(content[0].text)
+
+    assert result["uri_cache"]["hits"] == 5
+    assert result["browser_index"]["ready"] is True
+    assert fake_client.commands_sent == [("get_cache_stats", {})]
+
+
+@pytest.mark.anyio
+async def test_get_cache_stats_includes_read_cache(fake_client):
+    fake_client.set_response("get_cache_stats", {"uri_cache": {"hits": 0}})
+    client = CachingAbletonClient(fake_client)
+    server = create_server(Injector([FakeAbletonModule(client)]))
+
+    content, _ = await server.call_tool("get_cache_stats", {})
+    result = json.loads(content[0].text)
+
+    assert result["uri_cache"] == {"hits": 0}
+    assert result["read_cache"]["size"] == 0
+
+
+@pytest.mark.anyio
+async def test_get_performance_stats(fake_client, mcp_server):
+    stats = {
+        "commands": {"get_track_info": {"total": {"count": 3, "p50_ms": 1.2}}},
+        "queue_depth": 0,
+        "max_queue_depth": 4,
+        "parked_continuations": 0,
+    }
+    fake_client.set_response("get_performance_stats", stats)
+
+    content, _ = await mcp_server.call_tool("get_performance_stats", {})
+    result = json.loads(content[0].text)
+
+    assert result == {"control_surface": stats}
+    assert fake_client.commands_sent == [("get_performance_stats", {"reset": False})]
+
+
+@pytest.mark.anyio
+async def test_get_performance_stats_includes_client_timings(fake_client):
+    fake_client.set_response("get_performance_stats", {"commands": {}})
+    fake_client.timings = CommandTimings()
+    fake_client.timings.record("get_track_info", {"total": 0.002})
+    server = create_server(Injector([FakeAbletonModule(fake_client)]))
+
+    content, _ = await server.call_tool("get_performance_stats", {"reset": True})
+    result = json.loads(content[0].text)
+
+    assert result["client"]["get_track_info"]["total"]["count"] == 1
+    assert fake_client.timings.summary() == {}
+    assert fake_client.commands_sent == [("get_performance_stats", {"reset": True})]
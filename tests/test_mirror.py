@@ -0,0 +1,122 @@
+from ableton_mcp.mirror import SessionMirror
+
+SONG = {
+    "tempo": 120.0,
+    "signature_numerator": 4,
+    "signature_denominator": 4,
+    "track_count": 2,
+    "return_track_count": 0,
+    "scene_count": 2,
+}
+
+
+def _track(name, **overrides):
+    track = {
+        "name": name,
+        "mute": False,
+        "solo": False,
+        "arm": False,
+        "volume": 0.85,
+        "pan": 0.0,
+        "clip_slots": [],
+        "arrangement_clips": [],
+        "devices": [],
+    }
+    track.update(overrides)
+    return track
+
+
+def _mirror():
+    mirror = SessionMirror()
+    mirror.apply(
+        {
+            "event": "snapshot",
+            "snapshot": {
+                "song": SONG,
+                "tracks": [_track("Bass"), _track("Drums")],
+                "return_tracks": [],
+                "master": _track("Master"),
+                "scenes": [{"index": 0, "name": "Intro"}, {"index": 1, "name": ""}],
+            },
+        }
+    )
+    return mirror
+
+
+def test_not_ready_until_snapshot():
+    mirror = SessionMirror()
+    mirror.apply({"event": "song", "song": SONG})
+
+    assert not mirror.ready
+    assert mirror.session_info() is None
+    assert mirror.track_info(0) is None
+
+
+def test_applies_change_events():
+    mirror = _mirror()
+    mirror.apply({"event": "song", "song": {**SONG, "tempo": 98.0}})
+    mirror.apply(
+        {"event": "track", "section": "tracks", "index": 1, "track": _track("Kit")}
+    )
+    mirror.apply({"event": "scene", "index": 0, "scene": {"index": 0, "name": "A"}})
+
+    snapshot = mirror.snapshot()
+    assert snapshot["song"]["tempo"] == 98.0
+    assert [t["name"] for t in snapshot["tracks"]] == ["Bass", "Kit"]
+    assert snapshot["scenes"][0]["name"] == "A"
+
+
+def test_results_handed_out_do_not_change():
+    mirror = _mirror()
+    before = mirror.snapshot()
+    mirror.apply(
+        {"event": "track", "section": "master", "track": _track("Master", mute=True)}
+    )
+
+    assert before["master"]["mute"] is False
+    assert mirror.snapshot()["master"]["mute"] is True
+
+
+def test_disconnect_clears_mirror():
+    mirror = _mirror()
+    mirror.apply({"event": "disconnected"})
+
+    assert not mirror.ready
+
+
+def test_track_info_lists_every_clip_slot():
+    mirror = _mirror()
+    clip = {"index": 1, "name": "Riff", "length": 4.0, "is_playing": True}
+    mirror.apply(
+        {
+            "event": "track",
+            "section": "tracks",
+            "index": 0,
+            "track": _track("Bass", clip_slots=[clip]),
+        }
+    )
+
+    info = mirror.track_info(0)
+    assert info["clip_slots"] == [
+        {"index": 0, "has_clip": False},
+        {
+            "index": 1,
+            "has_clip": True,
+            "clip_name": "Riff",
+            "clip_length": 4.0,
+            "is_playing": True,
+        },
+    ]
+    assert "arrangement_clips" not in info
+    assert mirror.track_info(5) is None
+
+
+def test_snapshot_include_filters_sections():
+    mirror = _mirror()
+
+    snapshot = mirror.snapshot(["tracks", "devices"])
+
+    assert set(snapshot) == {"song", "tracks"}
+    assert "devices" in snapshot["tracks"][0]
+    assert "clip_slots" not in snapshot["tracks"][0]
+    assert mirror.snapshot(["bogus"]) is None
@@ -0,0 +1,119 @@
+import pytest
+
+from ableton_mcp.notes import (
+    decode_notes,
+    encode_notes,
+    pack_message,
+    unpack_result,
+)
+
+NOTES = [
+    {
+        "pitch": 36,
+        "start_time": 0.0,
+        "duration": 0.25,
+        "velocity": 100.0,
+        "mute": False,
+    },
+    {
+        "pitch": 38,
+        "start_time": 1234.5625,
+        "duration": 0.125,
+        "velocity": 87.0,
+        "mute": True,
+    },
+]
+FEATURES = frozenset({"columnar_notes"})
+
+
+def test_round_trip():
+    columns = encode_notes(NOTES)
+
+    assert columns["format"] == "columnar"
+    assert columns["count"] == 2
+    assert decode_notes(columns) == NOTES
+
+
+def test_round_trip_empty():
+    assert decode_notes(encode_notes([])) == []
+
+
+def test_missing_fields_take_control_surface_defaults():
+    assert decode_notes(encode_notes([{}])) == [
+        {
+            "pitch": 60,
+            "start_time": 0.0,
+            "duration": 0.5,
+            "velocity": 100.0,
+            "mute": False,
+        }
+    ]
+
+
+def test_decode_includes_note_ids_when_present():
+    columns = encode_notes(NOTES)
+    columns["note_id"] = "BwAAAAkAAAA="  # 7 and 9 as little-endian uint32
+
+    assert [note["note_id"] for note in decode_notes(columns)] == [7, 9]
+
+
+def test_decode_rejects_mismatched_columns():
+    columns = encode_notes(NOTES)
+    columns["count"] = 3
+
+    with pytest.raises(ValueError, match="expected 3"):
+        decode_notes(columns)
+
+
+def test_pack_message_packs_note_writes():
+    message = {
+        "type": "add_notes_to_clip",
+        "params": {"track_index": 0, "clip_index": 0, "notes": NOTES},
+    }
+
+    packed = pack_message(message, FEATURES)
+
+    assert packed["params"]["notes"] == encode_notes(NOTES)
+    assert packed["params"]["track_index"] == 0
+    assert message["params"]["notes"] is NOTES
+
+
+def test_pack_message_packs_note_diff_additions():
+    message = {"type": "apply_note_diff", "params": {"add": NOTES, "remove": []}}
+
+    packed = pack_message(message, FEATURES)
+
+    assert packed["params"]["add"] == encode_notes(NOTES)
+    assert packed["params"]["remove"] == []
+
+
+def test_pack_message_requests_columnar_reads():
+    message = {"type": "get_clip_notes", "params": {"track_index": 0}}
+
+    packed = pack_message(message, FEATURES)
+
+    assert packed["params"] == {"track_index": 0, "note_format": "columnar"}
+
+
+def test_pack_message_leaves_message_without_feature():
+    message = {"type": "add_notes_to_clip", "params": {"notes": NOTES}}
+
+    assert pack_message(message, frozenset()) is message
+
+
+def test_pack_message_leaves_unpackable_notes_to_control_surface():
+    message = {"type": "add_notes_to_clip", "params": {"notes": [{"pitch": 300}]}}
+
+    assert pack_message(message, FEATURES) is message
+
+
+def test_unpack_result_expands_columnar_notes():
+    result = {"notes": encode_notes(NOTES), "clip_index": 0}
+
+    assert unpack_result(result) == {"notes": NOTES, "clip_index": 0}
+
+
+def test_unpack_result_passes_through_other_results():
+    result = {"notes": NOTES}
+
+    assert unpack_result(result) is result
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from injector import Injector
+
+from ableton_mcp.output import OUTPUT_ENV, default_profile, encode, tabulate
+from ableton_mcp.server import create_server
+from tests.conftest import FakeAbletonModule
+
+
+def test_pretty_is_indented():
+    assert encode({"a": [1]}, "pretty") == '{\n  "a": [\n    1\n  ]\n}'
+
+
+def test_compact_has_no_whitespace():
+    assert encode({"a": [1, 2], "b": "x y"}, "compact") == '{"a":[1,2],"b":"x y"}'
+
+
+def test_tabulate_fills_missing_keys_with_null():
+    slots = [
+        {"index": 0, "has_clip": True, "clip_name": "Bass"},
+        {"index": 1, "has_clip": False},
+    ]
+
+    assert tabulate({"clip_slots": slots}) == {
+        "clip_slots": {
+            "columns": ["index", "has_clip", "clip_name"],
+            "rows": [[0, True, "Bass"], [1, False, None]],
+        }
+    }
+
+
+def test_tabulate_nested_lists():
+    tracks = [
+        {"name": "A", "devices": [{"name": "EQ"}, {"name": "Comp"}]},
+        {"name": "B", "devices": []},
+    ]
+
+    assert tabulate(tracks) == {
+        "columns": ["name", "devices"],
+        "rows": [
+            ["A", {"columns": ["name"], "rows": [["EQ"], ["Comp"]]}],
+            ["B", []],
+        ],
+    }
+
+
+def test_tabulate_leaves_other_lists_alone():
+    value = {"one": [{"a": 1}], "mixed": [{"a": 1}, 2], "scalars": [1, 2]}
+
+    assert tabulate(value) == value
+
+
+def test_default_profile_from_env(monkeypatch):
+    monkeypatch.delenv(OUTPUT_ENV, raising=False)
+    assert default_profile() == "pretty"
+
+    monkeypatch.setenv(OUTPUT_ENV, "Compact")
+    assert default_profile() == "compact"
+
+    monkeypatch.setenv(OUTPUT_ENV, "yaml")
+    with pytest.raises(ValueError, match=OUTPUT_ENV):
+        default_profile()
+
+
+@pytest.mark.anyio
+async def test_server_default_profile(fake_client, monkeypatch):
+    monkeypatch.setenv(OUTPUT_ENV, "compact")
+    fake_client.set_response("get_session_info", {"tempo": 120.0})
+    server = create_server(Injector([FakeAbletonModule(fake_client)]))
+
+    content, _ = await server.call_tool("get_session_info", {})
+
+    assert content[0].text == '{"tempo":120.0}'
+
+
+@pytest.mark.anyio
+async def test_output_argument_overrides_default(fake_client):
+    fake_client.set_response(
+        "get_device_parameters",
+        {"parameters": [{"name": "Gain", "value": 0.5}, {"name": "Pan", "value": 0}]},
+    )
+    server = create_server(Injector([FakeAbletonModule(fake_client)]), "compact")
+
+    content, _ = await server.call_tool(
+        "get_device_parameters",
+        {"track_index": 0, "device_index": 0, "output": "pretty"},
+    )
+
+    assert json.loads(content[0].text)["parameters"][0] == {
+        "name": "Gain",
+        "value": 0.5,
+    }
+    assert content[0].text.startswith('{\n  "parameters"')
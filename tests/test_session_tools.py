@@ -1,6 +1,10 @@
 import json
 
 import pytest
+from injector import Injector
+
+from ableton_mcp.server import create_server
+from tests.conftest import FakeAbletonClient, FakeAbletonModule
 
 
 @pytest.mark.anyio
@@ -51,3 +55,84 @@ async def test_connection_error_returns_error_json(mcp_server):
     content, _ = await mcp_server.call_tool("get_session_info", {})
     result = json.loads(content[0].text)
     assert "error" in result
+
+
+@pytest.mark.anyio
+async def test_get_session_snapshot(fake_client, mcp_server):
+    fake_client.set_response(
+        "get_session_snapshot",
+        {
+            "song": {"tempo": 120.0, "track_count": 1},
+            "tracks": [
+                {
+                    "index": 0,
+                    "name": "Bass",
+                    "volume": 0.85,
+                    "pan": 0.0,
+                    "mute": False,
+                    "solo": False,
+                    "clip_slots": [{"index": 0, "name": "Riff", "length": 4.0}],
+                    "devices": [],
+                }
+            ],
+        },
+    )
+
+    content, _ = await mcp_server.call_tool("get_session_snapshot", {})
+    result = json.loads(content[0].text)
+
+    assert result["tracks"][0]["clip_slots"][0]["name"] == "Riff"
+    assert fake_client.commands_sent == [("get_session_snapshot", {})]
+
+
+@pytest.mark.anyio
+async def test_get_session_snapshot_include(fake_client, mcp_server):
+    fake_client.set_response("get_session_snapshot", {"song": {}, "tracks": []})
+
+    await mcp_server.call_tool(
+        "get_session_snapshot", {"include": ["tracks", "devices"]}
+    )
+
+    assert fake_client.commands_sent == [
+        ("get_session_snapshot", {"include": ["tracks", "devices"]})
+    ]
+
+
+class _EventsClient(FakeAbletonClient):
+    supports_events = True
+
+    def __init__(self, snapshot) -> None:
+        super().__init__()
+        self._snapshot = snapshot
+
+    async def subscribe_events(self, callback) -> bool:
+        callback({"event": "snapshot", "snapshot": self._snapshot})
+        return True
+
+
+@pytest.mark.anyio
+async def test_reads_served_from_mirror():
+    track = {
+        "name": "Bass",
+        "mute": False,
+        "solo": False,
+        "arm": False,
+        "volume": 0.85,
+        "pan": 0.0,
+        "clip_slots": [],
+        "devices": [],
+    }
+    client = _EventsClient(
+        {"song": {"tempo": 120.0, "scene_count": 1}, "tracks": [track]}
+    )
+    server = create_server(Injector([FakeAbletonModule(client)]))
+
+    content, _ = await server.call_tool("get_session_info", {})
+    assert json.loads(content[0].text)["tempo"] == 120.0
+    content, _ = await server.call_tool("get_track_info", {"track_index": 0})
+    assert json.loads(content[0].text)["clip_slots"] == [
+        {"index": 0, "has_clip": False}
+    ]
+    await server.call_tool("get_session_snapshot", {"include": ["tracks"]})
+
+    assert client.commands_sent == []
@@ -0,0 +1,92 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from injector import Injector
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from ableton_mcp.server import create_server
+from tests.conftest import FakeAbletonClient, FakeAbletonModule
+
+# Generous, so only a regression like building the server or connecting at
+# import time trips it, not a slow machine
+IMPORT_BUDGET = 5.0
+
+
+class WarmingClient(FakeAbletonClient):
+    def __init__(self) -> None:
+        super().__init__()
+        self.warmed = asyncio.Event()
+
+    async def warm_up(self) -> None:
+        self.warmed.set()
+
+
+def _run(code: str, **env: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, **env},
+        check=True,
+    )
+
+
+def test_import_builds_nothing():
+    # An unknown output profile would make create_server raise
+    started = time.perf_counter()
+    result = _run(
+        "import ableton_mcp.server as server; print('mcp' in vars(server))",
+        ABLETON_MCP_OUTPUT="bogus",
+    )
+    elapsed = time.perf_counter() - started
+
+    assert result.stdout.strip() == "False"
+    assert elapsed < IMPORT_BUDGET
+
+
+def test_entry_point_runs_a_server_it_builds(monkeypatch):
+    import ableton_mcp.__main__ as entry
+
+    class Server:
+        ran = False
+
+        def run(self) -> None:
+            Server.ran = True
+
+    monkeypatch.setattr(entry, "create_server", Server)
+    entry.main()
+
+    assert Server.ran
+
+
+def test_mcp_built_on_first_use():
+    result = _run(
+        "import ableton_mcp.server as server\n"
+        "from ableton_mcp.server import mcp\n"
+        "print(server.mcp is mcp, 'mcp' in vars(server))"
+    )
+
+    assert result.stdout.strip() == "True True"
+
+
+def test_unknown_attribute():
+    import ableton_mcp.server as server
+
+    with pytest.raises(AttributeError, match="no attribute 'missing'"):
+        server.missing  # noqa: B018
+
+
+@pytest.mark.anyio
+async def test_session_start_warms_up_client():
+    client = WarmingClient()
+    mcp = create_server(Injector([FakeAbletonModule(client)]))
+
+    async with create_connected_server_and_client_session(mcp) as session:
+        await asyncio.wait_for(client.warmed.wait(), 5.0)
+        await session.send_ping()
+
+    assert client.commands_sent == []
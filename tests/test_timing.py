@@ -0,0 +1,50 @@
+from ableton_mcp.timing import CommandTimings, LatencyHistogram
+
+
+class TestLatencyHistogram:
+    def test_percentiles_are_bucket_upper_bounds(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 101):
+            histogram.add(float(ms))
+
+        assert histogram.count == 100
+        # Within a bucket's width (about 19%) of the true value
+        assert 50 <= histogram.percentile(50) <= 50 * 1.19
+        assert 99 <= histogram.percentile(99) <= 100
+        assert histogram.percentile(100) == 100
+
+    def test_overflow_reports_the_max(self):
+        histogram = LatencyHistogram()
+        histogram.add(10_000_000.0)
+
+        assert histogram.percentile(50) == 10_000_000.0
+
+    def test_empty(self):
+        assert LatencyHistogram().summary() == {
+            "count": 0,
+            "mean_ms": 0.0,
+            "p50_ms": 0.0,
+            "p90_ms": 0.0,
+            "p99_ms": 0.0,
+            "max_ms": 0.0,
+        }
+
+
+class TestCommandTimings:
+    def test_records_each_phase(self):
+        timings = CommandTimings()
+        timings.record("get_track_info", {"round_trip": 0.002, "total": 0.003})
+        timings.record("get_track_info", {"round_trip": 0.004, "total": 0.005})
+
+        summary = timings.summary()["get_track_info"]
+
+        assert summary["round_trip"]["count"] == 2
+        assert summary["round_trip"]["mean_ms"] == 3.0
+        assert summary["total"]["max_ms"] == 5.0
+
+    def test_reset(self):
+        timings = CommandTimings()
+        timings.record("get_track_info", {"total": 0.001})
+        timings.reset()
+
+        assert timings.summary() == {}
@@ -0,0 +1,135 @@
+import random
+
+import pytest
+
+from ableton_mcp import transforms
+from ableton_mcp.transforms import apply, validate_operations
+
+
+def _note(pitch, start_time, duration=0.25, velocity=100, **extra):
+    return {
+        "pitch": pitch,
+        "start_time": start_time,
+        "duration": duration,
+        "velocity": velocity,
+        "mute": False,
+        **extra,
+    }
+
+
+def test_transpose_removes_notes_out_of_range():
+    notes = [_note(60, 0.0), _note(120, 1.0)]
+
+    assert apply(notes, [{"op": "transpose", "semitones": 12}]) == [_note(72, 0.0)]
+
+
+def test_quantize_with_strength():
+    notes = [_note(60, 0.1), _note(62, 0.4)]
+
+    result = apply(notes, [{"op": "quantize", "grid": 0.25, "strength": 0.5}])
+
+    assert [note["start_time"] for note in result] == pytest.approx([0.05, 0.45])
+
+
+def test_velocity_curve_is_clamped():
+    notes = [_note(60, 0.0, velocity=32), _note(62, 1.0, velocity=127)]
+
+    result = apply(notes, [{"op": "velocity", "curve": 0.5, "max": 120}])
+
+    assert [note["velocity"] for note in result] == pytest.approx(
+        [127 * (32 / 127) ** 0.5, 120]
+    )
+
+
+def test_stretch_about_origin():
+    notes = [_note(60, 1.0, duration=0.5), _note(62, 3.0, duration=0.5)]
+
+    result = apply(notes, [{"op": "stretch", "factor": 2.0, "origin": 2.0}])
+
+    assert [(n["start_time"], n["duration"]) for n in result] == [
+        (0.0, 1.0),
+        (4.0, 1.0),
+    ]
+
+
+def test_pitch_filter():
+    notes = [_note(36, 0.0), _note(42, 0.0), _note(60, 0.0)]
+
+    result = apply(notes, [{"op": "pitch_filter", "pitch_min": 36, "pitch_max": 48}])
+
+    assert [note["pitch"] for note in result] == [36, 42]
+
+
+def test_legato_fills_to_next_start():
+    notes = [_note(60, 0.0), _note(64, 0.0), _note(67, 1.0), _note(72, 2.0, 0.5)]
+
+    result = apply(notes, [{"op": "legato", "gap": 0.25}])
+
+    assert [note["duration"] for note in result] == [0.75, 0.75, 0.75, 0.5]
+
+
+def test_operations_run_in_order_and_keep_other_fields():
+    notes = [_note(60, 0.1, note_id=7), _note(50, 0.9, note_id=8)]
+
+    result = apply(
+        notes,
+        [
+            {"op": "pitch_filter", "pitch_min": 55},
+            {"op": "transpose", "semitones": -12},
+            {"op": "quantize", "grid": 0.5},
+        ],
+    )
+
+    assert result == [_note(48, 0.0, note_id=7)]
+
+
+@pytest.mark.parametrize(
+    "operation, message",
+    [
+        ({"op": "reverse"}, "Unknown note transform: reverse"),
+        ({"op": "transpose"}, "transpose needs a number for semitones"),
+        ({"op": "transpose", "semitones": 1, "by": 2}, "Unknown parameter 'by'"),
+        ({"op": "quantize", "grid": 0}, "quantize needs a grid above 0"),
+        (
+            {"op": "quantize", "grid": 0.25, "strength": 2},
+            "quantize needs a grid above 0 and strength from 0 to 1",
+        ),
+        ({"op": "velocity", "curve": -1}, "velocity needs a curve above 0"),
+        ({"op": "stretch", "factor": True}, "stretch needs a number for factor"),
+        ({"op": "legato", "gap": -0.1}, "legato needs a gap of at least 0"),
+    ],
+)
+def test_validate_operations_rejects(operation, message):
+    with pytest.raises(ValueError, match=f"Operation 1: {message}"):
+        validate_operations([{"op": "legato"}, operation])
+
+
+def test_numpy_matches_python(monkeypatch):
+    pytest.importorskip("numpy")
+    rng = random.Random(3)
+    notes = [
+        _note(
+            rng.randrange(128),
+            rng.randrange(256) / 16 + rng.random() / 32,
+            rng.choice([0.125, 0.25, 0.5]),
+            rng.randrange(1, 128),
+            note_id=i,
+        )
+        for i in range(transforms.NUMPY_MIN_NOTES * 2)
+    ]
+    operations = [
+        {"op": "transpose", "semitones": 7},
+        {"op": "quantize", "grid": 0.25, "strength": 0.75},
+        {"op": "velocity", "curve": 0.8, "scale": 1.1, "offset": -3},
+        {"op": "stretch", "factor": 1.5, "origin": 1.0},
+        {"op": "pitch_filter", "pitch_min": 24, "pitch_max": 100},
+        {"op": "legato", "gap": 0.01},
+    ]
+
+    fast = apply(notes, operations)
+    monkeypatch.setattr(transforms, "_numpy", lambda: None)
+    slow = apply(notes, operations)
+
+    assert len(fast) == len(slow)
+    for a, b in zip(fast, slow):
+        assert a == pytest.approx(b)
@@ -0,0 +1,31 @@
+from ableton_mcp.transport import transport_matches
+
+STATE = {
+    "current_song_time": 8.0,
+    "is_playing": True,
+    "tempo": 120.0,
+    "clips": [
+        {"track_index": 0, "clip_index": 1, "playing_status": "playing"},
+        {"track_index": 2, "clip_index": 3, "playing_status": "triggered"},
+    ],
+}
+
+
+def test_no_conditions_match():
+    assert transport_matches(STATE)
+
+
+def test_play_state_and_song_time():
+    assert transport_matches(STATE, is_playing=True, song_time=8.0)
+    assert not transport_matches(STATE, is_playing=False)
+    assert not transport_matches(STATE, song_time=8.5)
+
+
+def test_playing_clip():
+    assert transport_matches(STATE, track_index=0)
+    assert transport_matches(STATE, track_index=0, clip_index=1)
+    assert not transport_matches(STATE, track_index=0, clip_index=2)
+
+
+def test_triggered_clip_is_not_playing_yet():
+    assert not transport_matches(STATE, track_index=2, clip_index=3)
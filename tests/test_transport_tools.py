@@ -1,6 +1,19 @@
+import asyncio
 import json
 
 import pytest
+from injector import Injector
+
+from ableton_mcp.server import create_server
+from tests.conftest import FakeAbletonClient, FakeAbletonModule
+
+STOPPED = {"current_song_time": 0.0, "is_playing": False, "tempo": 120.0, "clips": []}
+PLAYING = {
+    "current_song_time": 4.0,
+    "is_playing": True,
+    "tempo": 120.0,
+    "clips": [{"track_index": 1, "clip_index": 0, "playing_status": "playing"}],
+}
 
 
 @pytest.mark.anyio
@@ -33,3 +46,74 @@ async def test_set_tempo(fake_client, mcp_server):
 
     assert result["tempo"] == 140.0
     assert fake_client.commands_sent == [("set_tempo", {"tempo": 140.0})]
+
+
+@pytest.mark.anyio
+async def test_get_transport(fake_client, mcp_server):
+    fake_client.set_response("get_transport", STOPPED)
+
+    content, _ = await mcp_server.call_tool("get_transport", {})
+
+    assert json.loads(content[0].text) == STOPPED
+    assert fake_client.commands_sent == [("get_transport", {})]
+
+
+@pytest.mark.anyio
+async def test_transport_resource(fake_client, mcp_server):
+    fake_client.set_response("get_transport", STOPPED)
+
+    contents = await mcp_server.read_resource("ableton://transport")
+
+    assert json.loads(contents[0].content) == STOPPED
+
+
+@pytest.mark.anyio
+async def test_wait_for_transport_polls_without_events(fake_client, mcp_server):
+    fake_client.set_response("get_transport", PLAYING)
+
+    content, _ = await mcp_server.call_tool(
+        "wait_for_transport", {"track_index": 1, "clip_index": 0}
+    )
+    result = json.loads(content[0].text)
+
+    assert result == {"matched": True, "transport": PLAYING}
+    assert fake_client.commands_sent == [("get_transport", {})]
+
+
+@pytest.mark.anyio
+async def test_wait_for_transport_times_out(fake_client, mcp_server):
+    fake_client.set_response("get_transport", STOPPED)
+
+    content, _ = await mcp_server.call_tool(
+        "wait_for_transport", {"is_playing": True, "timeout": 0.05}
+    )
+
+    assert json.loads(content[0].text)["matched"] is False
+
+
+class _TransportClient(FakeAbletonClient):
+    supports_events = True
+
+    async def subscribe_transport(self, callback, interval=0.1) -> bool:
+        self.push = callback
+        callback({"event": "transport", "transport": STOPPED})
+        return True
+
+
+@pytest.mark.anyio
+async def test_wait_for_transport_follows_pushed_updates():
+    client = _TransportClient()
+    server = create_server(Injector([FakeAbletonModule(client)]))
+
+    async def start_playing():
+        await asyncio.sleep(0.01)
+        client.push({"event": "transport", "transport": PLAYING})
+
+    pusher = asyncio.create_task(start_playing())
+    content, _ = await server.call_tool(
+        "wait_for_transport", {"is_playing": True, "song_time": 4.0}
+    )
+    await pusher
+
+    assert json.loads(content[0].text) == {"matched": True, "transport": PLAYING}
+    assert client.commands_sent == []